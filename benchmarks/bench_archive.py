@@ -0,0 +1,84 @@
+"""Benchmark: completion reads before and after archiving old completions.
+
+Run from the project root:
+
+    python -m benchmarks.bench_archive
+"""
+
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+from src.models.database import Database
+from src.models.habit import Habit
+
+
+HABITS = 20
+YEARS = 10
+QUERIES = 2000
+
+
+def _seed(db: Database):
+    today = date.today()
+    for i in range(HABITS):
+        habit_id = db.add_habit(Habit(None, f"Habit {i}", "", "Other", "#BB8FCE", "⭐", "daily",
+                                      0, 0, datetime(2000, 1, 1), None, 7, 30, 0, None, False))
+        db.add_completions_bulk(
+            (habit_id, today - timedelta(days=offset))
+            for offset in range(YEARS * 365) if random.random() < 0.7
+        )
+
+
+def measure(db: Database, window: int) -> float:
+    """Return microseconds per get_completions over the last ``window`` days."""
+    habit_ids = [habit.id for habit in db.get_all_habits()]
+    end = date.today()
+    start_date = end - timedelta(days=window - 1)
+    start = time.perf_counter()
+    for i in range(QUERIES):
+        db.get_completions(habit_ids[i % len(habit_ids)], start_date, end)
+    return (time.perf_counter() - start) / QUERIES * 1e6
+
+
+def index_pages(db: Database) -> int:
+    """Return the number of pages in the completions (habit, date) index."""
+    conn = db.backend.conn
+    try:
+        return conn.execute(
+            "SELECT COUNT(*) FROM dbstat WHERE name = 'idx_completions_habit_date'"
+        ).fetchone()[0]
+    except sqlite3.OperationalError:
+        return -1  # SQLite built without dbstat
+
+
+def main():
+    random.seed(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "bench.db"))
+        _seed(db)
+        conn = db.backend.conn
+        windows = (30, 365, YEARS * 365)
+
+        hot_rows = conn.execute("SELECT COUNT(*) FROM completions").fetchone()[0]
+        before = {window: measure(db, window) for window in windows}
+        pages = index_pages(db)
+
+        start = time.perf_counter()
+        moved = db.archive_completions()
+        elapsed = time.perf_counter() - start
+        conn.execute("VACUUM")
+
+        print(f"archived {moved} of {hot_rows} completions in {elapsed * 1e3:.0f} ms")
+        print(f"completions rows: {hot_rows} -> {conn.execute('SELECT COUNT(*) FROM completions').fetchone()[0]}")
+        print(f"(habit, date) index pages: {pages} -> {index_pages(db)}")
+        print(f"{'window':>8} {'before':>12} {'after':>12}")
+        for window in windows:
+            print(f"{window:>7}d {before[window]:>9.1f} us {measure(db, window):>9.1f} us")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Load test: AsyncDatabase latency under thousands of concurrent awaiters.
+
+Run from the project root:
+
+    python -m benchmarks.bench_async
+"""
+
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+from src.models.async_database import AsyncDatabase
+from src.models.database import Database
+from src.models.habit import Habit
+
+
+HABITS = 50
+CONCURRENCY = [10, 100, 1000, 5000]
+WRITE_RATIO = 0.1
+
+
+def _make_habit(i: int) -> Habit:
+    return Habit(None, f"Habit {i}", "", "Other", "#BB8FCE", "⭐", "daily",
+                 0, 0, datetime.now(), None, 7, 30, 0, None, False)
+
+
+async def _timed(coro) -> float:
+    start = time.perf_counter()
+    await coro
+    return time.perf_counter() - start
+
+
+async def run_load(adb: AsyncDatabase, habit_ids: list, tasks: int, day_offset: int) -> tuple:
+    """Launch ``tasks`` concurrent operations; return read and write latencies."""
+    rng = random.Random(tasks)
+    today = date.today()
+    reads, writes = [], []
+    for i in range(tasks):
+        habit_id = rng.choice(habit_ids)
+        if rng.random() < WRITE_RATIO:
+            day = today - timedelta(days=day_offset + i)
+            writes.append(_timed(adb.add_completion(habit_id, day)))
+        elif i % 2:
+            reads.append(_timed(adb.get_completion_count(habit_id, today - timedelta(days=30), today)))
+        else:
+            reads.append(_timed(adb.get_total_points()))
+
+    read_times, write_times = await asyncio.gather(asyncio.gather(*reads), asyncio.gather(*writes))
+    return list(read_times), list(write_times)
+
+
+def _percentiles(samples: list) -> str:
+    if not samples:
+        return "      n/a"
+    samples = sorted(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    return f"p50 {statistics.median(samples) * 1e3:8.2f} ms  p99 {p99 * 1e3:8.2f} ms"
+
+
+async def main_async(db_path: str):
+    db = Database(db_path)
+    habit_ids = [db.add_habit(_make_habit(i)) for i in range(HABITS)]
+
+    async with AsyncDatabase(db) as adb:
+        offset = 0
+        for tasks in CONCURRENCY:
+            start = time.perf_counter()
+            read_times, write_times = await run_load(adb, habit_ids, tasks, offset)
+            elapsed = time.perf_counter() - start
+            offset += tasks
+            print(f"{tasks:5d} concurrent  {tasks / elapsed:8.0f} ops/s  threads {threading.active_count():3d}")
+            print(f"      reads  {_percentiles(read_times)}")
+            print(f"      writes {_percentiles(write_times)}")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(main_async(os.path.join(tmp, "bench.db")))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Benchmark: bulk ingestion through add_completions_bulk.
+
+Run from the project root:
+
+    python -m benchmarks.bench_bulk
+
+Loads about a million completions into empty habits, then tops the same
+habits up with another year of history that touches their existing runs.
+"""
+
+import os
+import random
+import tempfile
+import time
+from datetime import date, datetime
+
+from src.models.database import Database
+from src.models.habit import Habit
+
+
+HABITS = 500
+DAYS = 2740  # about 1M completions at the rate below
+RATE = 0.73
+TOP_UP_DAYS = 365
+
+
+def _history(habit_ids, first: int, days: int):
+    return [
+        (habit_id, date.fromordinal(first + offset))
+        for habit_id in habit_ids
+        for offset in range(days)
+        if random.random() < RATE
+    ]
+
+
+def main():
+    random.seed(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "bench.db"))
+        habit_ids = [
+            db.add_habit(Habit(None, f"Habit {i}", "", "Other", "#BB8FCE", "⭐", "daily",
+                               0, 0, datetime(2000, 1, 1), None, 7, 30, 0, None, False))
+            for i in range(HABITS)
+        ]
+        first = date.today().toordinal() - DAYS - TOP_UP_DAYS
+
+        records = _history(habit_ids, first, DAYS)
+        start = time.perf_counter()
+        inserted = db.add_completions_bulk(records)
+        elapsed = time.perf_counter() - start
+        print(f"empty habits: {inserted:>9,} rows in {elapsed:6.2f} s ({inserted / elapsed:>9,.0f} rows/s)")
+
+        # Overlaps the end of the first load, so runs merge at their edges
+        records = _history(habit_ids, first + DAYS - 30, TOP_UP_DAYS + 30)
+        start = time.perf_counter()
+        inserted = db.add_completions_bulk(records)
+        elapsed = time.perf_counter() - start
+        print(f"top-up:       {inserted:>9,} rows in {elapsed:6.2f} s ({inserted / elapsed:>9,.0f} rows/s)")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
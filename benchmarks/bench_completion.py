@@ -0,0 +1,124 @@
+"""Benchmark: latency and statement count of the completion write path.
+
+Run from the project root:
+
+    python -m benchmarks.bench_completion
+
+Statements are those the code sends; trigger programs SQLite runs for
+them (the points ledger) are counted separately. Of the statements sent
+by complete_habit, two are the completion itself (the guarded INSERT and
+the UPDATE ... RETURNING); the rest maintain the completion bitmaps, the
+streak runs and the event log.
+"""
+
+import os
+import statistics
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+from src.models.database import Database
+from src.models.habit import Habit
+from src.models.storage.memory import MemoryBackend
+
+
+HABITS = 20
+DAYS = 200
+
+
+class StatementCounter:
+    """Counts SQL statements sent on a connection, ignoring transaction control.
+
+    SQLite traces each trigger program it runs as another copy of the
+    statement that fired it; those repeats are counted as ``triggers``.
+    """
+
+    def __init__(self, conn):
+        self.count = 0
+        self.triggers = 0
+        self._last = None
+        conn.set_trace_callback(self._trace)
+
+    def _trace(self, statement: str):
+        if statement == self._last:
+            self.triggers += 1
+            return
+        self._last = statement
+        if statement.split(None, 1)[0].upper() not in ("BEGIN", "COMMIT", "ROLLBACK", "SAVEPOINT", "RELEASE"):
+            self.count += 1
+
+
+def _make_habit(i: int) -> Habit:
+    return Habit(None, f"Habit {i}", "", "Other", "#BB8FCE", "⭐", "daily",
+                 0, 0, datetime.now(), None, 7, 30, 0, None, False)
+
+
+def legacy_complete(db: Database, habit_id: int, day: date):
+    """The previous add_completion: check, insert, reload, check, full update."""
+    cursor = db.backend.conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM completions WHERE habit_id = ? AND completion_date = ?",
+                   (habit_id, day.toordinal()))
+    if cursor.fetchone()[0] > 0:
+        return False
+    cursor.execute("INSERT INTO completions (habit_id, completion_date) VALUES (?, ?)",
+                   (habit_id, day.toordinal()))
+    habit = db.get_habit(habit_id)
+    yesterday = day - timedelta(days=1)
+    cursor.execute("SELECT COUNT(*) FROM completions WHERE habit_id = ? AND completion_date = ?",
+                   (habit_id, yesterday.toordinal()))
+    if cursor.fetchone()[0] > 0 or habit.last_completed_date is None:
+        habit.streak_count += 1
+    else:
+        habit.streak_count = 1
+    habit.longest_streak = max(habit.longest_streak, habit.streak_count)
+    habit.last_completed_date = datetime.combine(day, datetime.min.time())
+    habit.reward_points += 10
+    db.update_habit(habit)
+    db.backend.conn.commit()
+    return True
+
+
+def bench(db: Database, complete) -> tuple:
+    """Complete every habit once per day; return (timings, (statements, trigger programs) per call)."""
+    habit_ids = [db.add_habit(_make_habit(i)) for i in range(HABITS)]
+    conn = getattr(db.backend, "conn", None)
+    counter = StatementCounter(conn) if conn is not None else None
+    start_day = date.today() - timedelta(days=DAYS)
+
+    timings = []
+    for offset in range(DAYS):
+        day = start_day + timedelta(days=offset)
+        for habit_id in habit_ids:
+            start = time.perf_counter()
+            complete(db, habit_id, day)
+            timings.append(time.perf_counter() - start)
+    if counter is None:
+        return timings, None
+    conn.set_trace_callback(None)
+    return timings, (counter.count / len(timings), counter.triggers / len(timings))
+
+
+def run(label: str, complete, backend=None):
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "bench.db"), backend=backend)
+        timings, statements = bench(db, complete)
+        db.close()
+
+    timings.sort()
+    print(f"{label}")
+    print(f"  latency  p50 {statistics.median(timings) * 1e6:8.1f} us"
+          f"   p99 {timings[int(len(timings) * 0.99)] * 1e6:8.1f} us")
+    if statements is not None:
+        print(f"  statements per completion {statements[0]:.1f}   trigger programs {statements[1]:.1f}")
+
+
+def main():
+    run("legacy add_completion", legacy_complete)
+    run("Database.complete_habit", lambda db, habit_id, day: db.complete_habit(habit_id, day))
+    # Same code path without SQLite underneath: the difference is storage cost
+    run("Database.complete_habit (MemoryBackend)",
+        lambda db, habit_id, day: db.complete_habit(habit_id, day), MemoryBackend())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Benchmark: WAL per-thread connections vs. the legacy shared connection.
+
+Run from the project root:
+
+    python -m benchmarks.bench_connections
+"""
+
+import os
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+
+from src.models.connection import ConnectionManager
+
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS completions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        habit_id INTEGER NOT NULL,
+        completion_date TEXT NOT NULL
+    )
+"""
+COMMITS = 500
+READERS = 4
+DURATION = 2.0  # seconds
+
+
+class SharedConnection:
+    """The pre-WAL setup: one connection shared by every thread."""
+
+    def __init__(self, db_path: str):
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+
+    def get(self) -> sqlite3.Connection:
+        return self.conn
+
+    def close_all(self):
+        self.conn.close()
+
+
+def _seed(conn: sqlite3.Connection, rows: int = 10000):
+    conn.execute(SCHEMA)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_completions_habit ON completions(habit_id)")
+    conn.executemany(
+        "INSERT INTO completions (habit_id, completion_date) VALUES (?, ?)",
+        [(i % 50, f"2024-01-{i % 28 + 1:02d}") for i in range(rows)]
+    )
+    conn.commit()
+
+
+def bench_commit_latency(manager) -> list:
+    """Time single-row insert + commit round trips."""
+    conn = manager.get()
+    timings = []
+    for i in range(COMMITS):
+        start = time.perf_counter()
+        conn.execute(
+            "INSERT INTO completions (habit_id, completion_date) VALUES (?, ?)",
+            (i % 50, "2024-02-01")
+        )
+        conn.commit()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def bench_concurrent_reads(manager) -> tuple:
+    """Count reads and writes completed while readers and a writer overlap."""
+    stop = threading.Event()
+    reads = [0] * READERS
+    writes = [0]
+
+    def reader(slot: int):
+        conn = manager.get()
+        while not stop.is_set():
+            conn.execute(
+                "SELECT COUNT(*) FROM completions WHERE habit_id = ?", (slot,)
+            ).fetchone()
+            reads[slot] += 1
+
+    def writer():
+        conn = manager.get()
+        while not stop.is_set():
+            conn.execute(
+                "INSERT INTO completions (habit_id, completion_date) VALUES (?, ?)",
+                (1, "2024-03-01")
+            )
+            conn.commit()
+            writes[0] += 1
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(READERS)]
+    threads.append(threading.Thread(target=writer))
+    for thread in threads:
+        thread.start()
+    time.sleep(DURATION)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return sum(reads), writes[0]
+
+
+def run(label: str, factory):
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = factory(os.path.join(tmp, "bench.db"))
+        _seed(manager.get())
+        timings = bench_commit_latency(manager)
+        reads, writes = bench_concurrent_reads(manager)
+        manager.close_all()
+
+    timings.sort()
+    print(f"{label}")
+    print(f"  commit latency  p50 {statistics.median(timings) * 1e3:8.3f} ms"
+          f"   p99 {timings[int(len(timings) * 0.99)] * 1e3:8.3f} ms")
+    print(f"  concurrent reads {reads / DURATION:10.0f} /s, writes {writes / DURATION:8.0f} /s"
+          f" ({READERS} readers + 1 writer)")
+
+
+def main():
+    run("shared connection (rollback journal)", SharedConnection)
+    run("per-thread connections (WAL)", ConnectionManager)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Benchmark: range completion counts, COUNT(*) vs SQLite bitmaps vs the mmap index vs prefix sums.
+
+Run from the project root:
+
+    python -m benchmarks.bench_counts
+
+The index only answers within its last few years; past them its column
+times the miss that sends the count elsewhere.
+"""
+
+import os
+import random
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+from src.models.database import Database
+from src.models.habit import Habit
+
+
+HISTORY_YEARS = (1, 5, 20)
+WINDOWS = (7, 30, 90, 365)
+QUERIES = 2000
+
+
+def _seed(db: Database, years: int) -> int:
+    habit_id = db.add_habit(Habit(None, "Habit", "", "Other", "#BB8FCE", "⭐", "daily",
+                                  0, 0, datetime(2000, 1, 1), None, 7, 30, 0, None, False))
+    today = date.today()
+    days = [today - timedelta(days=offset) for offset in range(years * 365) if random.random() < 0.7]
+    db.add_completions_bulk((habit_id, day) for day in days)
+    return habit_id
+
+
+def legacy_count(conn, habit_id: int, start: date, end: date) -> int:
+    """The previous get_completion_count: COUNT(*) over the (habit, date) index."""
+    return conn.execute("""
+        SELECT COUNT(*) FROM completions
+        WHERE habit_id = ? AND completion_date BETWEEN ? AND ?
+    """, (habit_id, start.toordinal(), end.toordinal())).fetchone()[0]
+
+
+def measure(count, habit_id: int, window: int, years: int) -> float:
+    """Return microseconds per count over random windows within the history."""
+    today = date.today()
+    ends = [today - timedelta(days=random.randrange(max(years * 365 - window, 1))) for _ in range(QUERIES)]
+    start = time.perf_counter()
+    for end in ends:
+        count(habit_id, end - timedelta(days=window - 1), end)
+    return (time.perf_counter() - start) / QUERIES * 1e6
+
+
+def main():
+    random.seed(0)
+    print(f"{'history':>8} {'window':>7} {'COUNT(*)':>12} {'bitmap':>12} {'index':>12} {'sums':>12}")
+    for years in HISTORY_YEARS:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = Database(os.path.join(tmp, "bench.db"))
+            habit_id = _seed(db, years)
+            db.build_sums()
+            conn = db.backend.conn
+            for window in WINDOWS:
+                before = measure(lambda *args: legacy_count(conn, *args), habit_id, window, years)
+                bitmap = measure(
+                    lambda habit_id, start, end: db.backend.count_completions(
+                        habit_id, start.toordinal(), end.toordinal()),
+                    habit_id, window, years
+                )
+                index = measure(
+                    lambda habit_id, start, end: db.index.count(habit_id, start.toordinal(), end.toordinal()),
+                    habit_id, window, years
+                )
+                sums = measure(db.get_completion_count, habit_id, window, years)
+                print(f"{years:>7}y {window:>6}d {before:>9.1f} us {bitmap:>9.1f} us {index:>9.1f} us {sums:>9.1f} us")
+            db.close()
+
+
+if __name__ == "__main__":
+    main()
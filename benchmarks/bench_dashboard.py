@@ -0,0 +1,101 @@
+"""Benchmark: dashboard figures recomputed per view vs a snapshot of maintained aggregates.
+
+Run from the project root:
+
+    python -m benchmarks.bench_dashboard
+
+"after write" times only ``dashboard.get()`` right after a completion
+toggle; the maintainer's per-commit updates run inside the write and are
+not counted.
+"""
+
+import os
+import random
+import tempfile
+import time
+from datetime import date
+
+from src.models.database import Database
+from src.services.dashboard_service import DashboardService
+from src.services.stats_service import StatsService
+from .bench_stats import _seed
+
+
+HABIT_COUNTS = (10, 100, 1000)
+ROUNDS = 20
+
+
+def legacy_refresh(db: Database, stats: StatsService):
+    """The previous stats tab: every card and chart queried on its own."""
+    with db.snapshot():
+        stats.get_overall_completion_rate(30)
+        stats.get_average_streak()
+        db.get_total_points()
+        stats.get_weekly_summary()
+        stats.get_monthly_summary()
+        stats.get_category_breakdown()
+        for habit in db.get_all_habits():
+            stats.get_completion_trend(habit.id, 30)
+
+
+def measure(fn) -> float:
+    """Return milliseconds per call."""
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        fn()
+    return (time.perf_counter() - start) / ROUNDS * 1e3
+
+
+def get_after_write(db: Database, dashboard: DashboardService, habit_id: int) -> float:
+    """Return milliseconds per dashboard.get() after a completion toggle, timing only the get."""
+    total = 0.0
+    for _ in range(ROUNDS):
+        # A completion toggle bumps the data version
+        db.uncomplete_habit(habit_id, date.today())
+        db.complete_habit(habit_id, date.today())
+        start = time.perf_counter()
+        dashboard.get()
+        total += time.perf_counter() - start
+    return total / ROUNDS * 1e3
+
+
+def first_get(path: str, use_cache: bool) -> float:
+    """Return milliseconds for the first dashboard after opening the database."""
+    db = Database(path)
+    dashboard = DashboardService(db)
+    if not use_cache:
+        dashboard.cache = None
+    start = time.perf_counter()
+    dashboard.get()
+    elapsed = (time.perf_counter() - start) * 1e3
+    dashboard.close()
+    db.close()
+    return elapsed
+
+
+def main():
+    random.seed(0)
+    print(f"{'habits':>7} {'per view':>12} {'after write':>12} {'cached':>12} {'launch':>12} {'from file':>12}")
+    for habits in HABIT_COUNTS:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = Database(os.path.join(tmp, "bench.db"))
+            _seed(db, habits)
+            stats, dashboard = StatsService(db), DashboardService(db)
+            habit_id = db.get_all_habits()[0].id
+
+            legacy = measure(lambda: legacy_refresh(db, stats))
+            fresh = get_after_write(db, dashboard, habit_id)
+            cached = measure(dashboard.get)
+            dashboard.close()
+            db.close()
+
+            # Reopening: from scratch vs from the figures saved on close
+            path = os.path.join(tmp, "bench.db")
+            launch = min(first_get(path, False) for _ in range(3))
+            from_file = min(first_get(path, True) for _ in range(3))
+            print(f"{habits:>7} {legacy:>9.2f} ms {fresh:>9.2f} ms {cached * 1e3:>9.2f} us "
+                  f"{launch:>9.2f} ms {from_file:>9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Benchmark: StatsService metrics vs the previous per-habit counts.
+
+Run from the project root:
+
+    python -m benchmarks.bench_stats
+"""
+
+import os
+import random
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+from src.models.database import Database
+from src.models.habit import Habit
+from src.services.stats_service import StatsService
+from src.utils.constants import CATEGORIES
+from .bench_completion import StatementCounter
+
+
+HABIT_COUNTS = (10, 100, 1000)
+HISTORY_DAYS = 120
+ROUNDS = 5
+
+
+class LegacyStats:
+    """The previous StatsService metrics: one get_completion_count per habit."""
+
+    def __init__(self, db: Database):
+        self.db = db
+
+    def overall_completion_rate(self, days: int = 30) -> float:
+        habits = self.db.get_all_habits()
+        end_date = date.today()
+        start_date = end_date - timedelta(days=days)
+        total = sum(self.db.get_completion_count(h.id, start_date, end_date) for h in habits)
+        return total / (len(habits) * days) * 100
+
+    def best_performing_habits(self, limit: int = 5):
+        end_date = date.today()
+        start_date = end_date - timedelta(days=30)
+        scores = [
+            (habit, self.db.get_completion_count(habit.id, start_date, end_date) / (30 if habit.frequency == "daily" else 4))
+            for habit in self.db.get_all_habits()
+        ]
+        scores.sort(key=lambda x: x[1], reverse=True)
+        return [habit for habit, _ in scores[:limit]]
+
+    def _summary(self, start_date: date, end_date: date) -> dict:
+        habits = self.db.get_all_habits()
+        total = sum(self.db.get_completion_count(h.id, start_date, end_date) for h in habits)
+        completed = len([h for h in habits if self.db.get_completion_count(h.id, start_date, end_date) > 0])
+        return {"total_habits": len(habits), "total_completions": total, "habits_completed": completed}
+
+    def weekly_summary(self) -> dict:
+        today = date.today()
+        week_start = today - timedelta(days=today.weekday())
+        return self._summary(week_start, week_start + timedelta(days=6))
+
+    def monthly_summary(self) -> dict:
+        today = date.today()
+        return self._summary(date(today.year, today.month, 1), today)
+
+    def category_breakdown(self) -> dict:
+        end_date = date.today()
+        start_date = end_date - timedelta(days=30)
+        breakdown = {}
+        for habit in self.db.get_all_habits():
+            count = self.db.get_completion_count(habit.id, start_date, end_date)
+            breakdown[habit.category] = breakdown.get(habit.category, 0) + count
+        return breakdown
+
+
+def _seed(db: Database, habits: int):
+    today = date.today()
+    for i in range(habits):
+        habit_id = db.add_habit(Habit(None, f"Habit {i}", "", CATEGORIES[i % len(CATEGORIES)], "#BB8FCE", "⭐",
+                                      "daily", 0, 0, datetime.now(), None, 7, 30, 0, None, False))
+        db.add_completions_bulk(
+            (habit_id, today - timedelta(days=offset))
+            for offset in range(HISTORY_DAYS) if random.random() < 0.6
+        )
+
+
+def run_metrics(db: Database, metrics) -> tuple:
+    """Compute every metric in one snapshot; return (ms per round, statements per round)."""
+    counter = StatementCounter(db.backend.readers.get())
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        with db.snapshot():
+            for metric in metrics:
+                metric()
+    elapsed = (time.perf_counter() - start) / ROUNDS * 1e3
+    return elapsed, counter.count / ROUNDS
+
+
+def main():
+    random.seed(0)
+    print(f"{'habits':>7} {'path':>28} {'time':>11} {'statements':>11}")
+    for habits in HABIT_COUNTS:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = Database(os.path.join(tmp, "bench.db"))
+            _seed(db, habits)
+            legacy, stats = LegacyStats(db), StatsService(db)
+            legacy_metrics = [legacy.overall_completion_rate, legacy.best_performing_habits,
+                              legacy.weekly_summary, legacy.monthly_summary, legacy.category_breakdown]
+            metrics = [stats.get_overall_completion_rate, stats.get_best_performing_habits,
+                       stats.get_weekly_summary, stats.get_monthly_summary, stats.get_category_breakdown]
+
+            index = db.index
+            for label, with_index in (("", True), (" (no index)", False)):
+                db.index = index if with_index else None
+                for path, fns in (("per-habit counts", legacy_metrics), ("StatsService", metrics)):
+                    elapsed, statements = run_metrics(db, fns)
+                    print(f"{habits:>7} {path + label:>28} {elapsed:>8.2f} ms {statements:>11.0f}")
+            db.index = index
+            db.close()
+
+
+if __name__ == "__main__":
+    main()
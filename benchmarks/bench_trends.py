@@ -0,0 +1,74 @@
+"""Benchmark: completion trends, per-day totals vs resolution-picked rollups.
+
+Run from the project root:
+
+    python -m benchmarks.bench_trends
+
+The per-day column loads the whole range as a completion matrix and sums
+it per day, as the heatmap does; the rollup column draws at most TREND_POINTS
+points at the finest resolution that fits.
+"""
+
+import os
+import random
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+from src.models.database import Database
+from src.models.habit import Habit
+from src.services.analytics import CompletionMatrix
+from src.services.rollups import RollupService
+from src.utils.constants import TREND_POINTS, TREND_RANGES
+
+
+HABITS = 200
+HISTORY_YEARS = 10
+RUNS = 20
+
+
+def _seed(db: Database):
+    habit_ids = [
+        db.add_habit(Habit(None, f"Habit {i}", "", "Other", "#BB8FCE", "⭐", "daily",
+                           0, 0, datetime(2000, 1, 1), None, 7, 30, 0, None, False))
+        for i in range(HABITS)
+    ]
+    today = date.today()
+    db.add_completions_bulk(
+        (habit_id, today - timedelta(days=offset))
+        for habit_id in habit_ids
+        for offset in range(HISTORY_YEARS * 365)
+        if random.random() < 0.5
+    )
+
+
+def measure(trend) -> float:
+    """Return milliseconds per trend."""
+    start = time.perf_counter()
+    for _ in range(RUNS):
+        trend()
+    return (time.perf_counter() - start) / RUNS * 1000
+
+
+def main():
+    random.seed(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "bench.db"))
+        _seed(db)
+        rollups = RollupService(db)
+        today = date.today()
+        db.build_sums()
+
+        print(f"{HABITS} habits, {HISTORY_YEARS} years of history")
+        print(f"{'range':>9} {'per-day':>12} {'rollup':>12} {'resolution':>11} {'points':>7}")
+        for label, days in TREND_RANGES.items():
+            start = today - timedelta(days=days)
+            daily = measure(lambda: CompletionMatrix.load(db, start, today).daily_totals())
+            rolled = measure(lambda: rollups.trend(start, today, TREND_POINTS))
+            resolution, points = rollups.trend(start, today, TREND_POINTS)
+            print(f"{label:>9} {daily:>9.2f} ms {rolled:>9.2f} ms {resolution:>11} {len(points):>7}")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
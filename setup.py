@@ -14,6 +14,7 @@ setup(
         "matplotlib>=3.7.0",
         "Pillow>=10.0.0",
         "plyer>=2.1.0",
+        "numpy>=1.17",  # unpackbits(bitorder=...)
     ],
     python_requires=">=3.8",
     entry_points={
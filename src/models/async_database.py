@@ -0,0 +1,114 @@
+"""Asyncio facade over the Axilium database."""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+from .database import Database
+
+
+def _read(name: str):
+    """Build a coroutine method that runs ``Database.<name>`` on a reader thread."""
+    async def method(self, *args, **kwargs):
+        return await self._submit(self._readers, self._in_snapshot, getattr(self.db, name), *args, **kwargs)
+    method.__name__ = name
+    method.__doc__ = getattr(Database, name).__doc__
+    return method
+
+
+def _write(name: str):
+    """Build a coroutine method that runs ``Database.<name>`` on the writer thread."""
+    async def method(self, *args, **kwargs):
+        return await self._submit(self._writer, getattr(self.db, name), *args, **kwargs)
+    method.__name__ = name
+    method.__doc__ = getattr(Database, name).__doc__
+    return method
+
+
+class AsyncDatabase:
+    """Non-blocking wrapper mirroring the public ``Database`` API as coroutines.
+
+    Calls are dispatched to two bounded thread pools, so any number of
+    concurrent awaiters share a fixed set of threads:
+
+    - writes go to a single writer thread, which serializes them;
+    - reads go to ``max_readers`` threads, each reading from its own
+      read-only snapshot connection, so they run in parallel with each other
+      and with the writer under WAL.
+    """
+
+    def __init__(self, db: Database, max_readers: int = 4):
+        """Wrap ``db``. ``max_readers`` bounds the reader thread pool."""
+        self.db = db
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="axilium-writer")
+        self._readers = ThreadPoolExecutor(max_workers=max_readers, thread_name_prefix="axilium-reader")
+
+    async def _submit(self, executor: ThreadPoolExecutor, fn: Callable, *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, functools.partial(fn, *args, **kwargs))
+
+    def _in_snapshot(self, fn: Callable, *args, **kwargs) -> Any:
+        with self.db.snapshot():
+            return fn(*args, **kwargs)
+
+    # Habit operations
+    get_habit = _read("get_habit")
+    get_all_habits = _read("get_all_habits")
+    add_habit = _write("add_habit")
+    update_habit = _write("update_habit")
+    delete_habit = _write("delete_habit")
+
+    # Completion operations
+    get_completions = _read("get_completions")
+    get_completion_count = _read("get_completion_count")
+    get_completion_counts = _read("get_completion_counts")
+    get_completion_bitmaps = _read("get_completion_bitmaps")
+    get_period_completion_counts = _read("get_period_completion_counts")
+    is_completed = _read("is_completed")
+    add_completion = _write("add_completion")
+    complete_habit = _write("complete_habit")
+    uncomplete_habit = _write("uncomplete_habit")
+    add_completions_bulk = _write("add_completions_bulk")
+    archive_completions = _write("archive_completions")
+    expire_streaks = _write("expire_streaks")
+
+    # Reward operations
+    get_all_rewards = _read("get_all_rewards")
+    get_total_points = _read("get_total_points")
+    get_points_by_day = _read("get_points_by_day")
+    get_points_by_habit = _read("get_points_by_habit")
+    unlock_reward = _write("unlock_reward")
+    reset_reward = _write("reset_reward")
+
+    # Settings operations
+    get_setting = _read("get_setting")
+    set_setting = _write("set_setting")
+
+    async def run_read(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run ``fn(*args, **kwargs)`` on a reader thread inside a snapshot."""
+        return await self._submit(self._readers, self._in_snapshot, fn, *args, **kwargs)
+
+    async def run_write(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run ``fn(*args, **kwargs)`` on the writer thread inside one transaction."""
+        def in_transaction():
+            with self.db.transaction():
+                return fn(*args, **kwargs)
+        return await self._submit(self._writer, in_transaction)
+
+    async def close(self, close_db: bool = True):
+        """Wait for queued work to finish, stop the pools and optionally close ``db``."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._shutdown)
+        if close_db:
+            self.db.close()
+
+    def _shutdown(self):
+        self._writer.shutdown(wait=True)
+        self._readers.shutdown(wait=True)
+
+    async def __aenter__(self) -> "AsyncDatabase":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> Optional[bool]:
+        await self.close()
+        return None
@@ -0,0 +1,164 @@
+"""Per-year completion bitmaps.
+
+A habit's completions in one calendar year are stored as a 366-bit little
+endian bitmap, where bit ``n`` is day ``n`` of the year (January 1st is bit
+0). That is 46 bytes per habit per year, however many days are completed,
+and counting completions in any range within the year is a single popcount.
+Archived completions use a smaller per-month mask of the same shape.
+"""
+
+from datetime import date
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+
+
+YEAR_BITS = 366
+YEAR_BYTES = (YEAR_BITS + 7) // 8  # 46
+
+try:
+    _popcount = int.bit_count  # Python 3.10+
+except AttributeError:
+    def _popcount(value: int) -> int:
+        return bin(value).count("1")
+
+
+@lru_cache(maxsize=256)
+def year_start(year: int) -> int:
+    """Return the day ordinal of January 1st of ``year``."""
+    return date(year, 1, 1).toordinal()
+
+
+def day_position(day: int) -> Tuple[int, int]:
+    """Return the (year, bit) of a day ordinal."""
+    year = date.fromordinal(day).year
+    return year, day - year_start(year)
+
+
+def set_bit(bits: Optional[bytes], bit: int) -> bytes:
+    """Return ``bits`` (or an empty bitmap) with ``bit`` set."""
+    value = int.from_bytes(bits, "little") if bits else 0
+    return (value | (1 << bit)).to_bytes(YEAR_BYTES, "little")
+
+
+def clear_bit(bits: Optional[bytes], bit: int) -> bytes:
+    """Return ``bits`` (or an empty bitmap) with ``bit`` cleared."""
+    value = int.from_bytes(bits, "little") if bits else 0
+    return (value & ~(1 << bit)).to_bytes(YEAR_BYTES, "little")
+
+
+def test_bit(bits: Optional[bytes], bit: int) -> bool:
+    """Return whether ``bit`` is set."""
+    return bool(bits) and bool(bits[bit >> 3] & (1 << (bit & 7)))
+
+
+def merge(bits: Optional[bytes], other: bytes) -> bytes:
+    """Return the union of ``bits`` (or an empty bitmap) and ``other``."""
+    value = int.from_bytes(bits, "little") if bits else 0
+    return (value | int.from_bytes(other, "little")).to_bytes(YEAR_BYTES, "little")
+
+
+def count_bits(bits: bytes, first: int = 0, last: int = YEAR_BITS - 1) -> int:
+    """Count the set bits from ``first`` to ``last`` inclusive."""
+    value = int.from_bytes(bits, "little") >> first
+    value &= (1 << (last - first + 1)) - 1
+    return _popcount(value)
+
+
+def count_days(bitmaps: Iterable[Tuple[int, bytes]], start: Optional[int] = None, end: Optional[int] = None) -> int:
+    """Count completed days in an inclusive ordinal range over (year, bits) pairs.
+
+    The bitmaps may cover more years than the range; a ``None`` bound means
+    unbounded.
+    """
+    total = 0
+    for year, bits in bitmaps:
+        first_day = year_start(year)
+        first = 0 if start is None else max(start - first_day, 0)
+        last = YEAR_BITS - 1 if end is None else min(end - first_day, YEAR_BITS - 1)
+        if first <= last:
+            total += count_bits(bits, first, last)
+    return total
+
+
+def from_days(days: Iterable[int]) -> Dict[int, bytes]:
+    """Build the bitmaps of a set of day ordinals, keyed by year."""
+    values: Dict[int, int] = {}
+    for day in days:
+        year, bit = day_position(day)
+        values[year] = values.get(year, 0) | (1 << bit)
+    return {year: value.to_bytes(YEAR_BYTES, "little") for year, value in values.items()}
+
+
+def to_days(year: int, bits: bytes) -> List[int]:
+    """Return the day ordinals set in one year's bitmap, ascending."""
+    value = int.from_bytes(bits, "little")
+    first_day = year_start(year)
+    days = []
+    while value:
+        low = value & -value
+        days.append(first_day + low.bit_length() - 1)
+        value ^= low
+    return days
+
+
+def to_matrix(stored: Iterable[Tuple[int, int, bytes]], rows: Dict[int, int], start: int, days: int) -> np.ndarray:
+    """Decode ``(habit_id, year, bits)`` bitmaps into a boolean habits x days matrix.
+
+    ``rows`` maps habit ids to matrix rows (other habits are skipped) and
+    column ``j`` is day ordinal ``start + j``. Each year is decoded with one
+    ``unpackbits`` over all of its bitmaps.
+    """
+    matrix = np.zeros((len(rows), max(days, 0)), dtype=bool)
+    by_year: Dict[int, Tuple[List[int], List[bytes]]] = {}
+    for habit_id, year, bits in stored:
+        row = rows.get(habit_id)
+        if row is not None:
+            year_rows, blobs = by_year.setdefault(year, ([], []))
+            year_rows.append(row)
+            blobs.append(bits)
+
+    for year, (year_rows, blobs) in by_year.items():
+        bits = np.unpackbits(
+            np.frombuffer(b"".join(blobs), dtype=np.uint8).reshape(len(blobs), YEAR_BYTES),
+            axis=1, bitorder="little"
+        )
+        offset = year_start(year) - start
+        lo, hi = max(0, -offset), min(year_start(year + 1) - year_start(year), days - offset)
+        if lo < hi:
+            matrix[year_rows, offset + lo:offset + hi] = bits[:, lo:hi]
+    return matrix
+
+
+# Per-month masks, used by the completions archive: month ``year * 12 +
+# month - 1`` has bit ``n`` set if day ``n + 1`` of the month was completed.
+
+def month_position(day: int) -> Tuple[int, int]:
+    """Return the (month, bit) of a day ordinal."""
+    d = date.fromordinal(day)
+    return d.year * 12 + d.month - 1, d.day - 1
+
+
+def month_start(month: int) -> int:
+    """Return the day ordinal of the first day of ``month``."""
+    return date(month // 12, month % 12 + 1, 1).toordinal()
+
+
+def months_from_days(days: Iterable[int]) -> Dict[int, int]:
+    """Build the month masks of a set of day ordinals, keyed by month."""
+    masks: Dict[int, int] = {}
+    for day in days:
+        month, bit = month_position(day)
+        masks[month] = masks.get(month, 0) | (1 << bit)
+    return masks
+
+
+def month_days(month: int, mask: int) -> List[int]:
+    """Return the day ordinals set in one month's mask, ascending."""
+    first_day = month_start(month)
+    days = []
+    while mask:
+        low = mask & -mask
+        days.append(first_day + low.bit_length() - 1)
+        mask ^= low
+    return days
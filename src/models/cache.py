@@ -0,0 +1,105 @@
+"""In-process caches for database objects."""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+from .habit import Habit
+
+
+class HabitCache:
+    """Identity map of Habit objects keyed by id.
+
+    Each habit id maps to at most one live ``Habit`` object, and reads hand
+    out that same object, so callers always see the latest state written
+    through ``Database``. The full habit listing is cached as an ordered id
+    list alongside the map. With ``max_size`` set, the least recently used
+    habits are evicted once the bound is exceeded.
+    """
+
+    def __init__(self, max_size: Optional[int] = None):
+        """Initialize an empty cache. ``max_size=None`` means unbounded."""
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._habits: "OrderedDict[int, Habit]" = OrderedDict()
+        self._listing: Optional[List[int]] = None
+        self._lock = threading.Lock()
+
+    def get(self, habit_id: int) -> Optional[Habit]:
+        """Return the cached habit, or None on a miss."""
+        with self._lock:
+            habit = self._habits.get(habit_id)
+            if habit is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._habits.move_to_end(habit_id)
+            return habit
+
+    def get_all(self) -> Optional[List[Habit]]:
+        """Return the cached habit listing, or None if it is not cached."""
+        with self._lock:
+            if self._listing is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return [self._habits[habit_id] for habit_id in self._listing]
+
+    def put(self, habit: Habit) -> Habit:
+        """Cache ``habit`` and return the canonical object for its id.
+
+        If the id is already cached, the cached object is updated in place
+        from ``habit`` and returned, preserving identity.
+        """
+        with self._lock:
+            return self._put(habit)
+
+    def put_all(self, habits: Iterable[Habit]) -> List[Habit]:
+        """Cache a complete, ordered habit listing and return canonical objects."""
+        with self._lock:
+            habits = [self._put(habit) for habit in habits]
+            if self.max_size is None or len(habits) <= self.max_size:
+                self._listing = [habit.id for habit in habits]
+            return habits
+
+    def _put(self, habit: Habit) -> Habit:
+        cached = self._habits.get(habit.id)
+        if cached is None:
+            self._habits[habit.id] = habit
+            cached = habit
+        elif cached is not habit:
+            cached.__dict__.update(habit.__dict__)
+        self._habits.move_to_end(habit.id)
+
+        if self.max_size is not None:
+            while len(self._habits) > self.max_size:
+                self._habits.popitem(last=False)
+                self._listing = None
+        return cached
+
+    def discard(self, habit_id: int):
+        """Drop a habit, e.g. after it was deleted."""
+        with self._lock:
+            self._habits.pop(habit_id, None)
+            self._listing = None
+
+    def invalidate_listing(self):
+        """Forget the cached listing after habits were added or removed."""
+        with self._lock:
+            self._listing = None
+
+    def clear(self):
+        """Drop everything, keeping the hit/miss counters."""
+        with self._lock:
+            self._habits.clear()
+            self._listing = None
+
+    def stats(self) -> Dict[str, Optional[int]]:
+        """Return hit/miss counters and current size for tuning ``max_size``."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._habits),
+                "max_size": self.max_size,
+            }
@@ -0,0 +1,316 @@
+"""Memory-mapped completion index kept next to the database file.
+
+The index is a read-optimized copy of what the UI asks for most: per-habit
+counters and the completion bitmaps of the last few years. It is a flat file
+of fixed-width little-endian records opened with ``mmap``, so answering a
+count reads a few dozen bytes straight from the page cache without touching
+SQLite or parsing anything.
+
+Layout::
+
+    header   magic, format version, first year, years per record,
+             event seq, total points, record count
+    record   habit id (0 = free slot), streak, longest streak, last completed
+             day, completion count, points, then one 46-byte bitmap per year
+
+The header's event seq is the database's persistent data version (every
+write through ``Database`` appends an event). The index is trusted only
+while that seq matches the database; otherwise it is rebuilt.
+"""
+
+import mmap
+import os
+import struct
+import threading
+from datetime import date
+from typing import Iterable, List, Optional, Tuple
+from . import bitmaps
+from .habit import Habit
+
+
+# Years of bitmaps per habit, ending with the current year
+INDEX_YEARS = 4
+
+_MAGIC = b"AXILIDX1"
+_FORMAT_VERSION = 1
+_HEADER = struct.Struct("<8sIIIqqI")  # magic, version, first_year, years, seq, total_points, records
+_RECORD = struct.Struct("<qIIIIq")  # habit_id, streak, longest, last_day, count, points
+_RECORD_HEAD = 40  # _RECORD padded to 8 bytes
+_GROW_BY = 16  # free slots added when the file runs out of records
+
+
+class CompletionIndex:
+    """Fixed-width, memory-mapped per-habit completion bitmaps and counters.
+
+    Readers get None whenever the index cannot answer (not loaded, habit
+    unknown, range outside the indexed years) and should fall back to the
+    database. All methods are thread-safe.
+    """
+
+    def __init__(self, path: str, years: int = INDEX_YEARS):
+        """Initialize the index for ``path``. Nothing is opened yet."""
+        self.path = path
+        self.years = years
+        self.first_year = 0
+        self.seq = -1
+        self._record_size = _RECORD_HEAD + years * bitmaps.YEAR_BYTES
+        self._file = None
+        self._map: Optional[mmap.mmap] = None
+        self._offsets = {}
+        self._free: List[int] = []
+        self._lock = threading.RLock()
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the index is mapped and matches some database state."""
+        return self._map is not None and self.seq >= 0
+
+    # Opening and building
+    def open(self, expected_seq: int, year: int) -> bool:
+        """Map an existing index file if it is current. Returns whether it was."""
+        with self._lock:
+            self._close_map()
+            try:
+                self._map_file()
+            except (OSError, ValueError):
+                self._close_map()
+                return False
+            magic, version, first_year, years, seq, _, _ = _HEADER.unpack_from(self._map, 0)
+            current = (
+                magic == _MAGIC and version == _FORMAT_VERSION and years == self.years
+                and seq == expected_seq and first_year + years - 1 >= year
+            )
+            if not current:
+                self._close_map()
+                return False
+            self.first_year = first_year
+            self.seq = seq
+            self._scan()
+            return True
+
+    def build(self, records: Iterable[Tuple[Habit, List[int], int]], seq: int, year: int):
+        """Write a fresh index for ``seq`` and map it.
+
+        ``records`` yields (habit, completed days within the indexed years,
+        total completion count) per habit. The file is written to a temporary
+        path and swapped in, so readers of an older copy never see a partial
+        file.
+        """
+        first_year = year - self.years + 1
+        body = bytearray()
+        total_points = 0
+        count = 0
+        for habit, days, completions in records:
+            body += self._pack_record(habit, completions)
+            body[-self._record_size + _RECORD_HEAD:] = self._pack_bitmaps(days, first_year)
+            total_points += habit.reward_points
+            count += 1
+        body += bytes(self._record_size * _GROW_BY)
+        header = _HEADER.pack(_MAGIC, _FORMAT_VERSION, first_year, self.years, seq, total_points,
+                              count + _GROW_BY)
+
+        with self._lock:
+            self._close_map()
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "wb") as f:
+                f.write(header.ljust(self._header_size, b"\0"))
+                f.write(body)
+            os.replace(temp_path, self.path)
+            self._map_file()
+            self.first_year = first_year
+            self.seq = seq
+            self._scan()
+
+    def invalidate(self):
+        """Stop serving reads until the index is rebuilt."""
+        with self._lock:
+            self.seq = -1
+            if self._map is not None:
+                self._write_seq(-1)
+
+    def close(self):
+        """Flush and unmap the index."""
+        with self._lock:
+            self._close_map()
+
+    @property
+    def _header_size(self) -> int:
+        # Records start 8-byte aligned
+        return (_HEADER.size + 7) // 8 * 8
+
+    def _map_file(self):
+        self._file = open(self.path, "r+b")
+        self._map = mmap.mmap(self._file.fileno(), 0)
+
+    def _close_map(self):
+        if self._map is not None:
+            self._map.flush()
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._offsets = {}
+        self._free = []
+
+    def _scan(self):
+        """Locate every record by habit id."""
+        records = _HEADER.unpack_from(self._map, 0)[6]
+        self._offsets = {}
+        self._free = []
+        for i in range(records):
+            offset = self._header_size + i * self._record_size
+            habit_id = struct.unpack_from("<q", self._map, offset)[0]
+            if habit_id:
+                self._offsets[habit_id] = offset
+            else:
+                self._free.append(offset)
+
+    def _pack_record(self, habit: Habit, completions: int) -> bytes:
+        last_day = habit.last_completed_date.toordinal() if habit.last_completed_date else 0
+        head = _RECORD.pack(habit.id, habit.streak_count, habit.longest_streak, last_day,
+                            completions, habit.reward_points)
+        return head.ljust(self._record_size, b"\0")
+
+    def _pack_bitmaps(self, days: Iterable[int], first_year: int) -> bytes:
+        by_year = bitmaps.from_days(days)
+        return b"".join(
+            by_year.get(first_year + i, bytes(bitmaps.YEAR_BYTES)) for i in range(self.years)
+        )
+
+    # Reads
+    def count(self, habit_id: int, start: Optional[int] = None, end: Optional[int] = None) -> Optional[int]:
+        """Count a habit's completions in an inclusive day range."""
+        with self._lock:
+            offset = self._offsets.get(habit_id) if self.loaded else None
+            if offset is None:
+                return None
+            if start is None and end is None:
+                return _RECORD.unpack_from(self._map, offset)[4]
+            if start is None or end is None:
+                return None
+            first_year = date.fromordinal(start).year
+            last_year = date.fromordinal(end).year
+            if first_year < self.first_year or last_year >= self.first_year + self.years:
+                return None
+            return bitmaps.count_days(
+                [(year, self._bitmap(offset, year)) for year in range(first_year, last_year + 1)],
+                start, end
+            )
+
+    def is_completed(self, habit_id: int, day: int) -> Optional[bool]:
+        """Test one day's bit."""
+        with self._lock:
+            offset = self._offsets.get(habit_id) if self.loaded else None
+            year, bit = bitmaps.day_position(day)
+            if offset is None or not self.first_year <= year < self.first_year + self.years:
+                return None
+            return bitmaps.test_bit(self._bitmap(offset, year), bit)
+
+    def total_points(self) -> Optional[int]:
+        """Return the points total across all habits."""
+        with self._lock:
+            return _HEADER.unpack_from(self._map, 0)[5] if self.loaded else None
+
+    def _bitmap(self, offset: int, year: int) -> bytes:
+        start = offset + _RECORD_HEAD + (year - self.first_year) * bitmaps.YEAR_BYTES
+        return self._map[start:start + bitmaps.YEAR_BYTES]
+
+    # Incremental patches
+    def apply(self, patches: List[tuple], base_seq: int, seq: int) -> bool:
+        """Apply the patches of one committed transaction.
+
+        ``base_seq`` is the event seq the transaction started from and
+        ``seq`` the one it ended at. Patches are applied only on top of
+        exactly ``base_seq``; otherwise another commit was missed and the
+        index is invalidated instead. Returns whether the patches applied.
+
+        Patches are ``("completion", habit, day, completed)``,
+        ``("counters", habit)``, ``("record", habit, days, count)`` and
+        ``("drop", habit_id)``; days are ordinals.
+        """
+        with self._lock:
+            if not self.loaded or self.seq != base_seq:
+                self.invalidate()
+                return False
+            # A crash mid-patch leaves seq -1 behind, forcing a rebuild
+            self._write_seq(-1)
+            for patch in patches:
+                if not getattr(self, "_patch_" + patch[0])(*patch[1:]):
+                    self.invalidate()
+                    return False
+            self.seq = seq
+            self._write_seq(seq)
+            return True
+
+    def _patch_completion(self, habit: Habit, day: int, completed: bool) -> bool:
+        offset = self._offsets.get(habit.id)
+        if offset is None:
+            return False
+        year, bit = bitmaps.day_position(day)
+        if self.first_year <= year < self.first_year + self.years:
+            start = offset + _RECORD_HEAD + (year - self.first_year) * bitmaps.YEAR_BYTES
+            bits = self._map[start:start + bitmaps.YEAR_BYTES]
+            self._map[start:start + bitmaps.YEAR_BYTES] = (
+                bitmaps.set_bit(bits, bit) if completed else bitmaps.clear_bit(bits, bit)
+            )
+        count = _RECORD.unpack_from(self._map, offset)[4] + (1 if completed else -1)
+        return self._write_counters(offset, habit, count)
+
+    def _patch_counters(self, habit: Habit) -> bool:
+        offset = self._offsets.get(habit.id)
+        if offset is None:
+            return False
+        return self._write_counters(offset, habit, _RECORD.unpack_from(self._map, offset)[4])
+
+    def _patch_record(self, habit: Habit, days: List[int], count: int) -> bool:
+        offset = self._offsets.get(habit.id)
+        if offset is None:
+            if not self._free:
+                self._grow()
+            offset = self._free.pop(0)
+        else:
+            self._add_points(-_RECORD.unpack_from(self._map, offset)[5])
+        self._map[offset:offset + self._record_size] = self._pack_record(habit, count)
+        self._map[offset + _RECORD_HEAD:offset + self._record_size] = self._pack_bitmaps(days, self.first_year)
+        self._offsets[habit.id] = offset
+        self._add_points(habit.reward_points)
+        return True
+
+    def _patch_drop(self, habit_id: int) -> bool:
+        offset = self._offsets.pop(habit_id, None)
+        if offset is not None:
+            self._add_points(-_RECORD.unpack_from(self._map, offset)[5])
+            self._map[offset:offset + self._record_size] = bytes(self._record_size)
+            self._free.append(offset)
+        return True
+
+    def _write_counters(self, offset: int, habit: Habit, count: int) -> bool:
+        old_points = _RECORD.unpack_from(self._map, offset)[5]
+        last_day = habit.last_completed_date.toordinal() if habit.last_completed_date else 0
+        _RECORD.pack_into(self._map, offset, habit.id, habit.streak_count, habit.longest_streak,
+                          last_day, count, habit.reward_points)
+        self._add_points(habit.reward_points - old_points)
+        return True
+
+    def _add_points(self, delta: int):
+        header = list(_HEADER.unpack_from(self._map, 0))
+        header[5] += delta
+        _HEADER.pack_into(self._map, 0, *header)
+
+    def _write_seq(self, seq: int):
+        header = list(_HEADER.unpack_from(self._map, 0))
+        header[4] = seq
+        _HEADER.pack_into(self._map, 0, *header)
+
+    def _grow(self):
+        """Append ``_GROW_BY`` free records, remapping the file."""
+        header = list(_HEADER.unpack_from(self._map, 0))
+        first_new = self._header_size + header[6] * self._record_size
+        header[6] += _GROW_BY
+        _HEADER.pack_into(self._map, 0, *header)
+        self._map.flush()
+        self._map.close()
+        self._file.truncate(self._header_size + header[6] * self._record_size)
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        self._free.extend(first_new + i * self._record_size for i in range(_GROW_BY))
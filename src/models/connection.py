@@ -0,0 +1,120 @@
+"""SQLite connection management for Axilium."""
+
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+
+# Pragmas applied to every connection. WAL lets readers run alongside the
+# writer, and synchronous=NORMAL only fsyncs at checkpoints instead of on
+# every commit, which is safe in WAL mode.
+DEFAULT_PRAGMAS: Dict[str, Union[str, int]] = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "foreign_keys": "ON",
+    "busy_timeout": 5000,  # milliseconds
+    "cache_size": -8000,  # negative values are KiB
+    "mmap_size": 64 * 1024 * 1024,
+    "temp_store": "MEMORY",
+}
+
+
+class ConnectionManager:
+    """Hands out one SQLite connection per thread.
+
+    Each thread gets its own connection the first time it asks for one, so
+    the Tk thread and the reminder thread never share a connection object.
+    Connections owned by threads that have exited are closed the next time a
+    new connection is opened. With ``read_only=True`` connections are opened
+    through a ``mode=ro`` URI and can never write.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        pragmas: Optional[Dict[str, Union[str, int]]] = None,
+        row_factory: Optional[Callable] = None,
+        read_only: bool = False,
+        functions: Optional[Dict[str, Tuple[int, Callable]]] = None
+    ):
+        """Initialize the manager. Pragmas override ``DEFAULT_PRAGMAS``.
+
+        ``functions`` maps SQL function names to ``(arg_count, callable)``
+        and is registered on every connection as deterministic functions.
+        """
+        self.db_path = db_path
+        self.pragmas = dict(DEFAULT_PRAGMAS)
+        if pragmas:
+            self.pragmas.update(pragmas)
+        self.row_factory = row_factory
+        self.read_only = read_only
+        self.functions = dict(functions or {})
+        if read_only:
+            # The journal mode is a property of the file, set by writers
+            self.pragmas.pop("journal_mode", None)
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[Tuple[threading.Thread, sqlite3.Connection]] = []
+
+    def get(self) -> sqlite3.Connection:
+        """Get the calling thread's connection, opening it if needed."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._open()
+            self._local.conn = conn
+        return conn
+
+    def _open(self) -> sqlite3.Connection:
+        """Open and configure a new connection for the calling thread."""
+        # check_same_thread=False only so close_all() can run from any thread;
+        # each connection is still used exclusively by its owner.
+        if self.read_only:
+            uri = Path(self.db_path).resolve().as_uri() + "?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        else:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        if self.row_factory is not None:
+            conn.row_factory = self.row_factory
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        for name, (arg_count, function) in self.functions.items():
+            conn.create_function(name, arg_count, function, deterministic=True)
+
+        with self._lock:
+            self._reap_dead_threads()
+            self._connections.append((threading.current_thread(), conn))
+        return conn
+
+    def _reap_dead_threads(self):
+        """Close connections whose owning thread has exited."""
+        alive = []
+        for thread, conn in self._connections:
+            if thread.is_alive():
+                alive.append((thread, conn))
+            else:
+                conn.close()
+        self._connections = alive
+
+    def release(self):
+        """Close the calling thread's connection, if it has one."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            return
+        self._local.conn = None
+        with self._lock:
+            self._connections = [(t, c) for t, c in self._connections if c is not conn]
+        conn.close()
+
+    def close_all(self):
+        """Close every connection opened by this manager."""
+        with self._lock:
+            for _, conn in self._connections:
+                conn.close()
+            self._connections = []
+        self._local = threading.local()
+
+    def pragma(self, name: str):
+        """Read a pragma value from the calling thread's connection."""
+        return self.get().execute(f"PRAGMA {name}").fetchone()[0]
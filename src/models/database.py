@@ -1,333 +1,596 @@
-"""SQLite database operations for Axilium."""
+"""Database operations for Axilium."""
 
-import sqlite3
-import os
-from datetime import datetime, date
-from typing import List, Optional
+import threading
+from contextlib import contextmanager
+from datetime import MAXYEAR, MINYEAR, datetime, date
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+from . import events
+from .cache import HabitCache
+from .completion_index import INDEX_YEARS, CompletionIndex
+from .events import Event, EventLog, habit_fields
 from .habit import Habit
+from .migrations import RUNS_VERSION
+from .prefix_sums import PrefixSums
 from .reward import Reward
-from ..utils.constants import DB_PATH, POINTS_PER_COMPLETION
+from .settings import SettingsStore
+from .storage.base import StorageBackend, streaks
+from .storage.sqlite import SQLiteBackend
+from ..utils.constants import ARCHIVE_HORIZON_DAYS, DB_PATH, POINTS_PER_COMPLETION
 
 
 class Database:
     """Manages database operations for Axilium."""
     
-    def __init__(self, db_path: str = DB_PATH):
-        """Initialize database connection."""
-        # Ensure data directory exists
-        os.makedirs(os.path.dirname(db_path), exist_ok=True)
-        
-        self.db_path = db_path
-        self.conn = sqlite3.connect(db_path, check_same_thread=False)
-        self.conn.row_factory = sqlite3.Row
-        self._create_tables()
-        self._initialize_default_rewards()
-    
-    def _create_tables(self):
-        """Create database tables if they don't exist."""
-        cursor = self.conn.cursor()
-        
-        # Habits table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS habits (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                description TEXT,
-                category TEXT NOT NULL,
-                color TEXT NOT NULL,
-                icon TEXT NOT NULL,
-                frequency TEXT NOT NULL,
-                streak_count INTEGER DEFAULT 0,
-                longest_streak INTEGER DEFAULT 0,
-                created_date TEXT NOT NULL,
-                last_completed_date TEXT,
-                goal_days_per_week INTEGER DEFAULT 7,
-                goal_days_per_month INTEGER DEFAULT 30,
-                reward_points INTEGER DEFAULT 0,
-                reminder_time TEXT,
-                reminder_enabled INTEGER DEFAULT 0
-            )
-        """)
-        
-        # Completions table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS completions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                habit_id INTEGER NOT NULL,
-                completion_date TEXT NOT NULL,
-                FOREIGN KEY (habit_id) REFERENCES habits(id) ON DELETE CASCADE
-            )
-        """)
-        
-        # Rewards table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS rewards (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                description TEXT,
-                points_required INTEGER NOT NULL,
-                unlocked_date TEXT,
-                icon TEXT NOT NULL,
-                image_path TEXT
-            )
-        """)
-        
-        # Settings table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS settings (
-                key TEXT PRIMARY KEY,
-                value TEXT NOT NULL
-            )
-        """)
-        
-        # Create indexes
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_completions_habit_date ON completions(habit_id, completion_date)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_completions_date ON completions(completion_date)")
-        
-        self.conn.commit()
-    
-    def _initialize_default_rewards(self):
-        """Initialize default rewards if they don't exist."""
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM rewards")
-        if cursor.fetchone()[0] == 0:
-            from .reward import DEFAULT_REWARDS
-            for reward in DEFAULT_REWARDS:
-                cursor.execute("""
-                    INSERT INTO rewards (name, description, points_required, unlocked_date, icon, image_path)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (
-                    reward.name,
-                    reward.description,
-                    reward.points_required,
-                    reward.unlocked_date.isoformat() if reward.unlocked_date else None,
-                    reward.icon,
-                    reward.image_path
-                ))
-            self.conn.commit()
+    def __init__(
+        self,
+        db_path: str = DB_PATH,
+        pragmas: Optional[Dict[str, Union[str, int]]] = None,
+        habit_cache_size: Optional[int] = None,
+        backend: Optional[StorageBackend] = None
+    ):
+        """Initialize the database.
+        
+        Data is stored by ``backend``; by default a ``SQLiteBackend`` for the
+        file at ``db_path``, with ``pragmas`` overriding its connection
+        defaults (e.g. ``{"synchronous": "FULL", "mmap_size": 0}``). Pass
+        ``backend=MemoryBackend()`` for a throwaway in-memory database.
+        ``habit_cache_size`` bounds the habit identity map (unbounded if None).
+        
+        ``data_version`` starts at 0 and goes up every time a write commits,
+        so anything derived from the data can be cached against it; callbacks
+        registered with ``subscribe`` hear about each commit's events.
+        
+        Backends stored in a file (those with a ``db_path``) get a
+        ``CompletionIndex`` sidecar at ``<db_path>.idx``, which serves
+        completion counts and the points total without querying storage.
+        Counts over any window come from in-memory ``PrefixSums``, built on a
+        background thread after the first count and patched on every commit
+        after that; until they are built, counts come from the index or
+        storage.
+        """
+        if backend is None:
+            backend = SQLiteBackend(db_path, pragmas)
+        self.backend = backend
+        self._local = threading.local()
+        self._version_lock = threading.Lock()
+        self._data_version = 0
+        self._subscribers: List[Callable[[Optional[List[Event]], int], None]] = []
+        self.habit_cache = HabitCache(habit_cache_size)
+        self.settings = SettingsStore(self)
+        self.index: Optional[CompletionIndex] = None
+        self.sums = PrefixSums()
+        self._sums_lock = threading.Lock()
+        self._sums_thread: Optional[threading.Thread] = None
+        self.events = EventLog(self)
+        self.events.ensure_snapshot()
+        
+        backend_path = getattr(backend, "db_path", None)
+        if backend_path:
+            self.index = CompletionIndex(backend_path + ".idx")
+            if not self.index.open(backend.last_event_seq(), date.today().year):
+                self._rebuild_index()
+        
+        # Streaks stored before the run index existed were never checked against it
+        if getattr(backend, "migrated_from", RUNS_VERSION) < RUNS_VERSION:
+            self.rebuild_streaks()
+    
+    @property
+    def data_version(self) -> int:
+        """Monotonic counter of committed writes made through this database."""
+        return self._data_version
+    
+    def bump_data_version(self):
+        """Mark derived data stale after a change made outside ``transaction()``."""
+        self._publish(None)
+    
+    def subscribe(self, callback: Callable[[Optional[List[Event]], int], None]) -> Callable[[], None]:
+        """Call ``callback(events, data_version)`` after every commit. Returns an unsubscribe function.
+        
+        ``events`` are the commit's events in order, or None for a change
+        made outside the event log, after which anything derived from the
+        data should be rebuilt. Callbacks run on the committing thread; with
+        several writer threads they may arrive out of version order.
+        """
+        with self._version_lock:
+            self._subscribers.append(callback)
+        
+        def unsubscribe():
+            with self._version_lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+        
+        return unsubscribe
+    
+    def _publish(self, committed: Optional[List[Event]]):
+        """Bump ``data_version`` and tell subscribers what changed."""
+        with self._version_lock:
+            self._data_version += 1
+            version = self._data_version
+            callbacks = list(self._subscribers)
+        for callback in callbacks:
+            callback(committed, version)
+    
+    @contextmanager
+    def snapshot(self) -> Iterator[None]:
+        """Run reads against a consistent snapshot of the database.
+        
+        Inside the block, every read method on this thread sees the same
+        committed point in time; with SQLite that is a second, ``mode=ro``
+        connection holding one read transaction, which in WAL mode never
+        blocks, and is never blocked by, the writer. Habit reads bypass the
+        identity map so they match the snapshot, and are cached for the
+        lifetime of the snapshot instead. Nested calls reuse the outer
+        snapshot.
+        """
+        if getattr(self._local, "in_snapshot", False):
+            yield
+            return
+        
+        with self.backend.snapshot():
+            self._local.in_snapshot = True
+            self._local.snapshot_habits = None
+            # The index and sums can serve this snapshot only if at the same seq
+            self._local.snapshot_seq = self.backend.last_event_seq()
+            try:
+                yield
+            finally:
+                self._local.in_snapshot = False
+                self._local.snapshot_habits = None
+    
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Group writes into one transaction that commits once at the end.
+        
+        Every mutating method runs inside ``transaction()``, so wrapping
+        several calls in an outer ``with db.transaction():`` block turns their
+        individual commits into a single one. Nested blocks become savepoints:
+        an exception rolls back only the innermost block and propagates.
+        
+        Index and prefix sum patches queued by the block are applied once the
+        outermost transaction commits, and discarded with any block that rolls back.
+        A commit that recorded events also bumps ``data_version`` and is
+        published to subscribers.
+        """
+        depth = getattr(self._local, "tx_depth", 0)
+        if depth == 0:
+            self._local.index_patches = []
+            self._local.committed_events = []
+            self._local.seq_range = None
+        mark = (len(self._local.index_patches), len(self._local.committed_events), self._local.seq_range)
+        
+        self._local.tx_depth = depth + 1
+        try:
+            with self.backend.transaction():
+                yield
+        except BaseException:
+            # Cached objects may hold writes that were just undone
+            self.habit_cache.clear()
+            self.settings.invalidate()
+            del self._local.index_patches[mark[0]:]
+            del self._local.committed_events[mark[1]:]
+            self._local.seq_range = mark[2]
+            raise
+        finally:
+            self._local.tx_depth = depth
+        
+        if depth == 0 and self._local.seq_range is not None:
+            base_seq, seq = self._local.seq_range
+            if self.index is not None:
+                self.index.apply(self._local.index_patches, base_seq, seq)
+            self.sums.apply(self._local.index_patches, base_seq, seq)
+            self._publish(self._local.committed_events)
+    
+    def _record(self, kind: str, habit_id: Optional[int] = None, day: Optional[int] = None, **payload):
+        """Append an event and track the seq range the transaction covers."""
+        seq = self.events.append(kind, habit_id, day, **payload)
+        self._local.committed_events.append(Event(seq, kind, habit_id, day, payload))
+        seq_range = self._local.seq_range
+        self._local.seq_range = (seq - 1 if seq_range is None else seq_range[0], seq)
+    
+    def _patch_index(self, *patch):
+        """Queue an index and prefix sum patch for when the transaction commits."""
+        self._local.index_patches.append(patch)
+    
+    def _index_for_read(self) -> Optional[CompletionIndex]:
+        """Return the index if it may answer reads on this thread right now."""
+        index = self.index
+        if index is None or getattr(self._local, "tx_depth", 0):
+            return None  # uncommitted writes are not in the index yet
+        if getattr(self._local, "in_snapshot", False):
+            return index if index.seq == self._local.snapshot_seq else None
+        if not index.loaded:
+            self._rebuild_index()
+        return index if index.loaded else None
+    
+    def _sums_for_read(self) -> Optional[PrefixSums]:
+        """Return the prefix sums if they may answer reads on this thread right now.
+        
+        Sums that are not built yet start building in the background, and
+        the read falls back to the index or storage meanwhile.
+        """
+        sums = self.sums
+        if getattr(self._local, "tx_depth", 0):
+            return None  # uncommitted writes are not in the sums yet
+        if getattr(self._local, "in_snapshot", False):
+            return sums if sums.seq == self._local.snapshot_seq else None
+        if not sums.loaded:
+            self.build_sums(wait=False)
+        return sums if sums.loaded else None
+    
+    def build_sums(self, wait: bool = True):
+        """Build the prefix sums on a background thread unless they are built or building.
+        
+        With ``wait``, block until that build finishes.
+        """
+        with self._sums_lock:
+            thread = self._sums_thread
+            if thread is None or not thread.is_alive():
+                if self.sums.loaded:
+                    return
+                thread = self._sums_thread = threading.Thread(target=self._rebuild_sums, daemon=True)
+                thread.start()
+        if wait:
+            thread.join()
+    
+    def _rebuild_sums(self):
+        """Rebuild the prefix sums from every stored completion bitmap."""
+        backend = self.backend
+        with self.snapshot():
+            seq = backend.last_event_seq()
+            habit_ids = [habit.id for habit in backend.fetch_habits()]
+            stored = backend.completion_bitmaps(MINYEAR, MAXYEAR)
+        self.sums.build(habit_ids, stored, seq, date.today().year)
+        # A write that committed meanwhile could not patch the new sums
+        if backend.last_event_seq() != seq:
+            self.sums.invalidate()
+    
+    def _rebuild_index(self):
+        """Rebuild the sidecar index from storage."""
+        backend = self.backend
+        index = self.index
+        year = date.today().year
+        first = date(year - index.years + 1, 1, 1).toordinal()
+        last = date(year, 12, 31).toordinal()
+        with self.snapshot():
+            seq = backend.last_event_seq()
+            records = [
+                (habit, backend.completion_days(habit.id, first, last), backend.count_completions(habit.id))
+                for habit in backend.fetch_habits()
+            ]
+        index.build(records, seq, year)
+        # A write that committed meanwhile could not patch the new file
+        if backend.last_event_seq() != seq:
+            index.invalidate()
+    
+    def _index_record(self, habit_id: int) -> tuple:
+        """Build a full index record patch for a habit from storage."""
+        year = date.today().year
+        years = self.index.years if self.index is not None else INDEX_YEARS
+        days = self.backend.completion_days(
+            habit_id, date(year - years + 1, 1, 1).toordinal(), date(year, 12, 31).toordinal()
+        )
+        return ("record", self.backend.fetch_habit(habit_id), days, self.backend.count_completions(habit_id))
     
     # Habit operations
     def add_habit(self, habit: Habit) -> int:
         """Add a new habit and return its ID."""
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            INSERT INTO habits (name, description, category, color, icon, frequency,
-                              streak_count, longest_streak, created_date, last_completed_date,
-                              goal_days_per_week, goal_days_per_month, reward_points,
-                              reminder_time, reminder_enabled)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            habit.name, habit.description, habit.category, habit.color, habit.icon,
-            habit.frequency, habit.streak_count, habit.longest_streak,
-            habit.created_date.isoformat(),
-            habit.last_completed_date.isoformat() if habit.last_completed_date else None,
-            habit.goal_days_per_week, habit.goal_days_per_month, habit.reward_points,
-            habit.reminder_time, 1 if habit.reminder_enabled else 0
-        ))
-        self.conn.commit()
-        return cursor.lastrowid
+        with self.transaction():
+            habit_id = self.backend.insert_habit(habit)
+            self._record(events.HABIT_CREATED, habit_id, **habit_fields(habit))
+            self._patch_index(*self._index_record(habit_id))
+        self.habit_cache.invalidate_listing()
+        return habit_id
     
     def get_habit(self, habit_id: int) -> Optional[Habit]:
         """Get a habit by ID."""
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM habits WHERE id = ?", (habit_id,))
-        row = cursor.fetchone()
-        if row:
-            return self._row_to_habit(row)
-        return None
+        in_snapshot = getattr(self._local, "in_snapshot", False)
+        if in_snapshot:
+            for habit in self._local.snapshot_habits or ():
+                if habit.id == habit_id:
+                    return habit
+        else:
+            habit = self.habit_cache.get(habit_id)
+            if habit is not None:
+                return habit
+        
+        habit = self.backend.fetch_habit(habit_id)
+        if habit is None or in_snapshot:
+            return habit
+        return self.habit_cache.put(habit)
     
     def get_all_habits(self) -> List[Habit]:
         """Get all habits."""
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM habits ORDER BY created_date DESC")
-        return [self._row_to_habit(row) for row in cursor.fetchall()]
+        in_snapshot = getattr(self._local, "in_snapshot", False)
+        if in_snapshot:
+            habits = self._local.snapshot_habits
+        else:
+            habits = self.habit_cache.get_all()
+        if habits is not None:
+            return list(habits)
+        
+        habits = self.backend.fetch_habits()
+        if in_snapshot:
+            self._local.snapshot_habits = habits
+            return list(habits)
+        return self.habit_cache.put_all(habits)
     
     def update_habit(self, habit: Habit):
         """Update an existing habit."""
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            UPDATE habits SET name = ?, description = ?, category = ?, color = ?, icon = ?,
-                            frequency = ?, streak_count = ?, longest_streak = ?,
-                            last_completed_date = ?, goal_days_per_week = ?,
-                            goal_days_per_month = ?, reward_points = ?, reminder_time = ?,
-                            reminder_enabled = ?
-            WHERE id = ?
-        """, (
-            habit.name, habit.description, habit.category, habit.color, habit.icon,
-            habit.frequency, habit.streak_count, habit.longest_streak,
-            habit.last_completed_date.isoformat() if habit.last_completed_date else None,
-            habit.goal_days_per_week, habit.goal_days_per_month, habit.reward_points,
-            habit.reminder_time, 1 if habit.reminder_enabled else 0, habit.id
-        ))
-        self.conn.commit()
+        with self.transaction():
+            stored = self.backend.update_habit(habit, date.today().toordinal())
+            if stored:
+                self._record(events.HABIT_EDITED, habit.id, **habit_fields(stored))
+                self._patch_index("counters", stored)
+        # Refresh the cached object from what was actually stored
+        if stored:
+            self.habit_cache.put(stored)
     
     def delete_habit(self, habit_id: int):
         """Delete a habit and its completions."""
-        cursor = self.conn.cursor()
-        cursor.execute("DELETE FROM habits WHERE id = ?", (habit_id,))
-        self.conn.commit()
-    
-    def _row_to_habit(self, row) -> Habit:
-        """Convert database row to Habit object."""
-        return Habit(
-            id=row["id"],
-            name=row["name"],
-            description=row["description"],
-            category=row["category"],
-            color=row["color"],
-            icon=row["icon"],
-            frequency=row["frequency"],
-            streak_count=row["streak_count"],
-            longest_streak=row["longest_streak"],
-            created_date=datetime.fromisoformat(row["created_date"]),
-            last_completed_date=datetime.fromisoformat(row["last_completed_date"]) if row["last_completed_date"] else None,
-            goal_days_per_week=row["goal_days_per_week"],
-            goal_days_per_month=row["goal_days_per_month"],
-            reward_points=row["reward_points"],
-            reminder_time=row["reminder_time"],
-            reminder_enabled=bool(row["reminder_enabled"])
-        )
+        with self.transaction():
+            self.backend.delete_habit(habit_id, date.today().toordinal())
+            self._record(events.HABIT_DELETED, habit_id)
+            self._patch_index("drop", habit_id)
+        self.habit_cache.discard(habit_id)
     
     # Completion operations
     def add_completion(self, habit_id: int, completion_date: date = None) -> bool:
         """Add a completion record. Returns True if streak was updated."""
+        return self.complete_habit(habit_id, completion_date) is not None
+    
+    def complete_habit(self, habit_id: int, completion_date: date = None) -> Optional[Habit]:
+        """Record a completion and return the updated habit.
+        
+        Returns None if the habit was already completed on that day or does
+        not exist. Streaks follow the runs of consecutive completed days, so
+        back-dating a day that closes a gap joins the runs on either side.
+        """
         if completion_date is None:
             completion_date = date.today()
         
-        cursor = self.conn.cursor()
-        
-        # Check if already completed today
-        cursor.execute("""
-            SELECT COUNT(*) FROM completions
-            WHERE habit_id = ? AND completion_date = ?
-        """, (habit_id, completion_date.isoformat()))
-        
-        if cursor.fetchone()[0] > 0:
-            return False  # Already completed
-        
-        # Add completion
-        cursor.execute("""
-            INSERT INTO completions (habit_id, completion_date)
-            VALUES (?, ?)
-        """, (habit_id, completion_date.isoformat()))
-        
-        # Update habit streak and points
-        habit = self.get_habit(habit_id)
-        if habit:
-            # Check if this continues the streak
-            yesterday = date.fromordinal(completion_date.toordinal() - 1)
-            cursor.execute("""
-                SELECT COUNT(*) FROM completions
-                WHERE habit_id = ? AND completion_date = ?
-            """, (habit_id, yesterday.isoformat()))
-            
-            if cursor.fetchone()[0] > 0 or habit.last_completed_date is None:
-                # Continue streak
-                habit.streak_count += 1
-            else:
-                # New streak
-                habit.streak_count = 1
-            
-            if habit.streak_count > habit.longest_streak:
-                habit.longest_streak = habit.streak_count
-            
-            habit.last_completed_date = datetime.combine(completion_date, datetime.min.time())
-            habit.reward_points += POINTS_PER_COMPLETION
-            
-            self.update_habit(habit)
-            self.conn.commit()
-            return True
-        
-        return False
+        day = completion_date.toordinal()
+        with self.transaction():
+            habit = self.backend.complete_habit(habit_id, day, POINTS_PER_COMPLETION)
+            if habit is None:
+                return None  # Already completed, or no such habit
+            self._record(events.COMPLETED, habit_id, day, points=POINTS_PER_COMPLETION)
+            self._patch_index("completion", habit, day, True)
+        return self.habit_cache.put(habit)
+    
+    def uncomplete_habit(self, habit_id: int, completion_date: date = None) -> Optional[Habit]:
+        """Remove a completion and return the updated habit.
+        
+        Streaks are recomputed from the remaining history and the
+        completion's points are taken back. Returns None if the habit was
+        not completed on that day.
+        """
+        if completion_date is None:
+            completion_date = date.today()
+        day = completion_date.toordinal()
+        with self.transaction():
+            habit = self.backend.uncomplete_habit(habit_id, day, POINTS_PER_COMPLETION)
+            if habit is None:
+                return None
+            self._record(events.UNCOMPLETED, habit_id, day, points=POINTS_PER_COMPLETION)
+            self._patch_index("completion", habit, day, False)
+        return self.habit_cache.put(habit)
+    
+    def add_completions_bulk(self, records: Iterable[Tuple[int, Union[date, str]]]) -> int:
+        """Insert many (habit_id, date) completions in one transaction.
+        
+        Dates may be ``date`` objects or ISO strings, in any order. Records for
+        unknown habits and days that are already completed are skipped. Streaks,
+        last completion date and points of every affected habit are then
+        recomputed from its full history in one sorted pass. Returns the number
+        of completions inserted.
+        """
+        days_by_habit: Dict[int, List[int]] = {}
+        for habit_id, completion_date in records:
+            if isinstance(completion_date, str):
+                completion_date = date.fromisoformat(completion_date)
+            days_by_habit.setdefault(habit_id, []).append(completion_date.toordinal())
+        
+        with self.transaction():
+            inserted = self.backend.add_completions(days_by_habit, POINTS_PER_COMPLETION)
+            for habit_id in inserted:
+                self._record(events.COMPLETED, habit_id, days=days_by_habit[habit_id],
+                             points=POINTS_PER_COMPLETION)
+                self._patch_index(*self._index_record(habit_id))
+        
+        for habit_id in inserted:
+            self.habit_cache.discard(habit_id)
+        
+        return sum(inserted.values())
+    
+    def expire_streaks(self, today: Optional[date] = None) -> int:
+        """Break the streak of every habit missed for a whole day, in one statement.
+        
+        Run at each day rollover; ``Habit.current_streak`` gives the same
+        answer at read time in between. Returns the number of streaks broken.
+        """
+        day = (today or date.today()).toordinal()
+        with self.transaction():
+            expired = self.backend.expire_streaks(day)
+            if expired:
+                self._record(events.STREAKS_EXPIRED, None, day)
+            for habit in expired:
+                self._patch_index("counters", habit)
+        
+        for habit in expired:
+            self.habit_cache.put(habit)
+        return len(expired)
+    
+    def rebuild_streaks(self) -> List[int]:
+        """Rebuild the run index and fix stored streaks that disagree with it.
+        
+        This is the repair path for streaks written before the run index
+        existed, or by means other than this class. Returns the ids of the
+        habits that were fixed.
+        """
+        fixed = []
+        today = date.today().toordinal()
+        with self.transaction():
+            self.backend.rebuild_runs()
+            for habit in self.backend.fetch_habits():
+                days = self.backend.completion_days(habit.id)
+                current, longest = streaks(days)
+                if days and days[-1] < today - 1:
+                    current = 0  # broken at rollover
+                last = datetime.fromordinal(days[-1]) if days else None
+                if (habit.streak_count, habit.longest_streak, habit.last_completed_date) == (current, longest, last):
+                    continue
+                habit.streak_count, habit.longest_streak, habit.last_completed_date = current, longest, last
+                stored = self.backend.update_habit(habit, today)
+                self._record(events.HABIT_EDITED, habit.id, **habit_fields(stored))
+                self._patch_index("counters", stored)
+                fixed.append(habit.id)
+        
+        for habit_id in fixed:
+            self.habit_cache.discard(habit_id)
+        return fixed
     
     def get_completions(self, habit_id: int, start_date: date = None, end_date: date = None) -> List[date]:
         """Get completion dates for a habit."""
-        cursor = self.conn.cursor()
-        
         if start_date and end_date:
-            cursor.execute("""
-                SELECT completion_date FROM completions
-                WHERE habit_id = ? AND completion_date BETWEEN ? AND ?
-                ORDER BY completion_date
-            """, (habit_id, start_date.isoformat(), end_date.isoformat()))
+            days = self.backend.completion_days(habit_id, start_date.toordinal(), end_date.toordinal())
         else:
-            cursor.execute("""
-                SELECT completion_date FROM completions
-                WHERE habit_id = ?
-                ORDER BY completion_date
-            """, (habit_id,))
-        
-        return [date.fromisoformat(row[0]) for row in cursor.fetchall()]
+            days = self.backend.completion_days(habit_id)
+        return [date.fromordinal(day) for day in days]
     
     def get_completion_count(self, habit_id: int, start_date: date = None, end_date: date = None) -> int:
         """Get completion count for a habit in a date range."""
-        cursor = self.conn.cursor()
-        
+        start = end = None
         if start_date and end_date:
-            cursor.execute("""
-                SELECT COUNT(*) FROM completions
-                WHERE habit_id = ? AND completion_date BETWEEN ? AND ?
-            """, (habit_id, start_date.isoformat(), end_date.isoformat()))
-        else:
-            cursor.execute("""
-                SELECT COUNT(*) FROM completions
-                WHERE habit_id = ?
-            """, (habit_id,))
+            start, end = start_date.toordinal(), end_date.toordinal()
+        sums = self._sums_for_read()
+        if sums is not None:
+            count = sums.count(habit_id, start, end)
+            if count is not None:
+                return count
+        index = self._index_for_read()
+        if index is not None:
+            count = index.count(habit_id, start, end)
+            if count is not None:
+                return count
+        return self.backend.count_completions(habit_id, start, end)
+    
+    def get_completion_counts(self, start_date: date, end_date: date) -> Dict[int, int]:
+        """Get every habit's completion count in a date range, by habit id.
+        
+        Served by one vectorized subtraction over the prefix sums when they
+        are current, else by one query.
+        """
+        start, end = start_date.toordinal(), end_date.toordinal()
+        sums = self._sums_for_read()
+        if sums is not None:
+            counts = sums.counts(start, end)
+            if counts is not None:
+                return counts
+        return self.backend.completion_counts(start, end)
+    
+    def get_period_completion_counts(self, bounds: Sequence[date]) -> Dict[int, List[int]]:
+        """Get every habit's completion count per period, by habit id.
+        
+        Period ``i`` runs from ``bounds[i]`` through the day before
+        ``bounds[i + 1]``. Served by the prefix sums when they are current,
+        whatever the periods span, else by one query per period.
+        """
+        days = [bound.toordinal() for bound in bounds]
+        sums = self._sums_for_read()
+        if sums is not None:
+            counted = sums.period_counts(days)
+            if counted is not None:
+                habit_ids, counts = counted
+                return dict(zip(habit_ids, counts.tolist()))
+        
+        with self.snapshot():
+            periods = [self.backend.completion_counts(start, end - 1) for start, end in zip(days, days[1:])]
+        habit_ids = {habit_id for counts in periods for habit_id in counts}
+        return {habit_id: [counts.get(habit_id, 0) for counts in periods] for habit_id in habit_ids}
+    
+    def get_completion_bitmaps(self, start_date: date, end_date: date) -> List[Tuple[int, int, bytes]]:
+        """Get ``(habit_id, year, bits)`` year bitmaps for every habit, in one query.
+        
+        Covers every year the range touches; see ``models.bitmaps`` for the
+        bit layout. Years without completions may be missing.
+        """
+        return self.backend.completion_bitmaps(start_date.year, end_date.year)
+    
+    def archive_completions(self, horizon_days: Optional[int] = None) -> int:
+        """Move completions older than ``horizon_days`` to the archive tier.
         
-        return cursor.fetchone()[0]
+        The horizon defaults to the ``archive_horizon_days`` setting, then
+        ARCHIVE_HORIZON_DAYS. Archived completions remain visible to every
+        read. Returns the number of completions moved.
+        """
+        if horizon_days is None:
+            horizon_days = int(self.get_setting("archive_horizon_days", ARCHIVE_HORIZON_DAYS))
+        return self.backend.archive_completions(date.today().toordinal() - horizon_days)
+    
+    def is_completed(self, habit_id: int, completion_date: date = None) -> bool:
+        """Check whether a habit was completed on a day (today by default)."""
+        if completion_date is None:
+            completion_date = date.today()
+        day = completion_date.toordinal()
+        index = self._index_for_read()
+        if index is not None:
+            completed = index.is_completed(habit_id, day)
+            if completed is not None:
+                return completed
+        return self.backend.is_completed(habit_id, day)
     
     # Reward operations
     def get_all_rewards(self) -> List[Reward]:
         """Get all rewards."""
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM rewards ORDER BY points_required")
-        return [self._row_to_reward(row) for row in cursor.fetchall()]
+        return self.backend.fetch_rewards()
     
     def unlock_reward(self, reward_id: int):
         """Unlock a reward."""
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            UPDATE rewards SET unlocked_date = ?
-            WHERE id = ?
-        """, (datetime.now().isoformat(), reward_id))
-        self.conn.commit()
+        unlocked = datetime.now()
+        with self.transaction():
+            self.backend.set_reward_unlocked(reward_id, unlocked)
+            self._record(events.REWARD_UNLOCKED, reward_id=reward_id, at=unlocked.isoformat())
+    
+    def reset_reward(self, reward_id: int):
+        """Lock a previously unlocked reward again."""
+        with self.transaction():
+            self.backend.set_reward_unlocked(reward_id, None)
+            self._record(events.REWARD_RESET, reward_id=reward_id)
     
     def get_total_points(self) -> int:
         """Get total reward points across all habits."""
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT SUM(reward_points) FROM habits")
-        result = cursor.fetchone()[0]
-        return result if result else 0
-    
-    def _row_to_reward(self, row) -> Reward:
-        """Convert database row to Reward object."""
-        return Reward(
-            id=row["id"],
-            name=row["name"],
-            description=row["description"],
-            points_required=row["points_required"],
-            unlocked_date=datetime.fromisoformat(row["unlocked_date"]) if row["unlocked_date"] else None,
-            icon=row["icon"],
-            image_path=row["image_path"]
-        )
+        index = self._index_for_read()
+        if index is not None:
+            return index.total_points()
+        return self.backend.total_points()
+    
+    def get_points_by_day(self, start_date: date, end_date: date, habit_id: int = None) -> Dict[date, int]:
+        """Get points earned per day in a date range, optionally for one habit."""
+        points = self.backend.points_by_day(start_date.toordinal(), end_date.toordinal(), habit_id)
+        return {date.fromordinal(day): total for day, total in points.items()}
+    
+    def get_points_by_habit(self, start_date: date = None, end_date: date = None) -> Dict[int, int]:
+        """Get points earned per habit id, optionally within a date range."""
+        if start_date and end_date:
+            return self.backend.points_by_habit(start_date.toordinal(), end_date.toordinal())
+        return self.backend.points_by_habit()
     
     # Settings operations
     def get_setting(self, key: str, default: str = None) -> Optional[str]:
-        """Get a setting value."""
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT value FROM settings WHERE key = ?", (key,))
-        row = cursor.fetchone()
-        return row[0] if row else default
+        """Get a setting value (served from the settings cache)."""
+        return self.settings.get(key, default)
     
     def set_setting(self, key: str, value: str):
         """Set a setting value."""
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            INSERT OR REPLACE INTO settings (key, value)
-            VALUES (?, ?)
-        """, (key, value))
-        self.conn.commit()
+        self.settings.set(key, value)
     
     def close(self):
-        """Close database connection."""
-        self.conn.close()
+        """Flush pending settings and close the storage backend."""
+        self.settings.flush()
+        with self._sums_lock:
+            thread = self._sums_thread
+        if thread is not None:
+            thread.join()
+        if self.index is not None:
+            self.index.close()
+        self.backend.close()
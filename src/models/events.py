@@ -0,0 +1,287 @@
+"""Append-only event log of habit and reward changes.
+
+Every write through ``Database`` appends one event in the same transaction
+as the write itself, so the log and the tables can never disagree about what
+was committed. The tables (``habits``, ``completions``, ``rewards``) remain
+the fast read model; the log is the history they can be rebuilt from.
+
+Replaying starts from the newest snapshot, a JSON dump of the derived state
+as of some event ``seq``, and folds only the events after it. ``compact()``
+writes a fresh snapshot and drops the events and snapshots it supersedes, so
+replay cost stays bounded by the tail rather than by years of history.
+"""
+
+import json
+from bisect import bisect_left, insort
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Dict, List, Optional
+from .habit import Habit
+from .storage.base import datetime_from_day, streaks
+from ..utils.constants import POINTS_PER_COMPLETION
+
+
+# Event kinds
+HABIT_CREATED = "habit_created"
+HABIT_EDITED = "habit_edited"
+HABIT_DELETED = "habit_deleted"
+COMPLETED = "completed"
+UNCOMPLETED = "uncompleted"
+REWARD_UNLOCKED = "reward_unlocked"
+REWARD_RESET = "reward_reset"
+STREAKS_EXPIRED = "streaks_expired"
+
+# Take a new snapshot once this many events have accumulated after the last one
+SNAPSHOT_INTERVAL = 1000
+
+
+@dataclass
+class Event:
+    """One entry of the event log."""
+    seq: int
+    kind: str
+    habit_id: Optional[int] = None
+    day: Optional[int] = None
+    payload: Dict[str, Any] = field(default_factory=dict)
+
+
+def habit_fields(habit: Habit) -> Dict[str, Any]:
+    """Encode a habit's stored fields (all but id) as JSON-able values."""
+    values = dict(habit.__dict__)
+    values.pop("id", None)
+    values["created_date"] = habit.created_date.toordinal()
+    values["last_completed_date"] = habit.last_completed_date.toordinal() if habit.last_completed_date else None
+    values["reminder_enabled"] = bool(habit.reminder_enabled)
+    return values
+
+
+def empty_state() -> Dict[str, Any]:
+    """Return the derived state of an empty log."""
+    return {"habits": {}, "rewards": {}}
+
+
+def apply_event(state: Dict[str, Any], event: Event):
+    """Fold one event into ``state`` in place.
+
+    The transitions mirror the storage backends: every completion and
+    removal derives streaks from the runs of consecutive days in the full
+    history.
+    """
+    habits = state["habits"]
+    kind = event.kind
+    if kind == HABIT_CREATED:
+        habits[event.habit_id] = {"fields": dict(event.payload), "days": []}
+        return
+    if kind == REWARD_UNLOCKED:
+        state["rewards"][event.payload["reward_id"]] = event.payload["at"]
+        return
+    if kind == REWARD_RESET:
+        state["rewards"][event.payload["reward_id"]] = None
+        return
+    if kind == STREAKS_EXPIRED:
+        for habit in habits.values():
+            fields = habit["fields"]
+            last = fields["last_completed_date"]
+            if fields["streak_count"] > 0 and (last is None or last < event.day - 1):
+                fields["streak_count"] = 0
+        return
+
+    habit = habits.get(event.habit_id)
+    if habit is None:
+        return
+    fields, days = habit["fields"], habit["days"]
+    if kind == HABIT_EDITED:
+        fields.update(event.payload)
+    elif kind == HABIT_DELETED:
+        del habits[event.habit_id]
+    elif kind == COMPLETED and event.day is not None:
+        i = bisect_left(days, event.day)
+        if i < len(days) and days[i] == event.day:
+            return
+        days.insert(i, event.day)
+        fields["streak_count"], fields["longest_streak"] = streaks(days)
+        fields["last_completed_date"] = days[-1]
+        fields["reward_points"] += event.payload["points"]
+    elif kind == COMPLETED:
+        added = 0
+        for day in sorted(set(event.payload["days"]).difference(days)):
+            insort(days, day)
+            added += 1
+        if added:
+            fields["streak_count"], fields["longest_streak"] = streaks(days)
+            fields["last_completed_date"] = days[-1]
+            fields["reward_points"] += added * event.payload["points"]
+    elif kind == UNCOMPLETED:
+        i = bisect_left(days, event.day)
+        if i == len(days) or days[i] != event.day:
+            return
+        del days[i]
+        fields["streak_count"], fields["longest_streak"] = streaks(days)
+        fields["last_completed_date"] = days[-1] if days else None
+        fields["reward_points"] -= event.payload["points"]
+
+
+def dump_state(state: Dict[str, Any]) -> str:
+    """Serialize derived state for a snapshot."""
+    return json.dumps(state, separators=(",", ":"))
+
+
+def load_state(text: str) -> Dict[str, Any]:
+    """Deserialize a snapshot, restoring the integer ids JSON turned into strings."""
+    state = json.loads(text)
+    return {
+        "habits": {int(habit_id): habit for habit_id, habit in state["habits"].items()},
+        "rewards": {int(reward_id): at for reward_id, at in state["rewards"].items()},
+    }
+
+
+class EventLog:
+    """Appends to, replays and compacts the event log of a ``Database``."""
+
+    def __init__(self, db, snapshot_interval: int = SNAPSHOT_INTERVAL):
+        """Initialize the log for ``db``."""
+        self.db = db
+        self.snapshot_interval = snapshot_interval
+
+    def append(self, kind: str, habit_id: Optional[int] = None, day: Optional[int] = None, **payload) -> int:
+        """Append an event and return its seq. Call inside the transaction making the change."""
+        return self.db.backend.append_event(kind, habit_id, day, json.dumps(payload, separators=(",", ":")))
+
+    def ensure_snapshot(self):
+        """Seed the log with a snapshot of the current tables if it has none.
+
+        Databases that predate the log start from this snapshot instead of
+        from an empty history.
+        """
+        backend = self.db.backend
+        if backend.latest_event_snapshot() is not None:
+            return
+        with self.db.transaction():
+            if backend.latest_event_snapshot() is not None:
+                return
+            backend.save_event_snapshot(backend.last_event_seq(), dump_state(self.current_state()))
+
+    def current_state(self) -> Dict[str, Any]:
+        """Read the derived state from the tables, in the same shape replay produces."""
+        backend = self.db.backend
+        with self.db.snapshot():
+            habits = {
+                habit.id: {"fields": habit_fields(habit), "days": backend.completion_days(habit.id)}
+                for habit in backend.fetch_habits()
+            }
+            rewards = {
+                reward.id: reward.unlocked_date.isoformat() if reward.unlocked_date else None
+                for reward in backend.fetch_rewards()
+            }
+        return {"habits": habits, "rewards": rewards}
+
+    def replay(self) -> Dict[str, Any]:
+        """Rebuild derived state from the newest snapshot plus the log tail."""
+        return self._replay()[0]
+
+    def _replay(self):
+        backend = self.db.backend
+        with self.db.snapshot():
+            snapshot = backend.latest_event_snapshot()
+            seq, state = (snapshot[0], load_state(snapshot[1])) if snapshot else (0, empty_state())
+            tail = [
+                Event(event_seq, kind, habit_id, day, json.loads(payload))
+                for event_seq, kind, habit_id, day, payload in backend.events_after(seq)
+            ]
+        for event in tail:
+            apply_event(state, event)
+        return state, (tail[-1].seq if tail else seq), len(tail)
+
+    def since(self, seq: int) -> Optional[List[Event]]:
+        """Return the events appended after ``seq``, in order.
+
+        Returns None if the log can no longer tell: compaction dropped some
+        of them, or ``seq`` is ahead of the log.
+        """
+        backend = self.db.backend
+        with self.db.snapshot():
+            snapshot = backend.latest_event_snapshot()
+            if (snapshot and snapshot[0] > seq) or backend.last_event_seq() < seq:
+                return None
+            return [
+                Event(event_seq, kind, habit_id, day, json.loads(payload))
+                for event_seq, kind, habit_id, day, payload in backend.events_after(seq)
+            ]
+
+    def tail_length(self) -> int:
+        """Return how many events were appended since the newest snapshot."""
+        snapshot = self.db.backend.latest_event_snapshot()
+        return self.db.backend.last_event_seq() - (snapshot[0] if snapshot else 0)
+
+    def compact(self, force: bool = False) -> bool:
+        """Fold the log tail into a new snapshot and drop what it supersedes.
+
+        Does nothing unless at least ``snapshot_interval`` events have
+        accumulated, or ``force`` is set. Returns True if it compacted. Safe
+        to run from a background thread while the app keeps writing: events
+        appended after the replay are kept as the next tail.
+        """
+        if not force and self.tail_length() < self.snapshot_interval:
+            return False
+        state, seq, folded = self._replay()
+        if not folded:
+            return False
+        with self.db.transaction():
+            self.db.backend.save_event_snapshot(seq, dump_state(state))
+            self.db.backend.drop_events_through(seq)
+        return True
+
+    def verify(self) -> List[int]:
+        """Return ids of habits whose tables disagree with the replayed log."""
+        replayed = self.replay()["habits"]
+        current = self.current_state()["habits"]
+        return sorted(
+            habit_id for habit_id in set(replayed) | set(current)
+            if replayed.get(habit_id) != current.get(habit_id)
+        )
+
+    def rebuild(self) -> List[int]:
+        """Rewrite completions and counters of existing habits from the log.
+
+        Returns the ids of the habits that were repaired. Points changes are
+        recorded in the ledger like any other write.
+        """
+        replayed = self.replay()["habits"]
+        backend = self.db.backend
+        today = date.today().toordinal()
+        repaired = []
+        with self.db.transaction():
+            for habit in backend.fetch_habits():
+                target = replayed.get(habit.id)
+                if target is None:
+                    continue
+                live_days = backend.completion_days(habit.id)
+                if target["days"] == live_days and target["fields"] == habit_fields(habit):
+                    continue
+
+                stale = set(live_days).difference(target["days"])
+                missing = set(target["days"]).difference(live_days)
+                # Move points with the completions, as every other write does,
+                # then settle the remaining difference with an adjustment
+                for day in stale:
+                    backend.uncomplete_habit(habit.id, day, POINTS_PER_COMPLETION)
+                if missing:
+                    backend.add_completions({habit.id: sorted(missing)}, POINTS_PER_COMPLETION)
+                habit = backend.fetch_habit(habit.id)
+
+                fields = target["fields"]
+                habit.streak_count = fields["streak_count"]
+                habit.longest_streak = fields["longest_streak"]
+                habit.last_completed_date = (
+                    datetime_from_day(fields["last_completed_date"]) if fields["last_completed_date"] else None
+                )
+                habit.reward_points = fields["reward_points"]
+                backend.update_habit(habit, today)
+                repaired.append(habit.id)
+        self.db.habit_cache.clear()
+        if repaired:
+            if self.db.index is not None:
+                self.db.index.invalidate()
+            self.db.sums.invalidate()
+            self.db.bump_data_version()
+        return repaired
@@ -1,8 +1,8 @@
 """Habit data model."""
 
-from dataclasses import dataclass
-from datetime import datetime
-from typing import Optional
+from dataclasses import dataclass, fields
+from datetime import date, datetime
+from typing import Optional, Sequence
 
 
 @dataclass
@@ -45,6 +45,19 @@ class Habit:
         if self.reminder_enabled is None:
             self.reminder_enabled = False
     
+    def current_streak(self, today: Optional[date] = None) -> int:
+        """Return the streak as of ``today`` (default: now).
+        
+        A streak is broken once a whole day passes without a completion. The
+        stored ``streak_count`` is only reset by the daily rollover
+        (``Database.expire_streaks``), so this also checks the last completion.
+        """
+        if self.last_completed_date is None:
+            return 0
+        if today is None:
+            today = date.today()
+        return self.streak_count if today.toordinal() - self.last_completed_date.toordinal() <= 1 else 0
+    
     def to_dict(self) -> dict:
         """Convert habit to dictionary."""
         return {
@@ -87,3 +100,17 @@ class Habit:
             reminder_time=data.get("reminder_time"),
             reminder_enabled=data.get("reminder_enabled", False)
         )
+    
+    @classmethod
+    def from_row(cls, values: Sequence) -> "Habit":
+        """Create habit from trusted field values in declaration order.
+        
+        Bypasses ``__init__`` and ``__post_init__``, so the values must
+        already be complete and correctly typed, as decoded database rows are.
+        """
+        habit = object.__new__(cls)
+        habit.__dict__.update(zip(_FIELD_NAMES, values))
+        return habit
+
+
+_FIELD_NAMES = tuple(field.name for field in fields(Habit))
@@ -0,0 +1,444 @@
+"""Schema migrations for the Axilium database.
+
+The schema version lives in ``PRAGMA user_version``. Each migration upgrades
+the schema by one version and runs in its own transaction, so a database is
+never left half-migrated. Opening a database that is already current costs a
+single pragma read.
+"""
+
+import sqlite3
+from typing import Callable, Dict, List
+from . import runs
+from .bitmaps import from_days, month_days
+from ..utils.constants import POINTS_PER_COMPLETION
+
+
+# SQL expression converting an ISO date/datetime string to a day ordinal
+# (days since 0001-01-01, matching date.toordinal()).
+_ISO_TO_ORDINAL = "CAST(julianday(substr({column}, 1, 10)) - 1721424.5 AS INTEGER)"
+
+# SQL expression for today's local date as a day ordinal
+_TODAY_ORDINAL = "CAST(julianday('now', 'localtime') - 1721424.5 AS INTEGER)"
+
+
+def _create_schema(cursor: sqlite3.Cursor):
+    """Version 1: the original schema, with default rewards.
+
+    Uses IF NOT EXISTS so databases created before versioning was introduced
+    are adopted as they are.
+    """
+    # Habits table
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS habits (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            description TEXT,
+            category TEXT NOT NULL,
+            color TEXT NOT NULL,
+            icon TEXT NOT NULL,
+            frequency TEXT NOT NULL,
+            streak_count INTEGER DEFAULT 0,
+            longest_streak INTEGER DEFAULT 0,
+            created_date TEXT NOT NULL,
+            last_completed_date TEXT,
+            goal_days_per_week INTEGER DEFAULT 7,
+            goal_days_per_month INTEGER DEFAULT 30,
+            reward_points INTEGER DEFAULT 0,
+            reminder_time TEXT,
+            reminder_enabled INTEGER DEFAULT 0
+        )
+    """)
+
+    # Completions table
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS completions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            habit_id INTEGER NOT NULL,
+            completion_date TEXT NOT NULL,
+            FOREIGN KEY (habit_id) REFERENCES habits(id) ON DELETE CASCADE
+        )
+    """)
+
+    # Rewards table
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS rewards (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            description TEXT,
+            points_required INTEGER NOT NULL,
+            unlocked_date TEXT,
+            icon TEXT NOT NULL,
+            image_path TEXT
+        )
+    """)
+
+    # Settings table
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS settings (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        )
+    """)
+
+    # One completion per habit per day is enforced by a unique index;
+    # databases created before it existed may hold duplicates, which are
+    # dropped before the index is rebuilt.
+    cursor.execute("PRAGMA index_list(completions)")
+    unique_indexes = {row[1]: row[2] for row in cursor.fetchall()}
+    if not unique_indexes.get("idx_completions_habit_date"):
+        cursor.execute("""
+            DELETE FROM completions WHERE id NOT IN (
+                SELECT MIN(id) FROM completions GROUP BY habit_id, completion_date
+            )
+        """)
+        cursor.execute("DROP INDEX IF EXISTS idx_completions_habit_date")
+        cursor.execute("CREATE UNIQUE INDEX idx_completions_habit_date ON completions(habit_id, completion_date)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_completions_date ON completions(completion_date)")
+
+    # Default rewards
+    cursor.execute("SELECT COUNT(*) FROM rewards")
+    if cursor.fetchone()[0] == 0:
+        from .reward import DEFAULT_REWARDS
+        cursor.executemany("""
+            INSERT INTO rewards (name, description, points_required, unlocked_date, icon, image_path)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, [
+            (reward.name, reward.description, reward.points_required,
+             reward.unlocked_date.isoformat() if reward.unlocked_date else None,
+             reward.icon, reward.image_path)
+            for reward in DEFAULT_REWARDS
+        ])
+
+
+def _day_ordinal_dates(cursor: sqlite3.Cursor):
+    """Version 2: store habit and completion dates as integer day ordinals.
+
+    SQLite cannot change a column's type in place, so both tables are rebuilt
+    and their rows converted on copy. AUTOINCREMENT counters are carried over
+    so deleted ids are never reused.
+    """
+    cursor.execute("SELECT name, seq FROM sqlite_sequence WHERE name IN ('habits', 'completions')")
+    sequences = cursor.fetchall()
+
+    cursor.execute("""
+        CREATE TABLE habits_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            description TEXT,
+            category TEXT NOT NULL,
+            color TEXT NOT NULL,
+            icon TEXT NOT NULL,
+            frequency TEXT NOT NULL,
+            streak_count INTEGER DEFAULT 0,
+            longest_streak INTEGER DEFAULT 0,
+            created_date INTEGER NOT NULL,
+            last_completed_date INTEGER,
+            goal_days_per_week INTEGER DEFAULT 7,
+            goal_days_per_month INTEGER DEFAULT 30,
+            reward_points INTEGER DEFAULT 0,
+            reminder_time TEXT,
+            reminder_enabled INTEGER DEFAULT 0
+        )
+    """)
+    cursor.execute(f"""
+        INSERT INTO habits_new
+        SELECT id, name, description, category, color, icon, frequency,
+               streak_count, longest_streak,
+               {_ISO_TO_ORDINAL.format(column="created_date")},
+               {_ISO_TO_ORDINAL.format(column="last_completed_date")},
+               goal_days_per_week, goal_days_per_month, reward_points,
+               reminder_time, reminder_enabled
+        FROM habits
+    """)
+
+    cursor.execute("""
+        CREATE TABLE completions_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            habit_id INTEGER NOT NULL,
+            completion_date INTEGER NOT NULL,
+            FOREIGN KEY (habit_id) REFERENCES habits(id) ON DELETE CASCADE
+        )
+    """)
+    cursor.execute(f"""
+        INSERT INTO completions_new (id, habit_id, completion_date)
+        SELECT id, habit_id, {_ISO_TO_ORDINAL.format(column="completion_date")}
+        FROM completions
+    """)
+
+    cursor.execute("DROP TABLE completions")
+    cursor.execute("DROP TABLE habits")
+    cursor.execute("ALTER TABLE habits_new RENAME TO habits")
+    cursor.execute("ALTER TABLE completions_new RENAME TO completions")
+    cursor.execute("CREATE UNIQUE INDEX idx_completions_habit_date ON completions(habit_id, completion_date)")
+    cursor.execute("CREATE INDEX idx_completions_date ON completions(completion_date)")
+
+    for name, seq in sequences:
+        cursor.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = ?", (seq, name))
+
+
+def _points_ledger(cursor: sqlite3.Cursor):
+    """Version 3: append-only points ledger with a maintained running total.
+
+    Every change to a habit's points is recorded as a ledger row, and a
+    trigger keeps ``points_total`` equal to ``SUM(habits.reward_points)``.
+    Completions and habit inserts/deletes are recorded by triggers inside
+    the writing statement's transaction; ``SQLiteBackend.update_habit`` records
+    manual adjustments itself. Existing history is backfilled from
+    ``completions``, with one adjustment row per habit for any difference.
+    """
+    cursor.execute("""
+        CREATE TABLE points_ledger (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            habit_id INTEGER,
+            day INTEGER NOT NULL,
+            points INTEGER NOT NULL,
+            reason TEXT NOT NULL
+        )
+    """)
+    cursor.execute("CREATE INDEX idx_points_ledger_day ON points_ledger(day)")
+    cursor.execute("CREATE INDEX idx_points_ledger_habit_day ON points_ledger(habit_id, day)")
+    cursor.execute("""
+        CREATE TABLE points_total (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            total INTEGER NOT NULL
+        )
+    """)
+
+    # Backfill, then seed the total from the ledger itself
+    cursor.execute(f"""
+        INSERT INTO points_ledger (habit_id, day, points, reason)
+        SELECT habit_id, completion_date, {POINTS_PER_COMPLETION}, 'completion'
+        FROM completions
+        WHERE habit_id IN (SELECT id FROM habits)
+        ORDER BY completion_date, id
+    """)
+    cursor.execute(f"""
+        INSERT INTO points_ledger (habit_id, day, points, reason)
+        SELECT h.id, {_TODAY_ORDINAL}, h.reward_points - COALESCE(SUM(l.points), 0), 'adjustment'
+        FROM habits h LEFT JOIN points_ledger l ON l.habit_id = h.id
+        GROUP BY h.id
+        HAVING h.reward_points - COALESCE(SUM(l.points), 0) <> 0
+    """)
+    cursor.execute("INSERT INTO points_total (id, total) SELECT 1, COALESCE(SUM(points), 0) FROM points_ledger")
+
+    cursor.execute("""
+        CREATE TRIGGER points_ledger_total AFTER INSERT ON points_ledger
+        BEGIN
+            UPDATE points_total SET total = total + NEW.points WHERE id = 1;
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER completions_points AFTER INSERT ON completions
+        BEGIN
+            INSERT INTO points_ledger (habit_id, day, points, reason)
+            VALUES (NEW.habit_id, NEW.completion_date, {POINTS_PER_COMPLETION}, 'completion');
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER habits_opening_points AFTER INSERT ON habits
+        WHEN NEW.reward_points <> 0
+        BEGIN
+            INSERT INTO points_ledger (habit_id, day, points, reason)
+            VALUES (NEW.id, NEW.created_date, NEW.reward_points, 'adjustment');
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER habits_deleted_points AFTER DELETE ON habits
+        WHEN OLD.reward_points <> 0
+        BEGIN
+            INSERT INTO points_ledger (habit_id, day, points, reason)
+            VALUES (OLD.id, {_TODAY_ORDINAL}, -OLD.reward_points, 'habit_deleted');
+        END
+    """)
+
+
+def _event_log(cursor: sqlite3.Cursor):
+    """Version 4: append-only event log with snapshots of derived state.
+
+    AUTOINCREMENT keeps ``seq`` increasing even after compaction deletes
+    every event. The first snapshot is taken from the existing tables when
+    the database is opened (see ``EventLog.ensure_snapshot``).
+    """
+    cursor.execute("""
+        CREATE TABLE events (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            habit_id INTEGER,
+            day INTEGER,
+            payload TEXT NOT NULL
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE event_snapshots (
+            seq INTEGER PRIMARY KEY,
+            state TEXT NOT NULL
+        )
+    """)
+
+
+def _completion_bitmaps(cursor: sqlite3.Cursor):
+    """Version 5: per-habit, per-year completion bitmaps.
+
+    One 46-byte BLOB per habit and year mirrors that year's completions
+    (see ``bitmaps``), backfilled here and kept in sync by the backend.
+    """
+    cursor.execute("""
+        CREATE TABLE completion_bitmaps (
+            habit_id INTEGER NOT NULL,
+            year INTEGER NOT NULL,
+            bits BLOB NOT NULL,
+            PRIMARY KEY (habit_id, year),
+            FOREIGN KEY (habit_id) REFERENCES habits(id) ON DELETE CASCADE
+        ) WITHOUT ROWID
+    """)
+
+    cursor.execute("SELECT habit_id, completion_date FROM completions ORDER BY habit_id")
+    days_by_habit: Dict[int, List[int]] = {}
+    for habit_id, day in cursor.fetchall():
+        days_by_habit.setdefault(habit_id, []).append(day)
+    cursor.executemany(
+        "INSERT INTO completion_bitmaps (habit_id, year, bits) VALUES (?, ?, ?)",
+        [
+            (habit_id, year, bits)
+            for habit_id, days in days_by_habit.items()
+            for year, bits in from_days(days).items()
+        ]
+    )
+
+
+def _completion_archive(cursor: sqlite3.Cursor):
+    """Version 6: cold tier for old completions.
+
+    ``SQLiteBackend.archive_completions`` moves completions older than
+    ``archive_horizon.before`` (always the first day of a month) out of
+    ``completions`` into one row per habit and month holding a bitmask of
+    its completed days (see ``bitmaps.months_from_days``). Nothing is
+    archived here; the horizon starts at 0.
+    """
+    cursor.execute("""
+        CREATE TABLE completions_archive (
+            habit_id INTEGER NOT NULL,
+            month INTEGER NOT NULL,
+            days INTEGER NOT NULL,
+            PRIMARY KEY (habit_id, month),
+            FOREIGN KEY (habit_id) REFERENCES habits(id) ON DELETE CASCADE
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("""
+        CREATE TABLE archive_horizon (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            before INTEGER NOT NULL
+        )
+    """)
+    cursor.execute("INSERT INTO archive_horizon (id, before) VALUES (1, 0)")
+
+
+def _completion_runs(cursor: sqlite3.Cursor):
+    """Version 7: runs of consecutive completed days that streaks are read from.
+
+    Backfilled from both completion tiers. Stored streaks are left as they
+    are; ``Database`` calls ``rebuild_streaks`` to recompute them from the
+    runs when it opens a database migrated from before this version.
+    """
+    cursor.execute("""
+        CREATE TABLE completion_runs (
+            habit_id INTEGER NOT NULL,
+            start_day INTEGER NOT NULL,
+            end_day INTEGER NOT NULL,
+            PRIMARY KEY (habit_id, start_day),
+            FOREIGN KEY (habit_id) REFERENCES habits(id) ON DELETE CASCADE
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("CREATE INDEX idx_completion_runs_length ON completion_runs(habit_id, end_day - start_day)")
+
+    cursor.execute("SELECT habit_id, completion_date FROM completions WHERE habit_id IN (SELECT id FROM habits)")
+    days_by_habit: Dict[int, List[int]] = {}
+    for habit_id, day in cursor.fetchall():
+        days_by_habit.setdefault(habit_id, []).append(day)
+    cursor.execute("SELECT habit_id, month, days FROM completions_archive")
+    for habit_id, month, mask in cursor.fetchall():
+        days_by_habit.setdefault(habit_id, []).extend(month_days(month, mask))
+    cursor.executemany(
+        "INSERT INTO completion_runs (habit_id, start_day, end_day) VALUES (?, ?, ?)",
+        [
+            (habit_id, start, end)
+            for habit_id, days in days_by_habit.items()
+            for start, end in runs.from_days(sorted(days))
+        ]
+    )
+
+
+def _bulk_points(cursor: sqlite3.Cursor):
+    """Version 8: let bulk loads write the points ledger themselves.
+
+    While ``points_bulk`` holds its row, which only a bulk load's own
+    transaction ever sees, the completion and ledger triggers stand aside:
+    ``SQLiteBackend.add_completions`` inserts the ledger rows in one batch
+    and adds their points to ``points_total`` once, instead of two trigger
+    statements per completion.
+    """
+    cursor.execute("CREATE TABLE points_bulk (id INTEGER PRIMARY KEY CHECK (id = 1))")
+    cursor.execute("DROP TRIGGER points_ledger_total")
+    cursor.execute("DROP TRIGGER completions_points")
+    cursor.execute("""
+        CREATE TRIGGER points_ledger_total AFTER INSERT ON points_ledger
+        WHEN NOT EXISTS (SELECT 1 FROM points_bulk)
+        BEGIN
+            UPDATE points_total SET total = total + NEW.points WHERE id = 1;
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER completions_points AFTER INSERT ON completions
+        WHEN NOT EXISTS (SELECT 1 FROM points_bulk)
+        BEGIN
+            INSERT INTO points_ledger (habit_id, day, points, reason)
+            VALUES (NEW.habit_id, NEW.completion_date, {POINTS_PER_COMPLETION}, 'completion');
+        END
+    """)
+
+
+# Index i upgrades the schema from version i to version i + 1
+MIGRATIONS: List[Callable[[sqlite3.Cursor], None]] = [
+    _create_schema,
+    _day_ordinal_dates,
+    _points_ledger,
+    _event_log,
+    _completion_bitmaps,
+    _completion_archive,
+    _completion_runs,
+    _bulk_points,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+# First version whose stored streaks agree with completion_runs
+RUNS_VERSION = MIGRATIONS.index(_completion_runs) + 1
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    """Return the schema version stored in the database."""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(backend) -> int:
+    """Bring a ``SQLiteBackend`` up to ``SCHEMA_VERSION``. Returns the version it started at."""
+    conn = backend.conn
+    start = schema_version(conn)
+    if start >= SCHEMA_VERSION:
+        return start
+
+    # Table rebuilds drop tables that others reference, which must not
+    # cascade. foreign_keys can only be toggled outside a transaction.
+    conn.execute("PRAGMA foreign_keys = OFF")
+    try:
+        for version in range(start, SCHEMA_VERSION):
+            with backend.transaction():
+                # Re-check under the write lock in case another process
+                # migrated the file in the meantime
+                if schema_version(conn) > version:
+                    continue
+                MIGRATIONS[version](conn.cursor())
+                conn.execute(f"PRAGMA user_version = {version + 1}")
+    finally:
+        conn.execute(f"PRAGMA foreign_keys = {backend.connections.pragmas['foreign_keys']}")
+    return start
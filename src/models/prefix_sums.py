@@ -0,0 +1,156 @@
+"""In-memory prefix sums of completions per habit.
+
+Row ``r`` of the sums holds, at column ``j``, how many days the habit was
+completed before day ``origin + j``, so any inclusive ``[start, end]`` count
+is two lookups, ``sums[r, end - origin + 1] - sums[r, start - origin]``, and
+the same subtraction over two columns gives every habit's count at once.
+
+The sums span whole years, from the first year with a completion through
+the current one; 1000 habits over ten years take about 15 MB. A completion
+or removal adds one to or subtracts one from the tail of its row. Like the
+``CompletionIndex``, the sums are tagged with the event seq they reflect
+and are rebuilt whenever a commit is missed or a patch falls outside them.
+"""
+
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from . import bitmaps
+from .habit import Habit
+
+
+class PrefixSums:
+    """Cumulative completion counts over day ordinals, one row per habit.
+
+    Readers get None whenever the sums cannot answer (not built, habit
+    unknown) and should fall back to the database. All methods are
+    thread-safe.
+    """
+
+    def __init__(self):
+        """Initialize empty sums; nothing is built until ``build()``."""
+        self.seq = -1
+        self.origin = 0
+        self._sums: Optional[np.ndarray] = None
+        self._rows: Dict[int, int] = {}
+        self._lock = threading.RLock()
+
+    @property
+    def loaded(self) -> bool:
+        """Return whether the sums may be read."""
+        return self._sums is not None and self.seq >= 0
+
+    @property
+    def last(self) -> int:
+        """Return the last day ordinal the sums cover."""
+        return self.origin + self._sums.shape[1] - 2
+
+    def build(self, habit_ids: List[int], stored: Iterable[Tuple[int, int, bytes]], seq: int, year: int):
+        """Build the sums from every habit's ``(habit_id, year, bits)`` bitmaps as of ``seq``.
+
+        The sums end with ``year``, or the last stored year if later.
+        """
+        stored = list(stored)
+        years = [row[1] for row in stored] or [year]
+        origin = bitmaps.year_start(min(years))
+        last = bitmaps.year_start(max(max(years), year) + 1) - 1
+
+        rows = {habit_id: i for i, habit_id in enumerate(habit_ids)}
+        matrix = bitmaps.to_matrix(stored, rows, origin, last - origin + 1)
+        sums = np.zeros((len(rows), matrix.shape[1] + 1), dtype=np.int32)
+        np.cumsum(matrix, axis=1, out=sums[:, 1:])
+        with self._lock:
+            self.origin = origin
+            self._sums = sums
+            self._rows = rows
+            self.seq = seq
+
+    def invalidate(self):
+        """Drop the sums so the next read rebuilds them."""
+        with self._lock:
+            self.seq = -1
+            self._sums = None
+            self._rows = {}
+
+    # Reads
+    def _columns(self, start: Optional[int], end: Optional[int]) -> Tuple[int, int]:
+        """Return the prefix columns for an inclusive day range, clamped to the sums."""
+        first = 0 if start is None else min(max(start - self.origin, 0), self._sums.shape[1] - 1)
+        last = self._sums.shape[1] - 1 if end is None else min(max(end - self.origin + 1, 0), self._sums.shape[1] - 1)
+        return first, max(first, last)
+
+    def count(self, habit_id: int, start: Optional[int] = None, end: Optional[int] = None) -> Optional[int]:
+        """Count a habit's completions in an inclusive day range; ``None`` bounds are open."""
+        with self._lock:
+            row = self._rows.get(habit_id) if self.loaded else None
+            if row is None:
+                return None
+            first, last = self._columns(start, end)
+            return int(self._sums[row, last] - self._sums[row, first])
+
+    def counts(self, start: Optional[int] = None, end: Optional[int] = None) -> Optional[Dict[int, int]]:
+        """Count every habit's completions in an inclusive day range, by habit id."""
+        with self._lock:
+            if not self.loaded:
+                return None
+            first, last = self._columns(start, end)
+            counts = (self._sums[:, last] - self._sums[:, first]).tolist()
+            return {habit_id: counts[row] for habit_id, row in self._rows.items()}
+
+    def period_counts(self, bounds: Sequence[int]) -> Optional[Tuple[List[int], np.ndarray]]:
+        """Count every habit's completions per period, in one gather and one difference.
+
+        Period ``i`` runs from day ``bounds[i]`` through the day before
+        ``bounds[i + 1]``. Returns the habit ids and a habits x periods
+        array of counts, or None if the sums cannot answer.
+        """
+        with self._lock:
+            if not self.loaded:
+                return None
+            columns = np.clip(np.asarray(bounds, dtype=np.int64) - self.origin, 0, self._sums.shape[1] - 1)
+            habit_ids = list(self._rows)
+            rows = [self._rows[habit_id] for habit_id in habit_ids]
+            return habit_ids, np.diff(self._sums[np.ix_(rows, columns)], axis=1)
+
+    # Incremental patches
+    def apply(self, patches: List[tuple], base_seq: int, seq: int) -> bool:
+        """Apply the patches of one committed transaction.
+
+        Takes the same patches and seq range as ``CompletionIndex.apply``.
+        Patches the sums cannot express (a completion outside them, a full
+        record for a habit with history) invalidate them instead. Returns
+        whether the patches applied.
+        """
+        with self._lock:
+            if not self.loaded or self.seq != base_seq:
+                self.invalidate()
+                return False
+            for patch in patches:
+                if not getattr(self, "_patch_" + patch[0])(*patch[1:]):
+                    self.invalidate()
+                    return False
+            self.seq = seq
+            return True
+
+    def _patch_completion(self, habit: Habit, day: int, completed: bool) -> bool:
+        row = self._rows.get(habit.id)
+        if row is None or not self.origin <= day <= self.last:
+            return False
+        self._sums[row, day - self.origin + 1:] += 1 if completed else -1
+        return True
+
+    def _patch_counters(self, habit: Habit) -> bool:
+        return True
+
+    def _patch_record(self, habit: Habit, days: List[int], count: int) -> bool:
+        if count or habit.id in self._rows:
+            return False
+        # A new habit without history: an all-zero row
+        self._rows[habit.id] = self._sums.shape[0]
+        self._sums = np.vstack([self._sums, np.zeros((1, self._sums.shape[1]), dtype=self._sums.dtype)])
+        return True
+
+    def _patch_drop(self, habit_id: int) -> bool:
+        # The row stays behind, unreachable, until the next rebuild
+        self._rows.pop(habit_id, None)
+        return True
@@ -1,8 +1,8 @@
 """Reward system model."""
 
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Sequence
 
 
 @dataclass
@@ -51,6 +51,20 @@ class Reward:
             image_path=data.get("image_path")
         )
 
+    
+    @classmethod
+    def from_row(cls, values: Sequence) -> "Reward":
+        """Create reward from trusted field values in declaration order.
+        
+        Bypasses ``__init__`` and ``__post_init__``, so the values must
+        already be complete and correctly typed, as decoded database rows are.
+        """
+        reward = object.__new__(cls)
+        reward.__dict__.update(zip(_FIELD_NAMES, values))
+        return reward
+
+
+_FIELD_NAMES = tuple(field.name for field in fields(Reward))
 
 # Default rewards
 DEFAULT_REWARDS = [
@@ -0,0 +1,72 @@
+"""Run-length index of completed days.
+
+A habit's completions are kept as sorted, disjoint ``[start, end]`` runs of
+consecutive day ordinals (never adjacent: touching runs are merged). Adding
+or removing a day touches at most two runs, found by bisection, and the
+streaks fall out directly: the current streak is the length of the last run
+and the longest streak the length of the longest one.
+"""
+
+from bisect import bisect_right
+from typing import Iterable, List, Tuple
+
+
+Runs = List[List[int]]
+
+
+def find(runs: Runs, day: int) -> int:
+    """Return the index of the run containing ``day``, or -1."""
+    i = bisect_right(runs, [day, float("inf")]) - 1
+    return i if i >= 0 and runs[i][1] >= day else -1
+
+
+def add_range(runs: Runs, start: int, end: int):
+    """Add the days ``start`` to ``end``, none of which may be present yet."""
+    i = bisect_right(runs, [start, float("inf")])
+    joins_left = i > 0 and runs[i - 1][1] == start - 1
+    joins_right = i < len(runs) and runs[i][0] == end + 1
+    if joins_left and joins_right:
+        runs[i - 1][1] = runs[i][1]
+        del runs[i]
+    elif joins_left:
+        runs[i - 1][1] = end
+    elif joins_right:
+        runs[i][0] = start
+    else:
+        runs.insert(i, [start, end])
+
+
+def remove_day(runs: Runs, day: int) -> bool:
+    """Remove ``day``, splitting its run if needed. Returns whether it was present."""
+    i = find(runs, day)
+    if i < 0:
+        return False
+    start, end = runs[i]
+    if start == end:
+        del runs[i]
+    elif day == start:
+        runs[i][0] = day + 1
+    elif day == end:
+        runs[i][1] = day - 1
+    else:
+        runs[i][1] = day - 1
+        runs.insert(i + 1, [day + 1, end])
+    return True
+
+
+def from_days(days: Iterable[int]) -> Runs:
+    """Build the runs of sorted, distinct day ordinals."""
+    runs: Runs = []
+    for day in days:
+        if runs and runs[-1][1] == day - 1:
+            runs[-1][1] = day
+        else:
+            runs.append([day, day])
+    return runs
+
+
+def streaks(runs: Runs) -> Tuple[int, int]:
+    """Return (current, longest) streak lengths."""
+    if not runs:
+        return 0, 0
+    return runs[-1][1] - runs[-1][0] + 1, max(end - start for start, end in runs) + 1
@@ -0,0 +1,146 @@
+"""Cached settings store for Axilium."""
+
+import json
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+
+class SettingsStore:
+    """In-memory view of the stored settings.
+
+    Settings are read once, on first access; after that every read is a
+    dictionary lookup. Writes update memory immediately and are written to
+    storage right away, or once at the end of a ``batch()`` block.
+    Values are stored as text; ``get_int``, ``get_bool`` and ``get_json``
+    decode them, and ``set`` encodes ints, bools and JSON-able values.
+
+    Subscribers registered with ``subscribe`` are called with
+    ``(key, value)`` whenever a key's value changes.
+    """
+
+    def __init__(self, db):
+        """Initialize the store for ``db``. Nothing is loaded yet."""
+        self.db = db
+        self._values: Optional[Dict[str, str]] = None
+        self._pending: Dict[str, str] = {}
+        self._batch_depth = 0
+        self._subscribers: Dict[str, List[Callable[[str, str], None]]] = {}
+        self._lock = threading.RLock()
+
+    def _loaded(self) -> Dict[str, str]:
+        """Return the cached values, loading them on first use."""
+        if self._values is None:
+            values = self.db.backend.load_settings()
+            # Writes not flushed yet still win over what is on disk
+            values.update(self._pending)
+            self._values = values
+        return self._values
+
+    # Reads
+    def get(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        """Get a setting value as stored."""
+        with self._lock:
+            return self._loaded().get(key, default)
+
+    def get_int(self, key: str, default: int = 0) -> int:
+        """Get a setting as an int, or ``default`` if missing or malformed."""
+        value = self.get(key)
+        try:
+            return int(value) if value is not None else default
+        except ValueError:
+            return default
+
+    def get_bool(self, key: str, default: bool = False) -> bool:
+        """Get a setting as a bool."""
+        value = self.get(key)
+        if value is None:
+            return default
+        return value.strip().lower() in ("1", "true", "yes", "on")
+
+    def get_json(self, key: str, default: Any = None) -> Any:
+        """Get a JSON-encoded setting, or ``default`` if missing or malformed."""
+        value = self.get(key)
+        if value is None:
+            return default
+        try:
+            return json.loads(value)
+        except ValueError:
+            return default
+
+    def as_dict(self) -> Dict[str, str]:
+        """Return a copy of all settings."""
+        with self._lock:
+            return dict(self._loaded())
+
+    # Writes
+    def set(self, key: str, value: Any):
+        """Set a setting. Non-string values are encoded as text or JSON."""
+        encoded = self._encode(value)
+        with self._lock:
+            values = self._loaded()
+            if values.get(key) == encoded:
+                return
+            values[key] = encoded
+            self._pending[key] = encoded
+            if self._batch_depth == 0:
+                self.flush()
+        self._notify(key, encoded)
+
+    @staticmethod
+    def _encode(value: Any) -> str:
+        if isinstance(value, str):
+            return value
+        if isinstance(value, bool):
+            return "1" if value else "0"
+        if isinstance(value, int):
+            return str(value)
+        return json.dumps(value)
+
+    @contextmanager
+    def batch(self) -> Iterator["SettingsStore"]:
+        """Defer writes until the outermost ``batch()`` block exits."""
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    self.flush()
+
+    def flush(self):
+        """Write all pending settings in one transaction."""
+        with self._lock:
+            if not self._pending:
+                return
+            pending = list(self._pending.items())
+            with self.db.transaction():
+                self.db.backend.save_settings(pending)
+            self._pending.clear()
+
+    def invalidate(self):
+        """Forget cached values so the next read reloads them."""
+        with self._lock:
+            self._values = None
+
+    # Change notification
+    def subscribe(self, key: str, callback: Callable[[str, str], None]) -> Callable[[], None]:
+        """Call ``callback(key, value)`` when ``key`` changes. Returns an unsubscribe function."""
+        with self._lock:
+            self._subscribers.setdefault(key, []).append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                callbacks = self._subscribers.get(key, [])
+                if callback in callbacks:
+                    callbacks.remove(callback)
+
+        return unsubscribe
+
+    def _notify(self, key: str, value: str):
+        with self._lock:
+            callbacks = list(self._subscribers.get(key, ()))
+        for callback in callbacks:
+            callback(key, value)
@@ -0,0 +1 @@
+"""Storage backends that Database delegates persistence to."""
@@ -0,0 +1,216 @@
+"""Storage backend protocol for Axilium."""
+
+from abc import ABC, abstractmethod
+from datetime import datetime
+from functools import lru_cache
+from typing import ContextManager, Dict, List, Optional, Sequence, Tuple
+from ..habit import Habit
+from ..reward import Reward
+
+
+# Dates are exchanged with backends as day ordinals (date.toordinal()) and
+# come back on habits as midnight datetimes. The same few dates recur across
+# many rows, so decoded values are memoized; datetimes are immutable, so
+# sharing them between habits is safe.
+datetime_from_day = lru_cache(maxsize=4096)(datetime.fromordinal)
+
+
+def streaks(days: Sequence[int]) -> Tuple[int, int]:
+    """Return (current, longest) run lengths for sorted, distinct day ordinals.
+
+    The current streak is the run ending at the latest day.
+    """
+    longest = run = 0
+    previous = None
+    for day in days:
+        run = run + 1 if previous is not None and day == previous + 1 else 1
+        if run > longest:
+            longest = run
+        previous = day
+    return run, longest
+
+
+class StorageBackend(ABC):
+    """Primitive storage operations that ``Database`` is built on.
+
+    ``Database`` owns everything above storage (the habit identity map, the
+    settings cache, date conversion) and delegates persistence to a backend.
+    Days are passed as integer day ordinals and ranges are inclusive; a
+    ``None`` bound means unbounded.
+
+    Backends must provide:
+
+    - ``transaction()``: a re-entrant context manager. Outermost blocks are
+      atomic and commit on exit; nested blocks roll back on their own when
+      they raise. Every mutating call runs inside one.
+    - ``snapshot()``: a context manager under which reads on the calling
+      thread see one consistent, committed state.
+    - the same side effects as the SQLite schema: completing a habit updates
+      its streaks, last completion day and points, and every change to a
+      habit's points is recorded in the points ledger.
+
+    Completion writes derive a habit's streaks from its runs of consecutive
+    completed days, whatever order days are added or removed in: the
+    current streak is the latest run, ``longest_streak`` the longest, and
+    ``last_completed_date`` the latest day.
+    """
+
+    # Lifecycle
+    @abstractmethod
+    def transaction(self) -> ContextManager:
+        """Group writes into one atomic unit; nested calls are savepoints."""
+
+    @abstractmethod
+    def snapshot(self) -> ContextManager:
+        """Serve reads on this thread from one consistent state."""
+
+    @abstractmethod
+    def close(self):
+        """Release any resources held by the backend."""
+
+    # Habits
+    @abstractmethod
+    def insert_habit(self, habit: Habit) -> int:
+        """Store a new habit and return its id."""
+
+    @abstractmethod
+    def fetch_habit(self, habit_id: int) -> Optional[Habit]:
+        """Return a fresh Habit object, or None if it does not exist."""
+
+    @abstractmethod
+    def fetch_habits(self) -> List[Habit]:
+        """Return all habits, newest ``created_date`` first, then by id descending."""
+
+    @abstractmethod
+    def update_habit(self, habit: Habit, day: int) -> Optional[Habit]:
+        """Store the habit's fields (all but ``created_date``) and return it as stored.
+
+        A change in ``reward_points`` is recorded in the ledger on ``day``.
+        Returns None if the habit does not exist.
+        """
+
+    @abstractmethod
+    def delete_habit(self, habit_id: int, day: int):
+        """Delete a habit and its completions, recording lost points on ``day``."""
+
+    # Completions
+    @abstractmethod
+    def complete_habit(self, habit_id: int, day: int, points: int) -> Optional[Habit]:
+        """Record a completion and return the updated habit.
+
+        Returns None if the day is already completed or the habit does not
+        exist.
+        """
+
+    @abstractmethod
+    def add_completions(self, days_by_habit: Dict[int, List[int]], points: int) -> Dict[int, int]:
+        """Insert completions in bulk and return the number inserted per habit.
+
+        Unknown habits and already completed days are skipped, and
+        ``points`` are added per inserted completion.
+        """
+
+    @abstractmethod
+    def uncomplete_habit(self, habit_id: int, day: int, points: int) -> Optional[Habit]:
+        """Remove a completion and return the updated habit.
+
+        ``points`` are taken back. Returns None if the day was not completed.
+        """
+
+    @abstractmethod
+    def completion_counts(self, start: int, end: int) -> Dict[int, int]:
+        """Return every habit's completion count in the range, by habit id."""
+
+    @abstractmethod
+    def completion_bitmaps(self, first_year: int, last_year: int) -> List[Tuple[int, int, bytes]]:
+        """Return ``(habit_id, year, bits)`` for every habit's stored years in the range.
+
+        ``bits`` is a year bitmap in the ``bitmaps`` module format covering
+        both storage tiers; years without completions may be left out.
+        """
+
+    @abstractmethod
+    def expire_streaks(self, day: int) -> List[Habit]:
+        """Zero the streak of every habit last completed before ``day - 1``.
+
+        Returns the habits that changed, as stored.
+        """
+
+    @abstractmethod
+    def rebuild_runs(self):
+        """Rebuild the run index that streaks are read from out of the completions."""
+
+    @abstractmethod
+    def completion_days(self, habit_id: int, start: Optional[int] = None, end: Optional[int] = None) -> List[int]:
+        """Return the habit's completed days in ascending order."""
+
+    @abstractmethod
+    def count_completions(self, habit_id: int, start: Optional[int] = None, end: Optional[int] = None) -> int:
+        """Return how many days the habit was completed."""
+
+    @abstractmethod
+    def is_completed(self, habit_id: int, day: int) -> bool:
+        """Return whether the habit was completed on ``day``."""
+
+    def archive_completions(self, before: int) -> int:
+        """Move completions before ``before`` to cold storage and return how many moved.
+
+        Archived completions stay visible to every read. Backends without a
+        cold tier keep everything where it is.
+        """
+        return 0
+
+    # Rewards and points
+    @abstractmethod
+    def fetch_rewards(self) -> List[Reward]:
+        """Return all rewards ordered by ``points_required``."""
+
+    @abstractmethod
+    def set_reward_unlocked(self, reward_id: int, unlocked: Optional[datetime]):
+        """Set or clear a reward's unlock time."""
+
+    @abstractmethod
+    def total_points(self) -> int:
+        """Return the points total across all habits."""
+
+    @abstractmethod
+    def points_by_day(self, start: int, end: int, habit_id: Optional[int] = None) -> Dict[int, int]:
+        """Return ledger points per day, optionally for one habit."""
+
+    @abstractmethod
+    def points_by_habit(self, start: Optional[int] = None, end: Optional[int] = None) -> Dict[int, int]:
+        """Return ledger points per habit id."""
+
+    # Event log
+    @abstractmethod
+    def append_event(self, kind: str, habit_id: Optional[int], day: Optional[int], payload: str) -> int:
+        """Append an event with a JSON ``payload`` and return its ``seq``, which only increases."""
+
+    @abstractmethod
+    def events_after(self, seq: int) -> List[Tuple[int, str, Optional[int], Optional[int], str]]:
+        """Return ``(seq, kind, habit_id, day, payload)`` for events after ``seq``, in order."""
+
+    @abstractmethod
+    def last_event_seq(self) -> int:
+        """Return the highest ``seq`` ever assigned, or 0."""
+
+    @abstractmethod
+    def latest_event_snapshot(self) -> Optional[Tuple[int, str]]:
+        """Return ``(seq, state)`` of the newest snapshot, or None."""
+
+    @abstractmethod
+    def save_event_snapshot(self, seq: int, state: str):
+        """Store a snapshot of the derived state as of event ``seq``."""
+
+    @abstractmethod
+    def drop_events_through(self, seq: int):
+        """Delete events up to and including ``seq`` and snapshots older than it."""
+
+    # Settings
+    @abstractmethod
+    def load_settings(self) -> Dict[str, str]:
+        """Return every stored setting."""
+
+    @abstractmethod
+    def save_settings(self, items: List[Tuple[str, str]]):
+        """Insert or replace settings."""
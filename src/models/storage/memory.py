@@ -0,0 +1,395 @@
+"""In-memory storage backend for Axilium."""
+
+import threading
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
+from dataclasses import fields
+from datetime import date, datetime
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from .base import StorageBackend, datetime_from_day
+from .. import bitmaps, runs
+from ..habit import Habit
+from ..reward import Reward, DEFAULT_REWARDS
+
+
+_HABIT_FIELDS = tuple(field.name for field in fields(Habit))
+
+# Positions in a stored habit row (Habit field order)
+_ID, _STREAK, _LONGEST, _CREATED, _LAST, _POINTS, _REMINDER_ENABLED = 0, 7, 8, 9, 10, 13, 15
+
+
+def _habit_row(habit: Habit) -> list:
+    """Return the habit's field values, with dates normalized as SQLite stores them."""
+    row = [getattr(habit, name) for name in _HABIT_FIELDS]
+    row[_CREATED] = datetime_from_day(habit.created_date.toordinal())
+    if habit.last_completed_date:
+        row[_LAST] = datetime_from_day(habit.last_completed_date.toordinal())
+    row[_REMINDER_ENABLED] = bool(habit.reminder_enabled)
+    return row
+
+
+class MemoryBackend(StorageBackend):
+    """Keeps everything in Python dicts; nothing is persisted.
+
+    Habits and rewards are immutable tuples in dataclass field order, and
+    each habit's completions are a sorted list of day ordinals, so lookups
+    are bisects and range counts are two of them. Streaks come from a run
+    list per habit (see ``runs``). Rollback is an undo log replayed in
+    reverse.
+
+    One re-entrant lock serializes access: transactions and snapshots hold it
+    for their whole block, every other call for its own duration. A snapshot
+    therefore also sees the calling thread's own writes, and blocks writers
+    on other threads until it ends.
+    """
+
+    def __init__(self):
+        """Start with the default rewards and no habits."""
+        self._habits: Dict[int, tuple] = {}
+        self._completions: Dict[int, List[int]] = {}
+        self._runs: Dict[int, runs.Runs] = {}
+        self._rewards: Dict[int, tuple] = {
+            reward_id: (reward_id, reward.name, reward.description, reward.points_required,
+                        reward.unlocked_date, reward.icon, reward.image_path)
+            for reward_id, reward in enumerate(DEFAULT_REWARDS, start=1)
+        }
+        self._ledger: List[Tuple[Optional[int], int, int, str]] = []
+        self._total = 0
+        self._settings: Dict[str, str] = {}
+        self._next_habit_id = 1
+        self._events: List[Tuple[int, str, Optional[int], Optional[int], str]] = []
+        self._event_snapshots: List[Tuple[int, str]] = []
+        self._last_event_seq = 0
+
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._undo: List[Callable[[], None]] = []
+
+    # Lifecycle
+    @contextmanager
+    def transaction(self) -> Iterator["MemoryBackend"]:
+        """Hold the lock for the block; undo its writes if it raises."""
+        with self._lock:
+            mark = len(self._undo)
+            self._depth += 1
+            try:
+                yield self
+            except BaseException:
+                while len(self._undo) > mark:
+                    self._undo.pop()()
+                raise
+            finally:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._undo.clear()
+
+    @contextmanager
+    def snapshot(self) -> Iterator["MemoryBackend"]:
+        """Hold the lock for the block so no other thread can write."""
+        with self._lock:
+            yield self
+
+    def close(self):
+        """Nothing to release."""
+
+    def _on_rollback(self, undo: Callable[[], None]):
+        self._undo.append(undo)
+
+    def _set_habit(self, row: tuple):
+        previous = self._habits.get(row[_ID])
+        self._habits[row[_ID]] = row
+        if previous is None:
+            self._on_rollback(lambda: self._habits.pop(row[_ID]))
+        else:
+            self._on_rollback(lambda: self._habits.__setitem__(row[_ID], previous))
+
+    def _record_points(self, habit_id: Optional[int], day: int, points: int, reason: str):
+        self._ledger.append((habit_id, day, points, reason))
+        self._total += points
+
+        def undo():
+            self._ledger.pop()
+            self._total -= points
+        self._on_rollback(undo)
+
+    # Habits
+    def insert_habit(self, habit: Habit) -> int:
+        with self.transaction():
+            # Ids are never reused, even when the insert is rolled back
+            habit_id = self._next_habit_id
+            self._next_habit_id += 1
+            row = _habit_row(habit)
+            row[_ID] = habit_id
+            self._set_habit(tuple(row))
+            self._completions[habit_id] = []
+            self._runs[habit_id] = []
+
+            def undo():
+                del self._completions[habit_id]
+                del self._runs[habit_id]
+            self._on_rollback(undo)
+            if habit.reward_points:
+                self._record_points(habit_id, habit.created_date.toordinal(), habit.reward_points, "adjustment")
+        return habit_id
+
+    def fetch_habit(self, habit_id: int) -> Optional[Habit]:
+        with self._lock:
+            row = self._habits.get(habit_id)
+        return Habit.from_row(row) if row else None
+
+    def fetch_habits(self) -> List[Habit]:
+        with self._lock:
+            rows = sorted(self._habits.values(), key=lambda row: (row[_CREATED], row[_ID]), reverse=True)
+        return [Habit.from_row(row) for row in rows]
+
+    def update_habit(self, habit: Habit, day: int) -> Optional[Habit]:
+        with self.transaction():
+            stored = self._habits.get(habit.id)
+            if stored is None:
+                return None
+            row = _habit_row(habit)
+            row[_CREATED] = stored[_CREATED]
+            row = tuple(row)
+            if row[_POINTS] != stored[_POINTS]:
+                self._record_points(habit.id, day, row[_POINTS] - stored[_POINTS], "adjustment")
+            self._set_habit(row)
+        return Habit.from_row(row)
+
+    def delete_habit(self, habit_id: int, day: int):
+        with self.transaction():
+            row = self._habits.pop(habit_id, None)
+            if row is None:
+                return
+            days = self._completions.pop(habit_id)
+            habit_runs = self._runs.pop(habit_id)
+
+            def undo():
+                self._habits[habit_id] = row
+                self._completions[habit_id] = days
+                self._runs[habit_id] = habit_runs
+            self._on_rollback(undo)
+            if row[_POINTS]:
+                self._record_points(habit_id, day, -row[_POINTS], "habit_deleted")
+
+    # Completions
+    def complete_habit(self, habit_id: int, day: int, points: int) -> Optional[Habit]:
+        with self.transaction():
+            row = self._habits.get(habit_id)
+            if row is None:
+                return None
+            days = self._completions[habit_id]
+            i = bisect_left(days, day)
+            if i < len(days) and days[i] == day:
+                return None
+            days.insert(i, day)
+            habit_runs = self._runs[habit_id]
+            runs.add_range(habit_runs, day, day)
+
+            def undo():
+                days.remove(day)
+                runs.remove_day(habit_runs, day)
+            self._on_rollback(undo)
+            self._record_points(habit_id, day, points, "completion")
+
+            row = list(row)
+            row[_STREAK], row[_LONGEST] = runs.streaks(habit_runs)
+            row[_LAST] = datetime_from_day(habit_runs[-1][1])
+            row[_POINTS] += points
+            row = tuple(row)
+            self._set_habit(row)
+        return Habit.from_row(row)
+
+    def add_completions(self, days_by_habit: Dict[int, List[int]], points: int) -> Dict[int, int]:
+        inserted: Dict[int, int] = {}
+        with self.transaction():
+            for habit_id, new_days in days_by_habit.items():
+                row = self._habits.get(habit_id)
+                if row is None:
+                    continue
+                existing = self._completions[habit_id]
+                added = sorted(set(new_days).difference(existing))
+                if not added:
+                    continue
+                self._completions[habit_id] = sorted(existing + added)
+                habit_runs = self._runs[habit_id]
+                for start, end in runs.from_days(added):
+                    runs.add_range(habit_runs, start, end)
+
+                def undo(habit_id=habit_id, existing=existing, added=added):
+                    self._completions[habit_id] = existing
+                    for day in added:
+                        runs.remove_day(self._runs[habit_id], day)
+                self._on_rollback(undo)
+                for day in added:
+                    self._record_points(habit_id, day, points, "completion")
+
+                row = list(row)
+                row[_STREAK], row[_LONGEST] = runs.streaks(habit_runs)
+                row[_LAST] = datetime_from_day(habit_runs[-1][1])
+                row[_POINTS] += len(added) * points
+                self._set_habit(tuple(row))
+                inserted[habit_id] = len(added)
+        return inserted
+
+    def uncomplete_habit(self, habit_id: int, day: int, points: int) -> Optional[Habit]:
+        with self.transaction():
+            row = self._habits.get(habit_id)
+            if row is None:
+                return None
+            days = self._completions[habit_id]
+            i = bisect_left(days, day)
+            if i == len(days) or days[i] != day:
+                return None
+            del days[i]
+            habit_runs = self._runs[habit_id]
+            runs.remove_day(habit_runs, day)
+
+            def undo():
+                days.insert(i, day)
+                runs.add_range(habit_runs, day, day)
+            self._on_rollback(undo)
+            self._record_points(habit_id, day, -points, "uncompleted")
+
+            row = list(row)
+            row[_STREAK], row[_LONGEST] = runs.streaks(habit_runs)
+            row[_LAST] = datetime_from_day(habit_runs[-1][1]) if habit_runs else None
+            row[_POINTS] -= points
+            row = tuple(row)
+            self._set_habit(row)
+        return Habit.from_row(row)
+
+    def completion_counts(self, start: int, end: int) -> Dict[int, int]:
+        with self._lock:
+            return {habit_id: self.count_completions(habit_id, start, end) for habit_id in self._habits}
+
+    def completion_bitmaps(self, first_year: int, last_year: int) -> List[Tuple[int, int, bytes]]:
+        start, end = bitmaps.year_start(first_year), date(last_year, 12, 31).toordinal()
+        with self._lock:
+            return [
+                (habit_id, year, bits)
+                for habit_id, days in self._completions.items()
+                for year, bits in bitmaps.from_days(days[bisect_left(days, start):bisect_right(days, end)]).items()
+            ]
+
+    def expire_streaks(self, day: int) -> List[Habit]:
+        expired = []
+        with self.transaction():
+            for row in list(self._habits.values()):
+                if row[_STREAK] > 0 and (row[_LAST] is None or row[_LAST].toordinal() < day - 1):
+                    row = list(row)
+                    row[_STREAK] = 0
+                    row = tuple(row)
+                    self._set_habit(row)
+                    expired.append(Habit.from_row(row))
+        return expired
+
+    def rebuild_runs(self):
+        with self._lock:
+            self._runs = {habit_id: runs.from_days(days) for habit_id, days in self._completions.items()}
+
+    def completion_days(self, habit_id: int, start: Optional[int] = None, end: Optional[int] = None) -> List[int]:
+        with self._lock:
+            days = self._completions.get(habit_id, [])
+            lo = bisect_left(days, start) if start is not None else 0
+            hi = bisect_right(days, end) if end is not None else len(days)
+            return days[lo:hi]
+
+    def count_completions(self, habit_id: int, start: Optional[int] = None, end: Optional[int] = None) -> int:
+        with self._lock:
+            days = self._completions.get(habit_id, [])
+            lo = bisect_left(days, start) if start is not None else 0
+            hi = bisect_right(days, end) if end is not None else len(days)
+            return max(hi - lo, 0)
+
+    def is_completed(self, habit_id: int, day: int) -> bool:
+        with self._lock:
+            days = self._completions.get(habit_id, [])
+            i = bisect_left(days, day)
+            return i < len(days) and days[i] == day
+
+    # Rewards and points
+    def fetch_rewards(self) -> List[Reward]:
+        with self._lock:
+            rows = sorted(self._rewards.values(), key=lambda row: (row[3], row[0]))
+        return [Reward.from_row(row) for row in rows]
+
+    def set_reward_unlocked(self, reward_id: int, unlocked: Optional[datetime]):
+        with self.transaction():
+            row = self._rewards.get(reward_id)
+            if row is None:
+                return
+            self._rewards[reward_id] = row[:4] + (unlocked,) + row[5:]
+            self._on_rollback(lambda: self._rewards.__setitem__(reward_id, row))
+
+    def total_points(self) -> int:
+        with self._lock:
+            return self._total
+
+    def points_by_day(self, start: int, end: int, habit_id: Optional[int] = None) -> Dict[int, int]:
+        totals: Dict[int, int] = {}
+        with self._lock:
+            for entry_habit, day, points, _ in self._ledger:
+                if start <= day <= end and (habit_id is None or entry_habit == habit_id):
+                    totals[day] = totals.get(day, 0) + points
+        return totals
+
+    def points_by_habit(self, start: Optional[int] = None, end: Optional[int] = None) -> Dict[int, int]:
+        totals: Dict[int, int] = {}
+        with self._lock:
+            for habit_id, day, points, _ in self._ledger:
+                if (start is None or day >= start) and (end is None or day <= end):
+                    totals[habit_id] = totals.get(habit_id, 0) + points
+        return totals
+
+    # Event log
+    def append_event(self, kind: str, habit_id: Optional[int], day: Optional[int], payload: str) -> int:
+        with self.transaction():
+            self._last_event_seq += 1
+            self._events.append((self._last_event_seq, kind, habit_id, day, payload))
+
+            def undo():
+                self._events.pop()
+                self._last_event_seq -= 1
+            self._on_rollback(undo)
+            return self._last_event_seq
+
+    def events_after(self, seq: int) -> List[Tuple[int, str, Optional[int], Optional[int], str]]:
+        with self._lock:
+            return [event for event in self._events if event[0] > seq]
+
+    def last_event_seq(self) -> int:
+        with self._lock:
+            return self._last_event_seq
+
+    def latest_event_snapshot(self) -> Optional[Tuple[int, str]]:
+        with self._lock:
+            return self._event_snapshots[-1] if self._event_snapshots else None
+
+    def save_event_snapshot(self, seq: int, state: str):
+        with self.transaction():
+            previous = list(self._event_snapshots)
+            self._event_snapshots = sorted(
+                [snapshot for snapshot in previous if snapshot[0] != seq] + [(seq, state)]
+            )
+            self._on_rollback(lambda: setattr(self, "_event_snapshots", previous))
+
+    def drop_events_through(self, seq: int):
+        with self.transaction():
+            events, snapshots = self._events, self._event_snapshots
+            self._events = [event for event in events if event[0] > seq]
+            self._event_snapshots = [snapshot for snapshot in snapshots if snapshot[0] >= seq]
+
+            def undo():
+                self._events, self._event_snapshots = events, snapshots
+            self._on_rollback(undo)
+
+    # Settings
+    def load_settings(self) -> Dict[str, str]:
+        with self._lock:
+            return dict(self._settings)
+
+    def save_settings(self, items: List[Tuple[str, str]]):
+        with self.transaction():
+            previous = dict(self._settings)
+            self._settings.update(items)
+            self._on_rollback(lambda: setattr(self, "_settings", previous))
@@ -0,0 +1,695 @@
+"""SQLite storage backend for Axilium."""
+
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import MAXYEAR, MINYEAR, date, datetime
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+from .base import StorageBackend, datetime_from_day
+from .. import bitmaps, runs
+from ..connection import ConnectionManager
+from ..habit import Habit
+from ..migrations import migrate
+from ..reward import Reward
+
+
+# Columns in dataclass field order, so rows map positionally onto from_row()
+HABIT_COLUMNS = """id, name, description, category, color, icon, frequency, streak_count,
+    longest_streak, created_date, last_completed_date, goal_days_per_week,
+    goal_days_per_month, reward_points, reminder_time, reminder_enabled"""
+REWARD_COLUMNS = "id, name, description, points_required, unlocked_date, icon, image_path"
+
+_datetime_from_iso = lru_cache(maxsize=256)(datetime.fromisoformat)
+
+# SET clause deriving a habit's streaks from its completion runs: the
+# current streak is the latest run, found on the primary key, and the
+# longest comes from the (habit_id, end_day - start_day) index
+_RUN_STREAKS = """
+    streak_count = COALESCE((
+        SELECT end_day - start_day + 1 FROM completion_runs
+        WHERE habit_id = habits.id ORDER BY start_day DESC LIMIT 1
+    ), 0),
+    longest_streak = COALESCE((
+        SELECT MAX(end_day - start_day) + 1 FROM completion_runs WHERE habit_id = habits.id
+    ), 0),
+    last_completed_date = (
+        SELECT end_day FROM completion_runs
+        WHERE habit_id = habits.id ORDER BY start_day DESC LIMIT 1
+    )"""
+
+# Upper bound for open-ended day ranges
+_LAST_DAY = date.max.toordinal()
+
+# SQL functions for updating completion bitmaps in place
+_BITMAP_FUNCTIONS = {
+    "bitmap_set": (2, bitmaps.set_bit),
+    "bitmap_clear": (2, bitmaps.clear_bit),
+    "bitmap_test": (2, lambda bits, bit: int(bitmaps.test_bit(bits, bit))),
+    # NULL bits come from habits without a bitmap in range (see _RANGE_BITMAPS)
+    "bitmap_count": (4, lambda year, bits, start, end: bitmaps.count_days([(year, bits)], start, end) if bits else 0),
+}
+
+# Joins every habit (h) to its bitmaps (b) for the years of :start..:end.
+# The bitmaps span both completion tiers, and the cost of a range count
+# does not depend on its length.
+_RANGE_BITMAPS = """
+    FROM habits h LEFT JOIN completion_bitmaps b
+        ON b.habit_id = h.id AND b.year BETWEEN :first_year AND :last_year"""
+
+
+def _range_clause(column: str, start: Optional[int], end: Optional[int]) -> Tuple[str, list]:
+    """Return an ``AND ...`` filter on ``column`` for an inclusive day range."""
+    if start is not None and end is not None:
+        return f" AND {column} BETWEEN ? AND ?", [start, end]
+    if start is not None:
+        return f" AND {column} >= ?", [start]
+    if end is not None:
+        return f" AND {column} <= ?", [end]
+    return "", []
+
+
+class SQLiteBackend(StorageBackend):
+    """Stores everything in a SQLite file.
+
+    Each thread gets its own WAL-mode connection, so background readers
+    never block UI writes. Snapshots read from a second, read-only
+    connection per thread. The schema is migrated on open.
+
+    Streaks are read from ``completion_runs``, which holds each habit's
+    completions as runs of consecutive days and is updated in place (two
+    runs at most) by every completion write.
+
+    Completion counts and "was this day completed" checks are answered from
+    ``completion_bitmaps``, which every completion write here keeps in sync
+    with ``completions`` in the same transaction. Completions written by
+    other means must be followed by ``rebuild_bitmaps()``.
+
+    Completions are stored in two tiers: recent ones in ``completions`` and
+    those older than the archive horizon as per-month masks in
+    ``completions_archive`` (see ``archive_completions()``). Day lists read
+    the archive only when the range starts before the horizon.
+    """
+
+    def __init__(self, db_path: str, pragmas: Optional[Dict[str, Union[str, int]]] = None):
+        """Open (creating if needed) and migrate the database at ``db_path``.
+
+        ``pragmas`` overrides the connection defaults
+        (e.g. ``{"synchronous": "FULL", "mmap_size": 0}``).
+        """
+        # Ensure data directory exists
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+        self.db_path = db_path
+        self.connections = ConnectionManager(db_path, pragmas, functions=_BITMAP_FUNCTIONS)
+        self.readers = ConnectionManager(db_path, pragmas, read_only=True, functions=_BITMAP_FUNCTIONS)
+        self._local = threading.local()
+        # Schema version the file was at before this open
+        self.migrated_from = migrate(self)
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Connection owned by the calling thread."""
+        return self.connections.get()
+
+    @property
+    def _read_conn(self) -> sqlite3.Connection:
+        """Connection for reads: the active snapshot, if any."""
+        return getattr(self._local, "snapshot", None) or self.conn
+
+    @contextmanager
+    def snapshot(self) -> Iterator[sqlite3.Connection]:
+        """Read from a ``mode=ro`` connection holding one read transaction.
+
+        In WAL mode that reader never blocks, and is never blocked by, the
+        writer. Nested calls reuse the outer snapshot.
+        """
+        active = getattr(self._local, "snapshot", None)
+        if active is not None:
+            yield active
+            return
+
+        conn = self.readers.get()
+        conn.execute("BEGIN")
+        # WAL pins the snapshot at the first read of the transaction
+        conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+        self._local.snapshot = conn
+        try:
+            yield conn
+        finally:
+            self._local.snapshot = None
+            conn.rollback()
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run BEGIN IMMEDIATE ... COMMIT, or a savepoint when nested."""
+        conn = self.conn
+        depth = getattr(self._local, "tx_depth", 0)
+        savepoint = f"sp_{depth}"
+        # A transaction already open on this connection (ours, or an implicit
+        # one started by raw SQL on conn) is joined with a savepoint
+        outermost = not conn.in_transaction
+        if outermost:
+            conn.execute("BEGIN IMMEDIATE")
+        else:
+            conn.execute(f"SAVEPOINT {savepoint}")
+
+        self._local.tx_depth = depth + 1
+        try:
+            yield conn
+        except BaseException:
+            if outermost:
+                conn.rollback()
+            else:
+                conn.execute(f"ROLLBACK TO {savepoint}")
+                conn.execute(f"RELEASE {savepoint}")
+            raise
+        else:
+            if outermost:
+                conn.commit()
+            else:
+                conn.execute(f"RELEASE {savepoint}")
+        finally:
+            self._local.tx_depth = depth
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        """Run one backend write, joining an open ``transaction()`` without a savepoint.
+
+        If the write raises, the error propagates through the enclosing
+        block, which rolls it back. Large writes slow down superlinearly
+        under an open savepoint once they spill the page cache, so a bulk
+        load must not run inside one of its own.
+        """
+        if getattr(self._local, "tx_depth", 0):
+            yield self.conn
+        else:
+            with self.transaction() as conn:
+                yield conn
+
+    def close(self):
+        """Close all connections."""
+        self.readers.close_all()
+        self.connections.close_all()
+
+    # Habits
+    def insert_habit(self, habit: Habit) -> int:
+        with self._write() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO habits (name, description, category, color, icon, frequency,
+                                  streak_count, longest_streak, created_date, last_completed_date,
+                                  goal_days_per_week, goal_days_per_month, reward_points,
+                                  reminder_time, reminder_enabled)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                habit.name, habit.description, habit.category, habit.color, habit.icon,
+                habit.frequency, habit.streak_count, habit.longest_streak,
+                habit.created_date.toordinal(),
+                habit.last_completed_date.toordinal() if habit.last_completed_date else None,
+                habit.goal_days_per_week, habit.goal_days_per_month, habit.reward_points,
+                habit.reminder_time, 1 if habit.reminder_enabled else 0
+            ))
+        return cursor.lastrowid
+
+    def fetch_habit(self, habit_id: int) -> Optional[Habit]:
+        cursor = self._read_conn.cursor()
+        cursor.execute(f"SELECT {HABIT_COLUMNS} FROM habits WHERE id = ?", (habit_id,))
+        row = cursor.fetchone()
+        return self._row_to_habit(row) if row else None
+
+    def fetch_habits(self) -> List[Habit]:
+        cursor = self._read_conn.cursor()
+        cursor.execute(f"SELECT {HABIT_COLUMNS} FROM habits ORDER BY created_date DESC, id DESC")
+        row_to_habit = self._row_to_habit
+        return [row_to_habit(row) for row in cursor.fetchall()]
+
+    def update_habit(self, habit: Habit, day: int) -> Optional[Habit]:
+        with self._write() as conn:
+            cursor = conn.cursor()
+            # Record any change to the habit's points in the ledger
+            cursor.execute("""
+                INSERT INTO points_ledger (habit_id, day, points, reason)
+                SELECT id, ?, ? - reward_points, 'adjustment'
+                FROM habits WHERE id = ? AND reward_points <> ?
+            """, (day, habit.reward_points, habit.id, habit.reward_points))
+            cursor.execute(f"""
+                UPDATE habits SET name = ?, description = ?, category = ?, color = ?, icon = ?,
+                                frequency = ?, streak_count = ?, longest_streak = ?,
+                                last_completed_date = ?, goal_days_per_week = ?,
+                                goal_days_per_month = ?, reward_points = ?, reminder_time = ?,
+                                reminder_enabled = ?
+                WHERE id = ?
+                RETURNING {HABIT_COLUMNS}
+            """, (
+                habit.name, habit.description, habit.category, habit.color, habit.icon,
+                habit.frequency, habit.streak_count, habit.longest_streak,
+                habit.last_completed_date.toordinal() if habit.last_completed_date else None,
+                habit.goal_days_per_week, habit.goal_days_per_month, habit.reward_points,
+                habit.reminder_time, 1 if habit.reminder_enabled else 0, habit.id
+            ))
+            row = cursor.fetchone()
+        return self._row_to_habit(row) if row else None
+
+    def delete_habit(self, habit_id: int, day: int):
+        # The habits_deleted_points trigger records the lost points
+        with self._write() as conn:
+            conn.execute("DELETE FROM habits WHERE id = ?", (habit_id,))
+
+    def _row_to_habit(self, row) -> Habit:
+        """Convert a positional database row to a Habit object."""
+        values = list(row)
+        values[9] = datetime_from_day(values[9])  # created_date
+        if values[10]:
+            values[10] = datetime_from_day(values[10])  # last_completed_date
+        values[15] = bool(values[15])  # reminder_enabled
+        return Habit.from_row(values)
+
+    # Completions
+    def complete_habit(self, habit_id: int, day: int, points: int) -> Optional[Habit]:
+        # The bitmaps cover archived days too, so they are the duplicate
+        # check; the unique index on (habit_id, completion_date) backs it up
+        year, bit = bitmaps.day_position(day)
+        with self._write() as conn:
+            cursor = conn.execute("""
+                INSERT OR IGNORE INTO completions (habit_id, completion_date)
+                SELECT id, :day FROM habits
+                WHERE id = :id AND NOT bitmap_test((
+                    SELECT bits FROM completion_bitmaps WHERE habit_id = :id AND year = :year
+                ), :bit)
+            """, {"id": habit_id, "day": day, "year": year, "bit": bit})
+
+            if cursor.rowcount != 1:
+                return None  # Already completed, or no such habit
+
+            cursor.execute("""
+                INSERT INTO completion_bitmaps (habit_id, year, bits)
+                VALUES (:id, :year, bitmap_set(NULL, :bit))
+                ON CONFLICT (habit_id, year) DO UPDATE SET bits = bitmap_set(bits, :bit)
+            """, {"id": habit_id, "year": year, "bit": bit})
+
+            self._add_run(cursor, habit_id, day, day)
+            cursor.execute(f"""
+                UPDATE habits SET {_RUN_STREAKS}, reward_points = reward_points + ?
+                WHERE id = ?
+                RETURNING {HABIT_COLUMNS}
+            """, (points, habit_id))
+            return self._row_to_habit(cursor.fetchone())
+
+    def add_completions(self, days_by_habit: Dict[int, List[int]], points: int) -> Dict[int, int]:
+        inserted: Dict[int, int] = {}
+        ledger: List[Tuple[int, int, int]] = []
+        with self._write() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT id FROM habits")
+            known = {row[0] for row in cursor.fetchall()}
+            # Silence the per-row points triggers; the ledger is written in
+            # one batch below. The guard row never outlives this transaction,
+            # so no other connection sees it
+            cursor.execute("INSERT INTO points_bulk (id) VALUES (1)")
+
+            for habit_id, days in days_by_habit.items():
+                if habit_id not in known:
+                    continue
+                # The bitmaps cover archived days too, so they tell which days are new
+                cursor.execute("SELECT year, bits FROM completion_bitmaps WHERE habit_id = ?", (habit_id,))
+                existing = dict(cursor.fetchall())
+                new_days = sorted({
+                    day for day, (year, bit) in ((day, bitmaps.day_position(day)) for day in days)
+                    if not bitmaps.test_bit(existing.get(year), bit)
+                })
+                if not new_days:
+                    continue
+
+                # Inserting in index order keeps B-tree writes sequential
+                cursor.executemany("""
+                    INSERT INTO completions (completion_date, habit_id)
+                    VALUES (?, ?)
+                """, [(day, habit_id) for day in new_days])
+                cursor.executemany("""
+                    INSERT OR REPLACE INTO completion_bitmaps (habit_id, year, bits)
+                    VALUES (?, ?, ?)
+                """, [
+                    (habit_id, year, bitmaps.merge(existing.get(year), bits))
+                    for year, bits in bitmaps.from_days(new_days).items()
+                ])
+                # Only runs next to a stored completion merge with a stored
+                # run; the rest, every run of a habit without history, are new
+                merging, separate = [], []
+                for start, end in runs.from_days(new_days):
+                    touches = any(
+                        bitmaps.test_bit(existing.get(year), bit)
+                        for year, bit in (bitmaps.day_position(start - 1), bitmaps.day_position(end + 1))
+                    )
+                    (merging if touches else separate).append((habit_id, start, end))
+                cursor.executemany("""
+                    INSERT INTO completion_runs (habit_id, start_day, end_day) VALUES (?, ?, ?)
+                """, separate)
+                for run in merging:
+                    self._add_run(cursor, *run)
+                inserted[habit_id] = len(new_days)
+                ledger.extend((habit_id, day, points) for day in new_days)
+
+            cursor.executemany("""
+                INSERT INTO points_ledger (habit_id, day, points, reason)
+                VALUES (?, ?, ?, 'completion')
+            """, ledger)
+            cursor.execute("UPDATE points_total SET total = total + ? WHERE id = 1", (len(ledger) * points,))
+            cursor.execute("DELETE FROM points_bulk")
+            cursor.executemany(f"""
+                UPDATE habits SET {_RUN_STREAKS}, reward_points = reward_points + ?
+                WHERE id = ?
+            """, [(count * points, habit_id) for habit_id, count in inserted.items()])
+        return inserted
+
+    def uncomplete_habit(self, habit_id: int, day: int, points: int) -> Optional[Habit]:
+        with self._write() as conn:
+            cursor = conn.execute("""
+                DELETE FROM completions WHERE habit_id = ? AND completion_date = ?
+            """, (habit_id, day))
+            if cursor.rowcount != 1:
+                month, month_bit = bitmaps.month_position(day)
+                cursor.execute("""
+                    UPDATE completions_archive SET days = days & ~(1 << :bit)
+                    WHERE habit_id = :id AND month = :month AND days & (1 << :bit)
+                """, {"id": habit_id, "month": month, "bit": month_bit})
+                if cursor.rowcount != 1:
+                    return None
+                cursor.execute("""
+                    DELETE FROM completions_archive WHERE habit_id = ? AND month = ? AND days = 0
+                """, (habit_id, month))
+
+            year, bit = bitmaps.day_position(day)
+            cursor.execute("""
+                UPDATE completion_bitmaps SET bits = bitmap_clear(bits, ?)
+                WHERE habit_id = ? AND year = ?
+            """, (bit, habit_id, year))
+            self._remove_run(cursor, habit_id, day)
+            cursor.execute("""
+                INSERT INTO points_ledger (habit_id, day, points, reason)
+                VALUES (?, ?, ?, 'uncompleted')
+            """, (habit_id, day, -points))
+            cursor.execute(f"""
+                UPDATE habits SET {_RUN_STREAKS}, reward_points = reward_points - ?
+                WHERE id = ?
+                RETURNING {HABIT_COLUMNS}
+            """, (points, habit_id))
+            return self._row_to_habit(cursor.fetchone())
+
+    def completion_days(self, habit_id: int, start: Optional[int] = None, end: Optional[int] = None) -> List[int]:
+        return self._days(self._read_conn, habit_id, start, end)
+
+    def _days(self, conn: sqlite3.Connection, habit_id: int,
+              start: Optional[int] = None, end: Optional[int] = None) -> List[int]:
+        """Return a habit's completed days across both tiers, ascending.
+
+        The archive branch is guarded by the horizon inside the statement, so
+        a range that starts after it costs one range scan on ``completions``.
+        """
+        first = 1 if start is None else start
+        last = _LAST_DAY if end is None else end
+        rows = conn.execute("""
+            SELECT completion_date, NULL FROM completions
+            WHERE habit_id = :id AND completion_date BETWEEN :first AND :last
+            UNION ALL
+            SELECT month, days FROM completions_archive
+            WHERE :first < (SELECT before FROM archive_horizon)
+              AND habit_id = :id AND month BETWEEN :first_month AND :last_month
+            ORDER BY 1
+        """, {
+            "id": habit_id,
+            "first": first,
+            "last": last,
+            "first_month": bitmaps.month_position(first)[0],
+            "last_month": bitmaps.month_position(last)[0],
+        }).fetchall()
+        if not rows or rows[0][1] is None:
+            return [row[0] for row in rows]  # all hot
+
+        # Archived months sort first; back-dated hot rows may interleave with them
+        days = [row[0] for row in rows if row[1] is None]
+        for month, mask in rows:
+            if mask is not None:
+                days.extend(day for day in bitmaps.month_days(month, mask) if first <= day <= last)
+        days.sort()
+        return days
+
+    def count_completions(self, habit_id: int, start: Optional[int] = None, end: Optional[int] = None) -> int:
+        # A popcount over at most one bitmap per year in the range
+        first_year = date.fromordinal(start).year if start is not None else MINYEAR
+        last_year = date.fromordinal(end).year if end is not None else MAXYEAR
+        rows = self._read_conn.execute("""
+            SELECT year, bits FROM completion_bitmaps
+            WHERE habit_id = ? AND year BETWEEN ? AND ?
+        """, (habit_id, first_year, last_year)).fetchall()
+        return bitmaps.count_days(rows, start, end)
+
+    def is_completed(self, habit_id: int, day: int) -> bool:
+        year, bit = bitmaps.day_position(day)
+        cursor = self._read_conn.cursor()
+        cursor.execute("SELECT bits FROM completion_bitmaps WHERE habit_id = ? AND year = ?", (habit_id, year))
+        row = cursor.fetchone()
+        return bitmaps.test_bit(row[0] if row else None, bit)
+
+    def _write_bitmaps(self, cursor: sqlite3.Cursor, habit_id: int, days: List[int]):
+        """Replace a habit's bitmaps with ones built from its sorted completion days."""
+        cursor.execute("DELETE FROM completion_bitmaps WHERE habit_id = ?", (habit_id,))
+        cursor.executemany(
+            "INSERT INTO completion_bitmaps (habit_id, year, bits) VALUES (?, ?, ?)",
+            [(habit_id, year, bits) for year, bits in bitmaps.from_days(days).items()]
+        )
+
+    def completion_counts(self, start: int, end: int) -> Dict[int, int]:
+        rows = self._read_conn.execute(f"""
+            SELECT h.id, COALESCE(SUM(bitmap_count(b.year, b.bits, :start, :end)), 0)
+            {_RANGE_BITMAPS}
+            GROUP BY h.id
+        """, self._range_params(start, end)).fetchall()
+        return dict(rows)
+
+    def completion_bitmaps(self, first_year: int, last_year: int) -> List[Tuple[int, int, bytes]]:
+        return self._read_conn.execute("""
+            SELECT habit_id, year, bits FROM completion_bitmaps WHERE year BETWEEN ? AND ?
+        """, (first_year, last_year)).fetchall()
+
+    @staticmethod
+    def _range_params(start: int, end: int) -> Dict[str, int]:
+        return {
+            "start": start,
+            "end": end,
+            "first_year": date.fromordinal(start).year,
+            "last_year": date.fromordinal(end).year,
+        }
+
+    def expire_streaks(self, day: int) -> List[Habit]:
+        with self._write() as conn:
+            cursor = conn.execute(f"""
+                UPDATE habits SET streak_count = 0
+                WHERE streak_count > 0 AND (last_completed_date IS NULL OR last_completed_date < ?)
+                RETURNING {HABIT_COLUMNS}
+            """, (day - 1,))
+            rows = cursor.fetchall()
+        return [self._row_to_habit(row) for row in rows]
+
+    def _add_run(self, cursor: sqlite3.Cursor, habit_id: int, start: int, end: int):
+        """Add the new days ``start`` to ``end`` to the habit's runs, merging neighbours."""
+        # The run starting right after the new days, if any, then the one before them
+        cursor.execute("""
+            SELECT start_day, end_day FROM completion_runs
+            WHERE habit_id = ? AND start_day <= ?
+            ORDER BY start_day DESC LIMIT 2
+        """, (habit_id, end + 1))
+        neighbours = cursor.fetchall()
+        if neighbours and neighbours[0][0] == end + 1:
+            cursor.execute("DELETE FROM completion_runs WHERE habit_id = ? AND start_day = ?", (habit_id, end + 1))
+            end = neighbours.pop(0)[1]
+        left = neighbours[0] if neighbours else None
+
+        if left and left[1] == start - 1:
+            cursor.execute("""
+                UPDATE completion_runs SET end_day = ? WHERE habit_id = ? AND start_day = ?
+            """, (end, habit_id, left[0]))
+        else:
+            cursor.execute("""
+                INSERT INTO completion_runs (habit_id, start_day, end_day) VALUES (?, ?, ?)
+            """, (habit_id, start, end))
+
+    def _remove_run(self, cursor: sqlite3.Cursor, habit_id: int, day: int):
+        """Remove ``day`` from the habit's runs, splitting the run around it."""
+        cursor.execute("""
+            SELECT start_day, end_day FROM completion_runs
+            WHERE habit_id = ? AND start_day <= ?
+            ORDER BY start_day DESC LIMIT 1
+        """, (habit_id, day))
+        row = cursor.fetchone()
+        if row is None or row[1] < day:
+            return
+        start, end = row
+        cursor.execute("DELETE FROM completion_runs WHERE habit_id = ? AND start_day = ?", (habit_id, start))
+        cursor.executemany("""
+            INSERT INTO completion_runs (habit_id, start_day, end_day) VALUES (?, ?, ?)
+        """, [
+            (habit_id, run_start, run_end)
+            for run_start, run_end in ((start, day - 1), (day + 1, end))
+            if run_start <= run_end
+        ])
+
+    def rebuild_runs(self):
+        """Rebuild every habit's completion runs from both completion tiers."""
+        with self._write() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM completion_runs")
+            cursor.execute("SELECT id FROM habits")
+            for (habit_id,) in cursor.fetchall():
+                cursor.executemany(
+                    "INSERT INTO completion_runs (habit_id, start_day, end_day) VALUES (?, ?, ?)",
+                    [(habit_id, start, end) for start, end in runs.from_days(self._days(conn, habit_id))]
+                )
+
+    def rebuild_bitmaps(self):
+        """Rebuild every completion bitmap from both completion tiers."""
+        with self._write() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT habit_id, completion_date FROM completions")
+            days_by_habit: Dict[int, List[int]] = {}
+            for habit_id, day in cursor.fetchall():
+                days_by_habit.setdefault(habit_id, []).append(day)
+            cursor.execute("SELECT habit_id, month, days FROM completions_archive")
+            for habit_id, month, mask in cursor.fetchall():
+                days_by_habit.setdefault(habit_id, []).extend(bitmaps.month_days(month, mask))
+            cursor.execute("DELETE FROM completion_bitmaps")
+            for habit_id, days in days_by_habit.items():
+                self._write_bitmaps(cursor, habit_id, days)
+
+    def archive_completions(self, before: int) -> int:
+        """Move completions before the month of ``before`` into the archive.
+
+        The horizon is rounded down to the first of the month and never
+        moves back; completions back-dated past it since the last run are
+        archived too. Returns the number of completions moved.
+        """
+        with self._write() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT before FROM archive_horizon")
+            horizon = max(cursor.fetchone()[0], bitmaps.month_start(bitmaps.month_position(before)[0]))
+            cursor.execute("""
+                SELECT habit_id, completion_date FROM completions
+                WHERE completion_date < ? AND habit_id IN (SELECT id FROM habits)
+            """, (horizon,))
+            days_by_habit: Dict[int, List[int]] = {}
+            for habit_id, day in cursor.fetchall():
+                days_by_habit.setdefault(habit_id, []).append(day)
+            cursor.executemany("""
+                INSERT INTO completions_archive (habit_id, month, days) VALUES (?, ?, ?)
+                ON CONFLICT (habit_id, month) DO UPDATE SET days = days | excluded.days
+            """, [
+                (habit_id, month, mask)
+                for habit_id, days in days_by_habit.items()
+                for month, mask in bitmaps.months_from_days(days).items()
+            ])
+            cursor.execute("""
+                DELETE FROM completions
+                WHERE completion_date < ? AND habit_id IN (SELECT id FROM habits)
+            """, (horizon,))
+            moved = cursor.rowcount
+            cursor.execute("UPDATE archive_horizon SET before = ? WHERE id = 1", (horizon,))
+        return moved
+
+    # Rewards and points
+    def fetch_rewards(self) -> List[Reward]:
+        cursor = self._read_conn.cursor()
+        cursor.execute(f"SELECT {REWARD_COLUMNS} FROM rewards ORDER BY points_required")
+        return [self._row_to_reward(row) for row in cursor.fetchall()]
+
+    def _row_to_reward(self, row) -> Reward:
+        """Convert a positional database row to a Reward object."""
+        values = list(row)
+        if values[4]:
+            values[4] = _datetime_from_iso(values[4])  # unlocked_date
+        return Reward.from_row(values)
+
+    def set_reward_unlocked(self, reward_id: int, unlocked: Optional[datetime]):
+        with self._write() as conn:
+            conn.execute("""
+                UPDATE rewards SET unlocked_date = ?
+                WHERE id = ?
+            """, (unlocked.isoformat() if unlocked else None, reward_id))
+
+    def total_points(self) -> int:
+        cursor = self._read_conn.cursor()
+        cursor.execute("SELECT total FROM points_total WHERE id = 1")
+        return cursor.fetchone()[0]
+
+    def points_by_day(self, start: int, end: int, habit_id: Optional[int] = None) -> Dict[int, int]:
+        cursor = self._read_conn.cursor()
+        if habit_id is None:
+            cursor.execute("""
+                SELECT day, SUM(points) FROM points_ledger
+                WHERE day BETWEEN ? AND ?
+                GROUP BY day
+            """, (start, end))
+        else:
+            cursor.execute("""
+                SELECT day, SUM(points) FROM points_ledger
+                WHERE habit_id = ? AND day BETWEEN ? AND ?
+                GROUP BY day
+            """, (habit_id, start, end))
+        return dict(cursor.fetchall())
+
+    def points_by_habit(self, start: Optional[int] = None, end: Optional[int] = None) -> Dict[int, int]:
+        where, params = _range_clause("day", start, end)
+        cursor = self._read_conn.cursor()
+        cursor.execute(f"""
+            SELECT habit_id, SUM(points) FROM points_ledger
+            WHERE 1{where}
+            GROUP BY habit_id
+        """, params)
+        return dict(cursor.fetchall())
+
+    # Event log
+    def append_event(self, kind: str, habit_id: Optional[int], day: Optional[int], payload: str) -> int:
+        with self._write() as conn:
+            cursor = conn.execute("""
+                INSERT INTO events (kind, habit_id, day, payload)
+                VALUES (?, ?, ?, ?)
+            """, (kind, habit_id, day, payload))
+        return cursor.lastrowid
+
+    def events_after(self, seq: int) -> List[Tuple[int, str, Optional[int], Optional[int], str]]:
+        cursor = self._read_conn.cursor()
+        cursor.execute("SELECT seq, kind, habit_id, day, payload FROM events WHERE seq > ? ORDER BY seq", (seq,))
+        return cursor.fetchall()
+
+    def last_event_seq(self) -> int:
+        cursor = self._read_conn.cursor()
+        cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'events'")
+        row = cursor.fetchone()
+        return row[0] if row else 0
+
+    def latest_event_snapshot(self) -> Optional[Tuple[int, str]]:
+        cursor = self._read_conn.cursor()
+        cursor.execute("SELECT seq, state FROM event_snapshots ORDER BY seq DESC LIMIT 1")
+        return cursor.fetchone()
+
+    def save_event_snapshot(self, seq: int, state: str):
+        with self._write() as conn:
+            conn.execute("INSERT OR REPLACE INTO event_snapshots (seq, state) VALUES (?, ?)", (seq, state))
+
+    def drop_events_through(self, seq: int):
+        with self._write() as conn:
+            conn.execute("DELETE FROM events WHERE seq <= ?", (seq,))
+            conn.execute("DELETE FROM event_snapshots WHERE seq < ?", (seq,))
+
+    # Settings
+    def load_settings(self) -> Dict[str, str]:
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT key, value FROM settings")
+        return dict(cursor.fetchall())
+
+    def save_settings(self, items: List[Tuple[str, str]]):
+        with self._write() as conn:
+            conn.executemany("""
+                INSERT OR REPLACE INTO settings (key, value)
+                VALUES (?, ?)
+            """, items)
@@ -0,0 +1,130 @@
+"""Vectorized completion analytics."""
+
+from datetime import date, timedelta
+from typing import Dict, List, Tuple
+import numpy as np
+from ..models import bitmaps
+from ..models.database import Database
+from ..models.habit import Habit
+
+
+class CompletionMatrix:
+    """Every habit's completions over a window of days, as a dense boolean matrix.
+
+    Row ``i`` is ``habits[i]`` (in ``get_all_habits()`` order) and column
+    ``j`` is ``start + j`` days. Loading takes one bitmap query; every
+    metric after that is a NumPy reduction over the matrix or a slice of it.
+    """
+
+    def __init__(self, habits: List[Habit], start: date, matrix: np.ndarray):
+        """Wrap a ``len(habits) x days`` boolean matrix starting at ``start``."""
+        self.habits = habits
+        self.start = start
+        self.matrix = matrix
+        self._rows = {habit.id: i for i, habit in enumerate(habits)}
+
+    @classmethod
+    def load(cls, db: Database, start: date, end: date) -> "CompletionMatrix":
+        """Load completions from ``start`` to ``end`` inclusive, from one snapshot."""
+        with db.snapshot():
+            habits = db.get_all_habits()
+            stored = db.get_completion_bitmaps(start, end)
+
+        rows = {habit.id: i for i, habit in enumerate(habits)}
+        matrix = bitmaps.to_matrix(stored, rows, start.toordinal(), (end - start).days + 1)
+        return cls(habits, start, matrix)
+
+    @classmethod
+    def load_habit(cls, db: Database, habit_id: int, start: date, end: date) -> "CompletionMatrix":
+        """Load one habit's completions from ``start`` to ``end`` as a single-row matrix."""
+        with db.snapshot():
+            habit = db.get_habit(habit_id)
+            completions = db.get_completions(habit_id, start, end) if habit else []
+
+        habits = [habit] if habit else []
+        matrix = np.zeros((len(habits), max((end - start).days + 1, 0)), dtype=bool)
+        if completions:
+            matrix[0, [(day - start).days for day in completions]] = True
+        return cls(habits, start, matrix)
+
+    @property
+    def end(self) -> date:
+        """Return the last day of the window."""
+        return self.start + timedelta(days=self.matrix.shape[1] - 1)
+
+    def dates(self) -> List[date]:
+        """Return the window's days, one per column."""
+        return [self.start + timedelta(days=i) for i in range(self.matrix.shape[1])]
+
+    def covers(self, start: date, end: date) -> bool:
+        """Return whether the window includes ``start`` to ``end``."""
+        return self.start <= start and end <= self.end
+
+    def window(self, start: date, end: date) -> "CompletionMatrix":
+        """Return the sub-window from ``start`` to ``end``, sharing memory with this one."""
+        lo = (start - self.start).days
+        hi = (end - self.start).days + 1
+        return CompletionMatrix(self.habits, start, self.matrix[:, lo:hi])
+
+    def row(self, habit_id: int) -> np.ndarray:
+        """Return one habit's completed days (all False for an unknown habit)."""
+        i = self._rows.get(habit_id)
+        if i is None:
+            return np.zeros(self.matrix.shape[1], dtype=bool)
+        return self.matrix[i]
+
+    def counts(self) -> np.ndarray:
+        """Return every habit's completion count, by row."""
+        return self.matrix.sum(axis=1)
+
+    def counts_by_habit(self) -> Dict[int, int]:
+        """Return every habit's completion count, by habit id."""
+        return {habit.id: int(count) for habit, count in zip(self.habits, self.counts())}
+
+    def daily_totals(self) -> np.ndarray:
+        """Return how many habits were completed on each day, by column."""
+        return self.matrix.sum(axis=0)
+
+    def category_totals(self) -> Dict[str, int]:
+        """Return completion counts per category, for every category in use, in first-seen habit order."""
+        if not self.habits:
+            return {}
+        categories, first, codes = np.unique(
+            [habit.category for habit in self.habits], return_index=True, return_inverse=True
+        )
+        totals = np.bincount(codes, weights=self.counts(), minlength=len(categories))
+        return {str(categories[i]): int(totals[i]) for i in np.argsort(first)}
+
+    def rolling_counts(self, days: int) -> np.ndarray:
+        """Return each habit's completions over the ``days`` days ending on each column.
+
+        Columns earlier than ``days`` into the window only count what the
+        window holds.
+        """
+        prefix = np.zeros((self.matrix.shape[0], self.matrix.shape[1] + 1), dtype=np.int32)
+        np.cumsum(self.matrix, axis=1, out=prefix[:, 1:])
+        lagged = np.maximum(np.arange(1, prefix.shape[1]) - days, 0)
+        return prefix[:, 1:] - prefix[:, lagged]
+
+    def run_lengths(self) -> np.ndarray:
+        """Return, for each habit and day, the length of the run of completions ending that day."""
+        done = np.cumsum(self.matrix, axis=1)
+        # The count as of each habit's latest missed day, carried forward
+        reset = np.maximum.accumulate(np.where(self.matrix, 0, done), axis=1)
+        return done - reset
+
+    def streaks(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (current, longest) streak lengths within the window, by row.
+
+        The current streak is still alive if it ended on the window's last
+        day or the day before. Runs that reach back to the window's first
+        day are cut off there.
+        """
+        runs = self.run_lengths()
+        if runs.shape[1] == 0:
+            empty = np.zeros(runs.shape[0], dtype=runs.dtype)
+            return empty, empty
+        current = runs[:, -1]
+        if runs.shape[1] > 1:
+            current = np.where(current > 0, current, runs[:, -2])
+        return current, runs.max(axis=1)
@@ -0,0 +1,174 @@
+"""Dashboard snapshot service."""
+
+import threading
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+from ..models.database import Database
+from .stats_cache import (
+    DATED_METRICS, METRICS, StatsCache, affected_metrics,
+    decode_heatmap, decode_summary, encode_heatmap, encode_summary,
+)
+from .stats_maintainer import HEATMAP_DAYS, RATE_DAYS, StatsMaintainer
+from .stats_service import StatsService
+
+
+TREND_DAYS = 30
+
+
+@dataclass(frozen=True)
+class DashboardSnapshot:
+    """Every figure the dashboard shows, as of one data version.
+
+    Snapshots are shared between views; treat the dicts as read-only.
+    """
+
+    version: int
+    day: date
+    habit_count: int
+    total_points: int
+    completion_rate: float  # last 30 days, percent
+    average_streak: float
+    weekly: Dict
+    monthly: Dict
+    categories: Dict[str, int]  # last 30 days
+    trend: List[Tuple[date, int]]  # completions per day, last TREND_DAYS + 1 days
+    heatmap: Dict[date, int]  # completions per day, last HEATMAP_DAYS + 1 days
+
+
+class DashboardService:
+    """Compute dashboard figures once per data version and share them.
+
+    ``get()`` returns the cached snapshot while ``db.data_version`` and the
+    date are unchanged, so switching views or redrawing the sidebar after a
+    click costs nothing until a write actually commits. Completion figures
+    come from a ``StatsMaintainer`` that follows every commit, so even a
+    new snapshot is read off running aggregates rather than recomputed.
+
+    For databases stored in a file, the figures are saved to a
+    ``StatsCache`` at ``<db_path>.stats`` on ``close()``. The first ``get()``
+    after a restart starts from that file and recomputes only the figures
+    that the events since then, or a change of date, made stale.
+    """
+
+    def __init__(self, db: Database):
+        """Initialize with database connection."""
+        self.db = db
+        self.maintainer = StatsMaintainer(db)
+        db_path = getattr(db.backend, "db_path", None)
+        self.cache = StatsCache(db_path + ".stats") if db_path else None
+        self._lock = threading.Lock()
+        self._snapshot: Optional[DashboardSnapshot] = None
+
+    def get(self) -> DashboardSnapshot:
+        """Return the snapshot for the current data version, computing it if needed."""
+        with self._lock:
+            today = date.today()
+            snapshot = self._snapshot
+            if snapshot is None and self.cache is not None:
+                snapshot = self._snapshot = self._load_cached(today)
+            if snapshot is None or snapshot.version != self.db.data_version or snapshot.day != today:
+                snapshot = self._snapshot = self._compute(today)
+            return snapshot
+
+    def invalidate(self):
+        """Drop the cached snapshot."""
+        with self._lock:
+            self._snapshot = None
+
+    def close(self):
+        """Save the current figures for the next launch and stop following commits.
+
+        Call once writes have stopped, so the figures match the saved seq.
+        """
+        if self.cache is not None:
+            snapshot = self.get()
+            seq = self.db.backend.last_event_seq()
+            if snapshot.version == self.db.data_version:
+                self.cache.save(seq, snapshot.day, self._encode(snapshot))
+        self.maintainer.close()
+
+    def _compute(self, today: date) -> DashboardSnapshot:
+        """Read every figure off the maintained aggregates."""
+        habits = self.db.get_all_habits()
+        with self.maintainer.current() as stats:
+            # The aggregates' version: if a commit is still being
+            # delivered, the next get() sees a newer one and recomputes
+            return self._build(stats.version, today, {
+                "habit_count": stats.habit_count(),
+                "total_points": self.db.get_total_points(),
+                "average_streak": self._average_streak(habits, today),
+                "completion_rate": stats.completion_rate(),
+                "categories": stats.category_breakdown(),
+                "weekly": stats.weekly_summary(),
+                "monthly": stats.monthly_summary(),
+                "heatmap": stats.heatmap(HEATMAP_DAYS),
+            })
+
+    def _load_cached(self, today: date) -> Optional[DashboardSnapshot]:
+        """Start from the cache file, recomputing only the figures that went stale."""
+        cached = self.cache.load()
+        if cached is None:
+            return None
+        seq, day, figures = cached
+        # Read the version first, so a commit during the reads below makes
+        # the snapshot look old rather than current
+        version = self.db.data_version
+        changes = self.db.events.since(seq)
+        if changes is None:
+            return None
+
+        stale = affected_metrics(changes, today)
+        if day != today:
+            stale |= DATED_METRICS
+        figures = self._decode(figures, today)
+        stats = StatsService(self.db)
+        recompute = {
+            "habit_count": lambda: len(self.db.get_all_habits()),
+            "total_points": self.db.get_total_points,
+            "average_streak": lambda: self._average_streak(self.db.get_all_habits(), today),
+            "completion_rate": lambda: stats.get_overall_completion_rate(RATE_DAYS),
+            "categories": stats.get_category_breakdown,
+            "weekly": stats.get_weekly_summary,
+            "monthly": stats.get_monthly_summary,
+            "heatmap": lambda: stats.get_calendar_heatmap_data(HEATMAP_DAYS),
+        }
+        for name in stale:
+            figures[name] = recompute[name]()
+        return self._build(version, today, figures)
+
+    @staticmethod
+    def _average_streak(habits, today: date) -> float:
+        """Average ``current_streak``, as ``StatsService.get_average_streak``."""
+        if not habits:
+            return 0.0
+        return sum(habit.current_streak(today) for habit in habits) / len(habits)
+
+    @staticmethod
+    def _build(version: int, today: date, figures: Dict) -> DashboardSnapshot:
+        """Assemble a snapshot from its figures."""
+        trend_start = today - timedelta(days=TREND_DAYS)
+        return DashboardSnapshot(
+            version=version,
+            day=today,
+            trend=[(day, count) for day, count in figures["heatmap"].items() if day >= trend_start],
+            **figures
+        )
+
+    @staticmethod
+    def _encode(snapshot: DashboardSnapshot) -> Dict:
+        """Return a snapshot's figures in cache file form."""
+        figures = {name: getattr(snapshot, name) for name in METRICS}
+        figures["weekly"] = encode_summary(snapshot.weekly)
+        figures["monthly"] = encode_summary(snapshot.monthly)
+        figures["heatmap"] = encode_heatmap(snapshot.heatmap)
+        return figures
+
+    @staticmethod
+    def _decode(figures: Dict, today: date) -> Dict:
+        """Return cache file figures as snapshot values."""
+        figures = dict(figures)
+        figures["weekly"] = decode_summary(figures["weekly"])
+        figures["monthly"] = decode_summary(figures["monthly"])
+        figures["heatmap"] = decode_heatmap(figures["heatmap"], today)
+        return figures
@@ -27,30 +27,31 @@ class ExportService:
             "settings": {}
         }
         
-        # Export habits
-        habits = self.db.get_all_habits()
-        for habit in habits:
-            habit_dict = habit.to_dict()
-            data["habits"].append(habit_dict)
+        # Read everything from one consistent snapshot
+        with self.db.snapshot():
+            # Export habits
+            habits = self.db.get_all_habits()
+            for habit in habits:
+                habit_dict = habit.to_dict()
+                data["habits"].append(habit_dict)
+                
+                # Export completions for this habit
+                completions = self.db.get_completions(habit.id, start_date, end_date)
+                for completion_date in completions:
+                    data["completions"].append({
+                        "habit_id": habit.id,
+                        "habit_name": habit.name,
+                        "completion_date": completion_date.isoformat()
+                    })
             
-            # Export completions for this habit
-            completions = self.db.get_completions(habit.id, start_date, end_date)
-            for completion_date in completions:
-                data["completions"].append({
-                    "habit_id": habit.id,
-                    "habit_name": habit.name,
-                    "completion_date": completion_date.isoformat()
-                })
-        
-        # Export rewards
-        rewards = self.db.get_all_rewards()
-        for reward in rewards:
-            data["rewards"].append(reward.to_dict())
-        
-        # Export settings
-        # Note: This is a simplified version - you might want to export all settings
-        theme = self.db.get_setting("theme", "dark")
-        data["settings"]["theme"] = theme
+            # Export rewards
+            rewards = self.db.get_all_rewards()
+            for reward in rewards:
+                data["rewards"].append(reward.to_dict())
+            
+            # Export settings
+            data["settings"] = self.db.settings.as_dict()
+            data["settings"].setdefault("theme", "dark")
         
         # Write to file
         with open(file_path, 'w', encoding='utf-8') as f:
@@ -58,22 +59,23 @@ class ExportService:
     
     def export_to_csv(self, file_path: str, start_date: Optional[date] = None, end_date: Optional[date] = None):
         """Export completion records to CSV."""
-        habits = self.db.get_all_habits()
-        
-        with open(file_path, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow(["Habit ID", "Habit Name", "Category", "Completion Date", "Streak"])
+        with self.db.snapshot():
+            habits = self.db.get_all_habits()
             
-            for habit in habits:
-                completions = self.db.get_completions(habit.id, start_date, end_date)
-                for completion_date in completions:
-                    writer.writerow([
-                        habit.id,
-                        habit.name,
-                        habit.category,
-                        completion_date.isoformat(),
-                        habit.streak_count
-                    ])
+            with open(file_path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(["Habit ID", "Habit Name", "Category", "Completion Date", "Streak"])
+                
+                for habit in habits:
+                    completions = self.db.get_completions(habit.id, start_date, end_date)
+                    for completion_date in completions:
+                        writer.writerow([
+                            habit.id,
+                            habit.name,
+                            habit.category,
+                            completion_date.isoformat(),
+                            habit.current_streak()
+                        ])
     
     def import_from_json(self, file_path: str) -> bool:
         """Import data from JSON file."""
@@ -81,24 +83,32 @@ class ExportService:
             with open(file_path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
             
-            # Import habits
-            if "habits" in data:
-                for habit_data in data["habits"]:
-                    habit = Habit.from_dict(habit_data)
-                    if habit.id:
-                        # Update existing or create new
-                        existing = self.db.get_habit(habit.id)
-                        if existing:
-                            self.db.update_habit(habit)
-                        else:
-                            self.db.add_habit(habit)
-            
-            # Import completions
-            if "completions" in data:
-                for comp_data in data["completions"]:
-                    habit_id = comp_data.get("habit_id")
-                    comp_date = date.fromisoformat(comp_data["completion_date"])
-                    self.db.add_completion(habit_id, comp_date)
+            # Import everything atomically with a single commit
+            with self.db.transaction():
+                # Import habits
+                if "habits" in data:
+                    for habit_data in data["habits"]:
+                        habit = Habit.from_dict(habit_data)
+                        if habit.id:
+                            # Update existing or create new
+                            existing = self.db.get_habit(habit.id)
+                            if existing:
+                                self.db.update_habit(habit)
+                            else:
+                                self.db.add_habit(habit)
+                
+                # Import completions
+                if "completions" in data:
+                    self.db.add_completions_bulk(
+                        (comp_data.get("habit_id"), date.fromisoformat(comp_data["completion_date"]))
+                        for comp_data in data["completions"]
+                    )
+                
+                # Import settings
+                if "settings" in data:
+                    with self.db.settings.batch():
+                        for key, value in data["settings"].items():
+                            self.db.settings.set(key, value)
             
             return True
         except Exception as e:
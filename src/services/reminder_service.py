@@ -23,6 +23,8 @@ class ReminderService:
     def _schedule_reminders(self):
         """Schedule all active reminders."""
         schedule.clear()
+        # Break missed streaks at each day rollover
+        schedule.every().day.at("00:00").do(self.db.expire_streaks)
         habits = self.db.get_all_habits()
         
         for habit in habits:
@@ -38,7 +40,7 @@ class ReminderService:
         """Send a reminder notification for a habit."""
         habit = self.db.get_habit(habit_id)
         if habit and self.notification_callback:
-            message = f"Time to {habit.name}! 🔥 Streak: {habit.streak_count} days"
+            message = f"Time to {habit.name}! 🔥 Streak: {habit.current_streak()} days"
             self.notification_callback(habit.name, message)
     
     def start(self):
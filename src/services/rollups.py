@@ -0,0 +1,122 @@
+"""Completion rollups at day, week, month and year resolution.
+
+A trend over any span is read as one count per period. Counts come from
+``Database.get_period_completion_counts``, which the prefix sums answer
+with one lookup per period boundary, so the cost follows the number of
+points drawn rather than the number of days covered: a five-year trend
+at month resolution costs about what a 30-day one does at day resolution.
+"""
+
+from datetime import date, timedelta
+from typing import List, Optional, Tuple
+from ..models.database import Database
+
+
+DAY = "day"
+WEEK = "week"
+MONTH = "month"
+YEAR = "year"
+
+# Finest first
+RESOLUTIONS = (DAY, WEEK, MONTH, YEAR)
+
+
+def period_start(day: date, resolution: str) -> date:
+    """Return the first day of the period containing ``day``; weeks start on Monday."""
+    if resolution == DAY:
+        return day
+    if resolution == WEEK:
+        return day - timedelta(days=day.weekday())
+    if resolution == MONTH:
+        return date(day.year, day.month, 1)
+    if resolution == YEAR:
+        return date(day.year, 1, 1)
+    raise ValueError(f"Unknown resolution: {resolution}")
+
+
+def next_period(day: date, resolution: str) -> date:
+    """Return the first day of the period after the one containing ``day``."""
+    start = period_start(day, resolution)
+    if resolution == DAY:
+        return start + timedelta(days=1)
+    if resolution == WEEK:
+        return start + timedelta(days=7)
+    if resolution == MONTH:
+        return date(start.year + start.month // 12, start.month % 12 + 1, 1)
+    return date(start.year + 1, 1, 1)
+
+
+def period_count(start: date, end: date, resolution: str) -> int:
+    """Return how many periods ``start`` to ``end`` inclusive touch."""
+    if end < start:
+        return 0
+    if resolution == DAY:
+        return (end - start).days + 1
+    if resolution == WEEK:
+        return (period_start(end, WEEK) - period_start(start, WEEK)).days // 7 + 1
+    if resolution == MONTH:
+        return (end.year - start.year) * 12 + end.month - start.month + 1
+    return end.year - start.year + 1
+
+
+def period_bounds(start: date, end: date, resolution: str) -> List[date]:
+    """Return the boundaries splitting ``start`` to ``end`` inclusive into periods.
+
+    The first and last periods are cut at ``start`` and ``end``; the last
+    boundary is the day after ``end``.
+    """
+    bounds = [start]
+    boundary = next_period(start, resolution)
+    while boundary <= end:
+        bounds.append(boundary)
+        boundary = next_period(boundary, resolution)
+    bounds.append(end + timedelta(days=1))
+    return bounds
+
+
+def pick_resolution(start: date, end: date, max_points: int) -> str:
+    """Return the finest resolution that draws ``start`` to ``end`` in at most ``max_points`` points."""
+    for resolution in RESOLUTIONS:
+        if period_count(start, end, resolution) <= max_points:
+            return resolution
+    return YEAR
+
+
+class RollupService:
+    """Completion trends rolled up to whichever resolution fits the chart."""
+
+    def __init__(self, db: Database):
+        """Initialize with database connection."""
+        self.db = db
+
+    def trend(
+        self,
+        start: date,
+        end: date,
+        max_points: int,
+        habit_id: Optional[int] = None,
+        category: Optional[str] = None,
+        resolution: Optional[str] = None
+    ) -> Tuple[str, List[Tuple[date, int]]]:
+        """Return ``(resolution, [(period start, completions), ...])`` from ``start`` to ``end``.
+
+        Counts all habits, or only ``habit_id`` or those in ``category``.
+        The resolution is the finest that fits ``max_points`` unless given.
+        The first point is labelled ``start`` even when its period began
+        earlier; partial periods at either end only count their days.
+        """
+        if resolution is None:
+            resolution = pick_resolution(start, end, max_points)
+        bounds = period_bounds(start, end, resolution)
+        counts = self.db.get_period_completion_counts(bounds)
+
+        if habit_id is not None:
+            rows = [counts[habit_id]] if habit_id in counts else []
+        elif category is not None:
+            in_category = {habit.id for habit in self.db.get_all_habits() if habit.category == category}
+            rows = [row for row_id, row in counts.items() if row_id in in_category]
+        else:
+            rows = list(counts.values())
+
+        totals = [sum(column) for column in zip(*rows)] if rows else [0] * (len(bounds) - 1)
+        return resolution, list(zip(bounds, totals))
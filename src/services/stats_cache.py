@@ -0,0 +1,117 @@
+"""Persistent dashboard figures kept next to the database file.
+
+The cache is a small JSON file holding the last dashboard figures, the day
+they were computed for and the event seq they reflect. The event seq is
+the database's persistent write counter (every write through ``Database``
+appends an event), so on the next launch the events after the cached seq
+say exactly which figures are stale; the rest are shown as loaded.
+"""
+
+import json
+import os
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+from ..models import events
+from ..models.events import Event
+from .stats_maintainer import HEATMAP_DAYS, RATE_DAYS
+
+
+_FORMAT_VERSION = 1
+
+# Every cached figure; the first three do not depend on the date
+METRICS = (
+    "habit_count", "total_points", "average_streak",
+    "completion_rate", "categories", "weekly", "monthly", "heatmap",
+)
+DATED_METRICS = frozenset(METRICS[2:])
+
+
+def metric_windows(today: date) -> Dict[str, Tuple[int, int]]:
+    """Return the inclusive day-ordinal window each completion figure covers."""
+    day = today.toordinal()
+    week_start = day - today.weekday()
+    return {
+        "completion_rate": (day - RATE_DAYS, day),
+        "categories": (day - RATE_DAYS, day),
+        "weekly": (week_start, week_start + 6),
+        "monthly": (date(today.year, today.month, 1).toordinal(), day),
+        "heatmap": (day - HEATMAP_DAYS, day),
+    }
+
+
+def affected_metrics(changes: Iterable[Event], today: date) -> Set[str]:
+    """Return the figures that ``changes`` may have altered.
+
+    Completions only touch the windows their days fall in; habits being
+    created or deleted change every figure.
+    """
+    windows = metric_windows(today)
+    affected: Set[str] = set()
+    for event in changes:
+        kind = event.kind
+        if kind in (events.HABIT_CREATED, events.HABIT_DELETED):
+            return set(METRICS)
+        if kind in (events.COMPLETED, events.UNCOMPLETED):
+            affected.update(("total_points", "average_streak"))
+            for day in event.payload.get("days", [event.day]):
+                affected.update(name for name, (start, end) in windows.items() if start <= day <= end)
+        elif kind == events.HABIT_EDITED:
+            # Edits can change the category, points or streaks
+            affected.update(("categories", "total_points", "average_streak"))
+        elif kind == events.STREAKS_EXPIRED:
+            affected.add("average_streak")
+    return affected
+
+
+class StatsCache:
+    """Load and save the dashboard figures file."""
+
+    def __init__(self, path: str):
+        """Initialize for the file at ``path``. Nothing is read yet."""
+        self.path = path
+
+    def load(self) -> Optional[Tuple[int, date, Dict[str, Any]]]:
+        """Return ``(seq, day, figures)``, or None if the file is missing or unusable."""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data["format"] != _FORMAT_VERSION or set(data["figures"]) != set(METRICS):
+                return None
+            return data["seq"], date.fromordinal(data["day"]), data["figures"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def save(self, seq: int, day: date, figures: Dict[str, Any]):
+        """Write JSON-able ``figures`` for ``seq`` and ``day``, replacing the file atomically."""
+        temp_path = self.path + ".tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"format": _FORMAT_VERSION, "seq": seq, "day": day.toordinal(), "figures": figures}, f)
+            os.replace(temp_path, self.path)
+        except OSError:
+            pass  # the cache is only an optimization
+
+
+def encode_summary(summary: Dict[str, Any]) -> Dict[str, Any]:
+    """Encode a weekly/monthly summary for the cache file."""
+    return dict(summary, start_date=summary["start_date"].toordinal(), end_date=summary["end_date"].toordinal())
+
+
+def decode_summary(summary: Dict[str, Any]) -> Dict[str, Any]:
+    """Decode a weekly/monthly summary from the cache file."""
+    return dict(
+        summary,
+        start_date=date.fromordinal(summary["start_date"]),
+        end_date=date.fromordinal(summary["end_date"]),
+    )
+
+
+def encode_heatmap(heatmap: Dict[date, int]) -> list:
+    """Encode a heatmap as its counts, oldest day first."""
+    return [count for _, count in sorted(heatmap.items())]
+
+
+def decode_heatmap(counts: list, today: date) -> Dict[date, int]:
+    """Decode heatmap counts ending on ``today``."""
+    start = today - timedelta(days=len(counts) - 1)
+    return {start + timedelta(days=i): count for i, count in enumerate(counts)}
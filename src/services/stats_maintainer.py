@@ -0,0 +1,221 @@
+"""Event-driven statistics maintenance."""
+
+import threading
+from contextlib import contextmanager
+from datetime import date
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+import numpy as np
+from ..models import events
+from ..models.database import Database
+from ..models.events import Event
+from .analytics import CompletionMatrix
+
+
+HEATMAP_DAYS = 365
+RATE_DAYS = 30
+
+
+class StatsMaintainer:
+    """Dashboard aggregates kept current from database write events.
+
+    The aggregates (per-day totals for the heatmap and trend, 30-day counts
+    per habit and category, this week's and this month's counts) are
+    loaded once, then each committed completion, removal or habit change
+    adjusts them in O(1). At day rollover the windows slide forward instead
+    of being reloaded, except when a new week starts past the days tracked.
+
+    The same figures as ``StatsService`` come out; read them inside
+    ``current()``. Missed commits (a version gap, or a change made outside
+    the event log) make the next read rebuild from storage.
+    """
+
+    def __init__(self, db: Database):
+        """Initialize for ``db`` and subscribe to its commits. Nothing is loaded yet."""
+        self.db = db
+        self.version: Optional[int] = None
+        self._built = 0
+        self._lock = threading.RLock()
+        self._today = 0
+        self._first = self._last = 0
+        self._categories: Dict[int, str] = {}
+        self._days: Dict[int, Set[int]] = {}
+        self._daily: Dict[int, int] = {}
+        self._windows: Dict[str, Tuple[int, int]] = {}
+        self._counts: Dict[str, Dict[int, int]] = {}
+        self._category_counts: Dict[str, int] = {}
+        self._unsubscribe = db.subscribe(self._on_commit)
+
+    def close(self):
+        """Stop following the database."""
+        self._unsubscribe()
+
+    @contextmanager
+    def current(self) -> Iterator["StatsMaintainer"]:
+        """Bring the aggregates up to date and hold them still for the block."""
+        with self._lock:
+            today = date.today().toordinal()
+            if self.version is None:
+                self._build(today)
+            elif today != self._today:
+                self._roll(today)
+            yield self
+
+    # Loading and rollover
+    def _bounds(self, today: int) -> Tuple[int, int]:
+        """Return the first and last day tracked: the heatmap through the end of this week."""
+        return today - HEATMAP_DAYS, today + 6 - date.fromordinal(today).weekday()
+
+    def _build(self, today: int):
+        """Load the tracked days of every habit from storage."""
+        # Read the version first: commits after it are replayed on top,
+        # which every update below tolerates
+        version = self.db.data_version
+        first, last = self._bounds(today)
+        matrix = CompletionMatrix.load(self.db, date.fromordinal(first), date.fromordinal(last))
+        self._categories = {habit.id: habit.category for habit in matrix.habits}
+        self._days = {
+            habit.id: set((np.flatnonzero(row) + first).tolist())
+            for habit, row in zip(matrix.habits, matrix.matrix)
+        }
+        self._daily = {first + i: int(total) for i, total in enumerate(matrix.daily_totals()) if total}
+        self._today, self._first, self._last = today, first, last
+        self._reset_windows()
+        self.version = self._built = version
+
+    def _roll(self, today: int):
+        """Slide the tracked days forward to a new ``today``."""
+        first, last = self._bounds(today)
+        if last > self._last:
+            self._build(today)  # a new week reaches past the days tracked
+            return
+        for day in range(self._first, first):
+            self._daily.pop(day, None)
+        for habit_id, days in self._days.items():
+            self._days[habit_id] = {day for day in days if day >= first}
+        self._today, self._first = today, first
+        self._reset_windows()
+
+    def _reset_windows(self):
+        """Recount the 30-day, week and month windows from the tracked days."""
+        today = date.fromordinal(self._today)
+        week_start = self._today - today.weekday()
+        self._windows = {
+            "rate": (self._today - RATE_DAYS, self._today),
+            "week": (week_start, week_start + 6),
+            "month": (date(today.year, today.month, 1).toordinal(), self._today),
+        }
+        self._counts = {}
+        for name, (start, end) in self._windows.items():
+            counts = {}
+            for habit_id, days in self._days.items():
+                count = sum(1 for day in range(start, end + 1) if day in days)
+                if count:
+                    counts[habit_id] = count
+            self._counts[name] = counts
+        self._category_counts = {}
+        for habit_id, count in self._counts["rate"].items():
+            category = self._categories[habit_id]
+            self._category_counts[category] = self._category_counts.get(category, 0) + count
+
+    # Event handling
+    def _on_commit(self, committed: Optional[List[Event]], version: int):
+        with self._lock:
+            if self.version is None or (committed is not None and version <= self._built):
+                return  # nothing loaded yet, or a commit the load already saw
+            if committed is None or version != self.version + 1:
+                self.version = None  # missed or reordered commits; rebuild on next read
+                return
+            for event in committed:
+                self._apply(event)
+            self.version = version
+
+    def _apply(self, event: Event):
+        """Fold one committed event into the aggregates."""
+        kind, habit_id = event.kind, event.habit_id
+        if kind == events.COMPLETED:
+            for day in event.payload.get("days", [event.day]):
+                self._mark(habit_id, day, True)
+        elif kind == events.UNCOMPLETED:
+            self._mark(habit_id, event.day, False)
+        elif kind == events.HABIT_CREATED:
+            if habit_id not in self._days:
+                self._days[habit_id] = set()
+                self._categories[habit_id] = event.payload["category"]
+        elif kind == events.HABIT_DELETED:
+            for day in list(self._days.get(habit_id, ())):
+                self._mark(habit_id, day, False)
+            self._days.pop(habit_id, None)
+            self._categories.pop(habit_id, None)
+        elif kind == events.HABIT_EDITED and habit_id in self._categories:
+            category = event.payload["category"]
+            old = self._categories[habit_id]
+            if category != old:
+                # Move the habit's 30-day count between categories
+                count = self._counts["rate"].get(habit_id, 0)
+                self._add_category(old, -count)
+                self._add_category(category, count)
+                self._categories[habit_id] = category
+
+    def _mark(self, habit_id: int, day: int, completed: bool):
+        """Record one completion or removal, ignoring repeats and untracked days."""
+        days = self._days.get(habit_id)
+        if days is None or not self._first <= day <= self._last or (day in days) == completed:
+            return
+        delta = 1 if completed else -1
+        if completed:
+            days.add(day)
+        else:
+            days.discard(day)
+        self._daily[day] = self._daily.get(day, 0) + delta
+        for name, (start, end) in self._windows.items():
+            if start <= day <= end:
+                counts = self._counts[name]
+                counts[habit_id] = counts.get(habit_id, 0) + delta
+                if name == "rate":
+                    self._add_category(self._categories[habit_id], delta)
+
+    def _add_category(self, category: str, delta: int):
+        self._category_counts[category] = self._category_counts.get(category, 0) + delta
+
+    # Figures (call inside current())
+    def habit_count(self) -> int:
+        """Return the number of habits."""
+        return len(self._days)
+
+    def completion_rate(self) -> float:
+        """Return the completion rate over the last 30 days, as ``StatsService`` computes it."""
+        total_possible = len(self._days) * RATE_DAYS
+        if total_possible == 0:
+            return 0.0
+        return (sum(self._counts["rate"].values()) / total_possible) * 100
+
+    def _summary(self, name: str) -> Dict:
+        start, end = self._windows[name]
+        counts = self._counts[name]
+        return {
+            "start_date": date.fromordinal(start),
+            "end_date": date.fromordinal(end),
+            "total_habits": len(self._days),
+            "total_completions": sum(counts.values()),
+            "habits_completed": sum(1 for count in counts.values() if count > 0)
+        }
+
+    def weekly_summary(self) -> Dict:
+        """Return this week's summary, as ``StatsService.get_weekly_summary``."""
+        return self._summary("week")
+
+    def monthly_summary(self) -> Dict:
+        """Return this month's summary, as ``StatsService.get_monthly_summary``."""
+        return self._summary("month")
+
+    def category_breakdown(self) -> Dict[str, int]:
+        """Return 30-day completion counts for every category in use, sorted."""
+        return {
+            category: self._category_counts.get(category, 0)
+            for category in sorted(set(self._categories.values()))
+        }
+
+    def heatmap(self, days: int = HEATMAP_DAYS) -> Dict[date, int]:
+        """Return completions per day over the last ``days`` days (at most ``HEATMAP_DAYS``)."""
+        start = self._today - min(days, HEATMAP_DAYS)
+        return {date.fromordinal(day): self._daily.get(day, 0) for day in range(start, self._today + 1)}
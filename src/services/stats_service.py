@@ -1,164 +1,154 @@
 """Statistics calculation service."""
 
+import functools
 from datetime import datetime, date, timedelta
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
+import numpy as np
 from ..models.database import Database
 from ..models.habit import Habit
+from .analytics import CompletionMatrix
+
+
+def _snapshot(method):
+    """Run a StatsService method against a read-only database snapshot."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.db.snapshot():
+            return method(self, *args, **kwargs)
+    return wrapper
 
 
 class StatsService:
-    """Service for calculating habit statistics."""
+    """Service for calculating habit statistics.
+    
+    All queries run on the database's read snapshot connection, so analytics
+    never compete with UI writes. Wrap several calls in ``db.snapshot()`` to
+    make them see the same point in time.
     
-    def __init__(self, db: Database):
-        """Initialize with database connection."""
+    Completion metrics are views over a ``CompletionMatrix``: each method
+    loads its window with one query (or slices ``matrix``, when given one
+    that covers it) and reduces it with vectorized operations.
+    """
+    
+    def __init__(self, db: Database, matrix: Optional[CompletionMatrix] = None):
+        """Initialize with database connection and an optional preloaded matrix."""
         self.db = db
+        self.matrix = matrix
+    
+    def _window(self, start_date: date, end_date: date, habit_id: Optional[int] = None) -> CompletionMatrix:
+        """Return the completion matrix for a date range, or just one habit's row of it."""
+        if self.matrix is not None and self.matrix.covers(start_date, end_date):
+            return self.matrix.window(start_date, end_date)
+        if habit_id is not None:
+            return CompletionMatrix.load_habit(self.db, habit_id, start_date, end_date)
+        return CompletionMatrix.load(self.db, start_date, end_date)
     
+    @_snapshot
     def get_overall_completion_rate(self, days: int = 30) -> float:
         """Calculate overall completion rate for the last N days."""
-        habits = self.db.get_all_habits()
-        if not habits:
-            return 0.0
-        
         end_date = date.today()
         start_date = end_date - timedelta(days=days)
         
-        total_possible = len(habits) * days
-        total_completed = 0
+        window = self._window(start_date, end_date)
+        if not window.habits:
+            return 0.0
         
-        for habit in habits:
-            count = self.db.get_completion_count(habit.id, start_date, end_date)
-            total_completed += count
+        total_possible = len(window.habits) * days
+        total_completed = int(window.counts().sum())
         
         if total_possible == 0:
             return 0.0
         
         return (total_completed / total_possible) * 100
     
+    @_snapshot
     def get_average_streak(self) -> float:
         """Calculate average streak length."""
         habits = self.db.get_all_habits()
         if not habits:
             return 0.0
         
-        total_streak = sum(habit.streak_count for habit in habits)
+        today = date.today()
+        total_streak = sum(habit.current_streak(today) for habit in habits)
         return total_streak / len(habits)
     
+    @_snapshot
     def get_best_performing_habits(self, limit: int = 5) -> List[Habit]:
         """Get habits with highest completion rates."""
-        habits = self.db.get_all_habits()
-        
-        # Calculate completion rate for each habit
-        habit_scores = []
         end_date = date.today()
         start_date = end_date - timedelta(days=30)
+        window = self._window(start_date, end_date)
         
-        for habit in habits:
-            completed = self.db.get_completion_count(habit.id, start_date, end_date)
-            if habit.frequency == "daily":
-                possible = 30
-            else:
-                possible = 4
-            
-            rate = (completed / possible) * 100 if possible > 0 else 0
-            habit_scores.append((habit, rate))
+        # Completion rate per habit: daily habits out of 30 days, others out of 4 weeks
+        possible = np.array([30 if habit.frequency == "daily" else 4 for habit in window.habits])
+        rates = window.counts() / possible * 100
         
-        # Sort by completion rate
-        habit_scores.sort(key=lambda x: x[1], reverse=True)
-        return [habit for habit, _ in habit_scores[:limit]]
+        # Stable sort, so ties keep their listing order
+        order = np.argsort(-rates, kind="stable")[:limit]
+        return [window.habits[i] for i in order]
     
+    def _summary(self, start_date: date, end_date: date) -> Dict:
+        """Summarize completions in a date range."""
+        counts = self._window(start_date, end_date).counts()
+        return {
+            "start_date": start_date,
+            "end_date": end_date,
+            "total_habits": len(counts),
+            "total_completions": int(counts.sum()),
+            "habits_completed": int(np.count_nonzero(counts))
+        }
+    
+    @_snapshot
     def get_weekly_summary(self) -> Dict:
         """Get summary for the current week."""
         today = date.today()
         week_start = today - timedelta(days=today.weekday())
         week_end = week_start + timedelta(days=6)
-        
-        habits = self.db.get_all_habits()
-        total_completions = 0
-        
-        for habit in habits:
-            count = self.db.get_completion_count(habit.id, week_start, week_end)
-            total_completions += count
-        
-        return {
-            "start_date": week_start,
-            "end_date": week_end,
-            "total_habits": len(habits),
-            "total_completions": total_completions,
-            "habits_completed": len([h for h in habits if self.db.get_completion_count(h.id, week_start, week_end) > 0])
-        }
+        return self._summary(week_start, week_end)
     
+    @_snapshot
     def get_monthly_summary(self) -> Dict:
         """Get summary for the current month."""
         today = date.today()
         month_start = date(today.year, today.month, 1)
-        month_end = today
-        
-        habits = self.db.get_all_habits()
-        total_completions = 0
+        return self._summary(month_start, today)
+    
+    @_snapshot
+    def get_window_counts(self, days: int) -> List[Tuple[Habit, int]]:
+        """Get every habit's completion count over the last N days (today included), most first.
         
-        for habit in habits:
-            count = self.db.get_completion_count(habit.id, month_start, month_end)
-            total_completions += count
+        Counts come from the database's prefix sums, so every window costs
+        the same two lookups per habit.
+        """
+        end_date = date.today()
+        start_date = end_date - timedelta(days=max(days, 1) - 1)
         
-        return {
-            "start_date": month_start,
-            "end_date": month_end,
-            "total_habits": len(habits),
-            "total_completions": total_completions,
-            "habits_completed": len([h for h in habits if self.db.get_completion_count(h.id, month_start, month_end) > 0])
-        }
+        counts = self.db.get_completion_counts(start_date, end_date)
+        habit_counts = [(habit, counts.get(habit.id, 0)) for habit in self.db.get_all_habits()]
+        habit_counts.sort(key=lambda x: x[1], reverse=True)
+        return habit_counts
     
+    @_snapshot
     def get_category_breakdown(self) -> Dict[str, int]:
         """Get completion count by category."""
-        habits = self.db.get_all_habits()
-        breakdown = {}
-        
         end_date = date.today()
         start_date = end_date - timedelta(days=30)
-        
-        for habit in habits:
-            category = habit.category
-            if category not in breakdown:
-                breakdown[category] = 0
-            
-            count = self.db.get_completion_count(habit.id, start_date, end_date)
-            breakdown[category] += count
-        
-        return breakdown
+        return self._window(start_date, end_date).category_totals()
     
+    @_snapshot
     def get_completion_trend(self, habit_id: int, days: int = 30) -> List[Tuple[date, bool]]:
         """Get completion trend for a habit over the last N days."""
         end_date = date.today()
         start_date = end_date - timedelta(days=days)
         
-        completions = self.db.get_completions(habit_id, start_date, end_date)
-        completion_set = set(completions)
-        
-        trend = []
-        current_date = start_date
-        while current_date <= end_date:
-            trend.append((current_date, current_date in completion_set))
-            current_date += timedelta(days=1)
-        
-        return trend
+        window = self._window(start_date, end_date, habit_id)
+        return list(zip(window.dates(), window.row(habit_id).tolist()))
     
+    @_snapshot
     def get_calendar_heatmap_data(self, days: int = 365) -> Dict[date, int]:
         """Get completion data for calendar heatmap."""
         end_date = date.today()
         start_date = end_date - timedelta(days=days)
         
-        habits = self.db.get_all_habits()
-        heatmap = {}
-        
-        current_date = start_date
-        while current_date <= end_date:
-            heatmap[current_date] = 0
-            current_date += timedelta(days=1)
-        
-        for habit in habits:
-            completions = self.db.get_completions(habit.id, start_date, end_date)
-            for completion_date in completions:
-                if completion_date in heatmap:
-                    heatmap[completion_date] += 1
-        
-        return heatmap
+        window = self._window(start_date, end_date)
+        return dict(zip(window.dates(), window.daily_totals().tolist()))
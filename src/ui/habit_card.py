@@ -75,8 +75,9 @@ class HabitCard(ctk.CTkFrame):
         streak_frame = ctk.CTkFrame(main_frame, fg_color="transparent")
         streak_frame.pack(fill="x", pady=(0, 10))
         
-        streak_text = f"🔥 {self.habit.streak_count} day streak"
-        if self.habit.longest_streak > self.habit.streak_count:
+        streak = self.habit.current_streak()
+        streak_text = f"🔥 {streak} day streak"
+        if self.habit.longest_streak > streak:
             streak_text += f" (Best: {self.habit.longest_streak})"
         
         streak_label = ctk.CTkLabel(
@@ -174,19 +175,18 @@ class HabitCard(ctk.CTkFrame):
     
     def _on_complete(self):
         """Handle complete button click."""
-        success = self.db.add_completion(self.habit.id)
-        if success:
+        habit = self.db.complete_habit(self.habit.id)
+        if habit:
             # Update habit data
-            self.habit = self.db.get_habit(self.habit.id)
-            if self.habit:
-                self._update_progress()
-                # Update streak display
-                for widget in self.winfo_children():
-                    widget.destroy()
-                self._create_widgets()
-                
-                if self.on_complete:
-                    self.on_complete(self.habit)
+            self.habit = habit
+            self._update_progress()
+            # Update streak display
+            for widget in self.winfo_children():
+                widget.destroy()
+            self._create_widgets()
+            
+            if self.on_complete:
+                self.on_complete(self.habit)
     
     def _on_edit(self):
         """Handle edit button click."""
@@ -1,13 +1,14 @@
 """Main application window for Axilium."""
 
+import threading
 import customtkinter as ctk
 from typing import Optional
 from plyer import notification
 from ..models.database import Database
 from ..models.habit import Habit
 from ..models.reward import Reward
+from ..services.dashboard_service import DashboardService
 from ..services.reminder_service import ReminderService
-from ..services.stats_service import StatsService
 from ..utils.constants import WINDOW_WIDTH, WINDOW_HEIGHT, MIN_WINDOW_WIDTH, MIN_WINDOW_HEIGHT, POINTS_PER_COMPLETION, REWARD_MILESTONES
 from ..utils.themes import get_theme
 from .habit_card import HabitCard
@@ -28,19 +29,23 @@ class MainWindow(ctk.CTk):
         
         # Initialize services
         self.reminder_service = ReminderService(self.db, self._show_notification)
-        self.stats_service = StatsService(self.db)
+        self.dashboard = DashboardService(self.db)
         
         # Setup window
         self.title("Axilium - Habit Tracker")
         self.geometry(f"{WINDOW_WIDTH}x{WINDOW_HEIGHT}")
         self.minsize(MIN_WINDOW_WIDTH, MIN_WINDOW_HEIGHT)
         
-        # Apply theme
+        # Apply theme, and again whenever the setting changes
         self._apply_theme()
+        self.db.settings.subscribe("theme", lambda key, value: self._apply_theme())
         
         # Create UI
         self._create_widgets()
         
+        # Break streaks missed since the last run before showing any
+        self.db.expire_streaks()
+        
         # Load habits
         self._refresh_habits()
         
@@ -50,6 +55,10 @@ class MainWindow(ctk.CTk):
         # Start reminder service
         self.reminder_service.start()
         
+        # Fold old events into a snapshot and archive old completions, off the UI thread
+        threading.Thread(target=self.db.events.compact, daemon=True).start()
+        threading.Thread(target=self.db.archive_completions, daemon=True).start()
+        
         # Handle window close
         self.protocol("WM_DELETE_WINDOW", self._on_closing)
     
@@ -156,9 +165,7 @@ class MainWindow(ctk.CTk):
         for widget in self.quick_stats_frame.winfo_children():
             widget.destroy()
         
-        habits = self.db.get_all_habits()
-        total_points = self.db.get_total_points()
-        completion_rate = self.stats_service.get_overall_completion_rate(30)
+        dashboard = self.dashboard.get()
         
         ctk.CTkLabel(
             self.quick_stats_frame,
@@ -168,19 +175,19 @@ class MainWindow(ctk.CTk):
         
         ctk.CTkLabel(
             self.quick_stats_frame,
-            text=f"Habits: {len(habits)}",
+            text=f"Habits: {dashboard.habit_count}",
             font=ctk.CTkFont(size=12)
         ).pack()
         
         ctk.CTkLabel(
             self.quick_stats_frame,
-            text=f"Points: {total_points}",
+            text=f"Points: {dashboard.total_points}",
             font=ctk.CTkFont(size=12)
         ).pack()
         
         ctk.CTkLabel(
             self.quick_stats_frame,
-            text=f"Rate: {completion_rate:.1f}%",
+            text=f"Rate: {dashboard.completion_rate:.1f}%",
             font=ctk.CTkFont(size=12)
         ).pack(pady=(0, 10))
     
@@ -220,7 +227,7 @@ class MainWindow(ctk.CTk):
         self._clear_content()
         self._highlight_nav_button(self.nav_stats_btn)
         
-        stats_view = StatsView(self.content_frame, self.db)
+        stats_view = StatsView(self.content_frame, self.db, self.dashboard)
         stats_view.pack(fill="both", expand=True)
     
     def _show_rewards_view(self):
@@ -239,7 +246,7 @@ class MainWindow(ctk.CTk):
         )
         title.pack(side="left")
         
-        total_points = self.db.get_total_points()
+        total_points = self.dashboard.get().total_points
         points_label = ctk.CTkLabel(
             header_frame,
             text=f"Total Points: {total_points}",
@@ -253,7 +260,7 @@ class MainWindow(ctk.CTk):
         
         rewards = self.db.get_all_rewards()
         for reward in rewards:
-            self._create_reward_card(rewards_container, reward)
+            self._create_reward_card(rewards_container, reward, total_points)
     
     def _show_settings_view(self):
         """Show settings view."""
@@ -267,7 +274,7 @@ class MainWindow(ctk.CTk):
         )
         settings_view.pack(fill="both", expand=True)
     
-    def _create_reward_card(self, parent, reward: Reward):
+    def _create_reward_card(self, parent, reward: Reward, total_points: int):
         """Create a reward card."""
         unlocked = reward.is_unlocked()
         
@@ -327,7 +334,6 @@ class MainWindow(ctk.CTk):
             )
             status_label.pack()
         else:
-            total_points = self.db.get_total_points()
             remaining = reward.points_required - total_points
             if remaining > 0:
                 status_label = ctk.CTkLabel(
@@ -418,17 +424,21 @@ class MainWindow(ctk.CTk):
         """Handle habit completion."""
         self._refresh_habits()
         self._check_rewards()
-        self._update_quick_stats()
     
     def _check_rewards(self):
         """Check and unlock rewards based on points."""
         total_points = self.db.get_total_points()
         rewards = self.db.get_all_rewards()
         
-        for reward in rewards:
-            if not reward.is_unlocked() and total_points >= reward.points_required:
-                self.db.unlock_reward(reward.id)
-                self._show_reward_notification(reward)
+        unlocked = []
+        with self.db.transaction():
+            for reward in rewards:
+                if not reward.is_unlocked() and total_points >= reward.points_required:
+                    self.db.unlock_reward(reward.id)
+                    unlocked.append(reward)
+        
+        for reward in unlocked:
+            self._show_reward_notification(reward)
     
     def _show_reward_notification(self, reward: Reward):
         """Show notification when reward is unlocked."""
@@ -454,7 +464,7 @@ class MainWindow(ctk.CTk):
     
     def _on_theme_change(self, theme_name: str):
         """Handle theme change."""
-        self._apply_theme()
+        # The theme itself is re-applied by the settings subscription
         # Show message that app restart is needed for full theme change
         import tkinter.messagebox as messagebox
         messagebox.showinfo(
@@ -465,5 +475,6 @@ class MainWindow(ctk.CTk):
     def _on_closing(self):
         """Handle window closing."""
         self.reminder_service.stop()
+        self.dashboard.close()
         self.db.close()
         self.destroy()
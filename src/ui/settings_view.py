@@ -209,17 +209,16 @@ and achieve your goals!
             icon="warning"
         )
         if result:
-            # Delete all habits (completions will cascade)
-            habits = self.db.get_all_habits()
-            for habit in habits:
-                self.db.delete_habit(habit.id)
-            
-            # Reset rewards
-            rewards = self.db.get_all_rewards()
-            for reward in rewards:
-                if reward.unlocked_date:
-                    cursor = self.db.conn.cursor()
-                    cursor.execute("UPDATE rewards SET unlocked_date = NULL WHERE id = ?", (reward.id,))
-                    self.db.conn.commit()
+            with self.db.transaction():
+                # Delete all habits (completions will cascade)
+                habits = self.db.get_all_habits()
+                for habit in habits:
+                    self.db.delete_habit(habit.id)
+                
+                # Reset rewards
+                rewards = self.db.get_all_rewards()
+                for reward in rewards:
+                    if reward.unlocked_date:
+                        self.db.reset_reward(reward.id)
             
             messagebox.showinfo("Success", "All data has been reset.")
@@ -1,24 +1,34 @@
 """Statistics view for Axilium."""
 
 import customtkinter as ctk
-from datetime import date, timedelta
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
+from datetime import date, timedelta
+from ..services.dashboard_service import DashboardService
+from ..services.rollups import DAY, RollupService
 from ..services.stats_service import StatsService
 from ..models.database import Database
+from ..utils.constants import STATS_WINDOWS, TREND_POINTS, TREND_RANGES
 
 
 class StatsView(ctk.CTkScrollableFrame):
     """Statistics and visualization view."""
     
-    def __init__(self, parent, db: Database):
-        """Initialize stats view."""
+    def __init__(self, parent, db: Database, dashboard: DashboardService = None):
+        """Initialize stats view.
+        
+        Figures come from ``dashboard``, which may be shared with other views
+        so they reuse one snapshot per data version.
+        """
         super().__init__(parent)
         
         self.db = db
+        self.dashboard = dashboard or DashboardService(db)
         self.stats_service = StatsService(db)
-        
+        self.rollups = RollupService(db)
+        self.window_var = ctk.StringVar(value=f"{STATS_WINDOWS[1]} days")
+        self.trend_var = ctk.StringVar(value=next(iter(TREND_RANGES)))
         self._create_widgets()
     
     def _create_widgets(self):
@@ -31,6 +41,9 @@ class StatsView(ctk.CTkScrollableFrame):
         )
         title.pack(pady=(20, 30))
         
+        # Every card and chart renders the same snapshot
+        self.snapshot = self.dashboard.get()
+        
         # Summary cards
         self._create_summary_cards()
         
@@ -43,38 +56,34 @@ class StatsView(ctk.CTkScrollableFrame):
         summary_frame.pack(fill="x", padx=20, pady=10)
         
         # Overall completion rate
-        completion_rate = self.stats_service.get_overall_completion_rate(30)
         self._create_stat_card(
             summary_frame,
             "Completion Rate",
-            f"{completion_rate:.1f}%",
+            f"{self.snapshot.completion_rate:.1f}%",
             "Last 30 days"
         )
         
         # Average streak
-        avg_streak = self.stats_service.get_average_streak()
         self._create_stat_card(
             summary_frame,
             "Average Streak",
-            f"{avg_streak:.1f} days",
+            f"{self.snapshot.average_streak:.1f} days",
             "Across all habits"
         )
         
         # Total habits
-        habits = self.db.get_all_habits()
         self._create_stat_card(
             summary_frame,
             "Total Habits",
-            str(len(habits)),
+            str(self.snapshot.habit_count),
             "Active habits"
         )
         
         # Total points
-        total_points = self.db.get_total_points()
         self._create_stat_card(
             summary_frame,
             "Total Points",
-            str(total_points),
+            str(self.snapshot.total_points),
             "Reward points earned"
         )
     
@@ -111,6 +120,9 @@ class StatsView(ctk.CTkScrollableFrame):
         # Weekly/Monthly summary
         self._create_summary_chart()
         
+        # Per-habit counts over a chosen window
+        self._create_window_chart()
+        
         # Category breakdown
         self._create_category_chart()
         
@@ -128,8 +140,8 @@ class StatsView(ctk.CTkScrollableFrame):
             font=ctk.CTkFont(size=18, weight="bold")
         ).pack(pady=10)
         
-        weekly = self.stats_service.get_weekly_summary()
-        monthly = self.stats_service.get_monthly_summary()
+        weekly = self.snapshot.weekly
+        monthly = self.snapshot.monthly
         
         fig = Figure(figsize=(8, 4), facecolor='none')
         ax = fig.add_subplot(111)
@@ -157,6 +169,82 @@ class StatsView(ctk.CTkScrollableFrame):
         canvas.draw()
         canvas.get_tk_widget().pack(fill="both", expand=True, padx=10, pady=10)
     
+    def _create_window_chart(self):
+        """Create per-habit completion chart with a selectable window."""
+        chart_frame = ctk.CTkFrame(self)
+        chart_frame.pack(fill="both", expand=True, padx=20, pady=10)
+        
+        ctk.CTkLabel(
+            chart_frame,
+            text="Completions per Habit",
+            font=ctk.CTkFont(size=18, weight="bold")
+        ).pack(pady=10)
+        
+        controls = ctk.CTkFrame(chart_frame, fg_color="transparent")
+        controls.pack(pady=(0, 5))
+        
+        ctk.CTkOptionMenu(
+            controls,
+            values=[f"{days} days" for days in STATS_WINDOWS] + ["Custom"],
+            variable=self.window_var,
+            command=lambda choice: self._draw_window_chart(),
+            width=140
+        ).pack(side="left", padx=5)
+        
+        ctk.CTkLabel(controls, text="Custom days:", font=ctk.CTkFont(size=12)).pack(side="left", padx=(15, 5))
+        self.custom_days_var = ctk.StringVar(value="14")
+        custom_entry = ctk.CTkEntry(controls, width=80, textvariable=self.custom_days_var)
+        custom_entry.pack(side="left", padx=5)
+        custom_entry.bind("<Return>", lambda event: self._draw_window_chart())
+        
+        self.window_chart_frame = ctk.CTkFrame(chart_frame, fg_color="transparent")
+        self.window_chart_frame.pack(fill="both", expand=True)
+        self._draw_window_chart()
+    
+    def _selected_window(self) -> int:
+        """Return the selected window in days."""
+        choice = self.window_var.get()
+        if choice == "Custom":
+            try:
+                return max(int(self.custom_days_var.get()), 1)
+            except ValueError:
+                return STATS_WINDOWS[1]
+        return int(choice.split()[0])
+    
+    def _draw_window_chart(self):
+        """Draw per-habit completion counts for the selected window."""
+        for widget in self.window_chart_frame.winfo_children():
+            widget.destroy()
+        
+        days = self._selected_window()
+        habit_counts = self.stats_service.get_window_counts(days)
+        if not habit_counts:
+            ctk.CTkLabel(
+                self.window_chart_frame,
+                text="No habits to display",
+                font=ctk.CTkFont(size=14),
+                text_color="gray"
+            ).pack(pady=20)
+            return
+        
+        fig = Figure(figsize=(8, max(2, 0.4 * len(habit_counts))), facecolor='none')
+        ax = fig.add_subplot(111)
+        
+        names = [habit.name for habit, _ in reversed(habit_counts)]
+        counts = [count for _, count in reversed(habit_counts)]
+        colors = [habit.color for habit, _ in reversed(habit_counts)]
+        
+        ax.barh(names, counts, color=colors)
+        ax.set_xlabel('Completions')
+        ax.set_title(f'Last {days} Days')
+        ax.set_facecolor('none')
+        fig.patch.set_facecolor('none')
+        fig.tight_layout()
+        
+        canvas = FigureCanvasTkAgg(fig, self.window_chart_frame)
+        canvas.draw()
+        canvas.get_tk_widget().pack(fill="both", expand=True, padx=10, pady=10)
+    
     def _create_category_chart(self):
         """Create category breakdown pie chart."""
         chart_frame = ctk.CTkFrame(self)
@@ -168,7 +256,7 @@ class StatsView(ctk.CTkScrollableFrame):
             font=ctk.CTkFont(size=18, weight="bold")
         ).pack(pady=10)
         
-        breakdown = self.stats_service.get_category_breakdown()
+        breakdown = self.snapshot.categories
         
         if not breakdown:
             ctk.CTkLabel(
@@ -197,18 +285,17 @@ class StatsView(ctk.CTkScrollableFrame):
         canvas.get_tk_widget().pack(fill="both", expand=True, padx=10, pady=10)
     
     def _create_trend_chart(self):
-        """Create completion trend line chart."""
+        """Create completion trend line chart with a selectable range."""
         chart_frame = ctk.CTkFrame(self)
         chart_frame.pack(fill="both", expand=True, padx=20, pady=10)
         
         ctk.CTkLabel(
             chart_frame,
-            text="Completion Trend (Last 30 Days)",
+            text="Completion Trend",
             font=ctk.CTkFont(size=18, weight="bold")
         ).pack(pady=10)
         
-        habits = self.db.get_all_habits()
-        if not habits:
+        if not self.snapshot.habit_count:
             ctk.CTkLabel(
                 chart_frame,
                 text="No habits to display",
@@ -217,25 +304,44 @@ class StatsView(ctk.CTkScrollableFrame):
             ).pack(pady=20)
             return
         
-        fig = Figure(figsize=(10, 4), facecolor='none')
-        ax = fig.add_subplot(111)
+        ctk.CTkOptionMenu(
+            chart_frame,
+            values=list(TREND_RANGES),
+            variable=self.trend_var,
+            command=lambda choice: self._draw_trend_chart(),
+            width=140
+        ).pack(pady=(0, 5))
+        
+        self.trend_chart_frame = ctk.CTkFrame(chart_frame, fg_color="transparent")
+        self.trend_chart_frame.pack(fill="both", expand=True)
+        self._draw_trend_chart()
+    
+    def _draw_trend_chart(self):
+        """Draw completions over the selected range, one point per day, week, month or year.
         
-        end_date = date.today()
-        start_date = end_date - timedelta(days=30)
+        The last 30 days come from the dashboard snapshot; longer ranges
+        are rolled up to the finest resolution that fits ``TREND_POINTS``.
+        """
+        for widget in self.trend_chart_frame.winfo_children():
+            widget.destroy()
         
-        dates = [start_date + timedelta(days=i) for i in range(31)]
-        total_completions = [0] * 31
+        days = TREND_RANGES[self.trend_var.get()]
+        if days == len(self.snapshot.trend) - 1:
+            resolution, trend = DAY, self.snapshot.trend
+        else:
+            today = date.today()
+            resolution, trend = self.rollups.trend(today - timedelta(days=days), today, TREND_POINTS)
         
-        for habit in habits:
-            trend = self.stats_service.get_completion_trend(habit.id, 30)
-            for i, (comp_date, completed) in enumerate(trend):
-                if completed:
-                    total_completions[i] += 1
+        fig = Figure(figsize=(10, 4), facecolor='none')
+        ax = fig.add_subplot(111)
+        
+        dates = [day for day, _ in trend]
+        total_completions = [count for _, count in trend]
         
         ax.plot(dates, total_completions, marker='o', linewidth=2, markersize=4, color='#4ECDC4')
         ax.set_xlabel('Date')
-        ax.set_ylabel('Daily Completions')
-        ax.set_title('Daily Completion Trend')
+        ax.set_ylabel(f'Completions per {resolution.capitalize()}')
+        ax.set_title(f'Completion Trend (Last {self.trend_var.get()})')
         ax.grid(True, alpha=0.3)
         ax.set_facecolor('none')
         fig.patch.set_facecolor('none')
@@ -243,7 +349,7 @@ class StatsView(ctk.CTkScrollableFrame):
         # Rotate x-axis labels
         fig.autofmt_xdate()
         
-        canvas = FigureCanvasTkAgg(fig, chart_frame)
+        canvas = FigureCanvasTkAgg(fig, self.trend_chart_frame)
         canvas.draw()
         canvas.get_tk_widget().pack(fill="both", expand=True, padx=10, pady=10)
     
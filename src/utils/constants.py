@@ -8,6 +8,9 @@ APP_VERSION = "1.0.0"
 DB_NAME = "axilium.db"
 import os
 DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "axilium.db")
+# Completions older than this many days move to the archive tier
+# (overridable with the "archive_horizon_days" setting)
+ARCHIVE_HORIZON_DAYS = 400
 
 # Habit Categories
 CATEGORIES = [
@@ -38,6 +41,13 @@ CATEGORY_COLORS = {
 POINTS_PER_COMPLETION = 10
 REWARD_MILESTONES = [50, 100, 250, 500, 1000, 2500, 5000]
 
+# Statistics windows offered by the stats view, in days
+STATS_WINDOWS = [7, 30, 90, 365]
+
+# Trend chart ranges, in days, and the most points one chart draws
+TREND_RANGES = {"30 days": 30, "1 year": 365, "5 years": 5 * 365, "10 years": 10 * 365}
+TREND_POINTS = 100
+
 # UI Constants
 WINDOW_WIDTH = 1200
 WINDOW_HEIGHT = 800